@@ -1,6 +1,8 @@
 
 from pydantic import BaseModel
+from datetime import datetime
 from typing import List, Optional
+from uuid import UUID
 from .medicine_dto import MedicineDTO
 
 class BillItemDTO(BaseModel):
@@ -20,6 +22,53 @@ class BillDTO(BaseModel):
     patient_age: int
     bill_items: List[BillItemDTO]
     total_amount: Optional[float] = None
+    created_date: Optional[datetime] = None
+    patient_id: Optional[UUID] = None
+
+    class Config:
+        from_attributes = True
+
+class BillPageDTO(BaseModel):
+    items: List[BillDTO]
+    next_cursor: Optional[int] = None
+
+class PatientBillsDTO(BaseModel):
+    patient_id: UUID
+    # Lifetime totals over all of the patient's bills, not just this page
+    bill_count: int
+    total_amount: float
+    first_bill_date: Optional[datetime] = None
+    last_bill_date: Optional[datetime] = None
+    bills: List[BillDTO]
+    next_cursor: Optional[int] = None
+
+class BillLinkResultDTO(BaseModel):
+    scanned: int
+    linked: int
+
+class BillBatchResultDTO(BaseModel):
+    index: int
+    success: bool
+    bill: Optional[BillDTO] = None
+    error: Optional[str] = None
+
+class ReceiptItemDTO(BaseModel):
+    medicine_id: int
+    medicine_name: str
+    quantity: int
+    price_per_unit: float
+    line_total: float
+
+    class Config:
+        from_attributes = True
+
+class ReceiptDTO(BaseModel):
+    bill_id: int
+    patient_name: str
+    patient_age: int
+    total_amount: float
+    created_date: Optional[datetime] = None
+    items: List[ReceiptItemDTO]
 
     class Config:
         from_attributes = True
@@ -1,12 +1,13 @@
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class MedicineDTO(BaseModel):
     id: int
     name: str
     price_per_unit: float
     stock: int
+    version: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -19,4 +20,16 @@ class MedicineUpdateDTO(BaseModel):
     class Config:
         from_attributes = True
 
+class MedicineCatalogDTO(BaseModel):
+    etag: str
+    medicines: List[MedicineDTO]
 
+class MedicineImportErrorDTO(BaseModel):
+    row: int
+    error: str
+
+class MedicineImportResultDTO(BaseModel):
+    created: int
+    revived: int
+    skipped: int
+    errors: List[MedicineImportErrorDTO]
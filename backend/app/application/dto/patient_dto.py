@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -20,6 +20,51 @@ class PatientDTO(BaseModel):
     patient_type: str
     guardian_name: Optional[str] = None
     guardian_phone: Optional[str] = None
+    version: Optional[int] = None
 
     class Config:
         from_attributes = True
+
+
+class PatientPageDTO(BaseModel):
+    items: List[PatientDTO]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None
+
+
+class PatientFieldsPageDTO(BaseModel):
+    # Only the requested PatientDTO fields of each patient
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None
+
+
+class PatientBatchResultDTO(BaseModel):
+    index: int
+    # "created", "revived", "duplicate" or "invalid"
+    status: str
+    patient: Optional[PatientDTO] = None
+    error: Optional[str] = None
+
+
+class PatientDuplicateDTO(BaseModel):
+    id: int
+    score: float
+    reasons: List[str]
+    patient_a: PatientDTO
+    patient_b: PatientDTO
+
+    class Config:
+        from_attributes = True
+
+
+class PatientDuplicatePageDTO(BaseModel):
+    items: List[PatientDuplicateDTO]
+    next_cursor: Optional[int] = None
+
+
+class DuplicateScanResultDTO(BaseModel):
+    patients: int
+    candidates: int
+    added: int
+    skipped_blocks: int
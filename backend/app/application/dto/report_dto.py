@@ -0,0 +1,31 @@
+
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+class DailyRevenueDTO(BaseModel):
+    day: date
+    revenue: float
+    units_sold: int
+    bill_count: int
+
+    class Config:
+        from_attributes = True
+
+class RevenueReportDTO(BaseModel):
+    date_from: date
+    date_to: date
+    revenue: float
+    units_sold: int
+    bill_count: int
+    days: List[DailyRevenueDTO]
+
+class MedicineSalesDTO(BaseModel):
+    medicine_id: int
+    medicine_name: Optional[str] = None
+    revenue: float
+    units_sold: int
+    bill_count: int
+
+    class Config:
+        from_attributes = True
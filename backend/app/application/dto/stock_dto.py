@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Optional
+
+class StockMovementDTO(BaseModel):
+    id: int
+    medicine_id: int
+    kind: str
+    quantity: int
+    note: Optional[str] = None
+    created_date: Optional[datetime] = None
+    lot_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class StockMovementPageDTO(BaseModel):
+    items: List[StockMovementDTO]
+    next_cursor: Optional[int] = None
+
+class StockLevelDTO(BaseModel):
+    medicine_id: int
+    stock: int
+    at: datetime
+
+class MedicineLotDTO(BaseModel):
+    id: int
+    medicine_id: int
+    medicine_name: Optional[str] = None
+    batch_number: str
+    expiry_date: date
+    remaining: int
+    received_date: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,25 +1,62 @@
 
-from typing import List
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
 from app.domain.models.bill import Bill, BillItem
+from app.domain.models.patient import Patient
 from app.domain.repositories.bill_repository import BillRepository
 from app.domain.repositories.medicine_repository import MedicineRepository
+from app.domain.repositories.patient_repository import PatientRepository
+from app.domain.repositories.report_repository import ReportRepository
 from app.application.dto.bill_dto import BillDTO, BillItemDTO
 from app.application.dto.medicine_dto import MedicineDTO
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
 
 class CreateBill:
-    def __init__(self, bill_repository: BillRepository, medicine_repository: MedicineRepository):
+    def __init__(
+        self,
+        bill_repository: BillRepository,
+        medicine_repository: MedicineRepository,
+        report_repository: ReportRepository,
+        patient_repository: Optional[PatientRepository] = None,
+    ):
         self.bill_repository = bill_repository
         self.medicine_repository = medicine_repository
+        self.report_repository = report_repository
+        # Only needed for bills that name a registered patient
+        self.patient_repository = patient_repository
 
-    def execute(self, patient_name: str, patient_age: int, items: List[dict]) -> BillDTO:
-        bill_items = []
-        total_amount = 0.0
+    def execute(self, patient_name: Optional[str], patient_age: Optional[int], items: List[dict], patient_id: Optional[UUID] = None) -> BillDTO:
+        if patient_id is not None:
+            patient = self._load_patients([patient_id]).get(patient_id)
+            if not patient:
+                raise Exception('Patient not found')
+            patient_name, patient_age = _billed_as(patient, patient_name, patient_age)
+
+        # Quantities per medicine, merging lines that repeat a medicine
+        quantities = {}
         for item in items:
-            medicine = self.medicine_repository.get_by_id(item['medicine_id'])
-            if not medicine or medicine.stock < item['quantity']:
+            quantities[item['medicine_id']] = quantities.get(item['medicine_id'], 0) + item['quantity']
+
+        medicines = {m.id: m for m in self.medicine_repository.get_by_ids(list(quantities))}
+        for medicine_id, quantity in quantities.items():
+            medicine = medicines.get(medicine_id)
+            if not medicine or medicine.stock < quantity:
                 raise Exception('Insufficient stock')
 
-            price_per_unit = item.get('price_per_unit', medicine.price_per_unit)
+        # Take the stock atomically; this is the check that holds under concurrency
+        updated_medicines = self.medicine_repository.decrement_stock(quantities)
+        if updated_medicines is None:
+            raise Exception('Insufficient stock')
+        medicines = {m.id: m for m in updated_medicines}
+
+        bill_items = []
+        total_amount = 0.0
+        for item in items:
+            medicine = medicines[item['medicine_id']]
+            price_per_unit = item.get('price_per_unit')
+            if price_per_unit is None:
+                price_per_unit = medicine.price_per_unit
             total_amount += price_per_unit * item['quantity']
 
             bill_items.append(BillItem(
@@ -31,27 +68,36 @@ class CreateBill:
                 medicine=medicine
             ))
 
-        bill = Bill(id=None, patient_name=patient_name, patient_age=patient_age, bill_items=bill_items, total_amount=total_amount)
+        bill = Bill(id=None, patient_name=patient_name, patient_age=patient_age, bill_items=bill_items, total_amount=total_amount, created_date=datetime.now(timezone.utc), patient_id=patient_id)
+        # Rollups are updated in the same transaction the bill is committed in
+        self.report_repository.record_bills([bill])
         created_bill = self.bill_repository.create(bill)
-
-        for item in created_bill.bill_items:
-            medicine = item.medicine
-            medicine.stock -= item.quantity
-            self.medicine_repository.update(medicine)
+        # Stock changed
+        medicine_catalog_cache.invalidate()
 
         return self._to_bill_dto(created_bill)
 
+    def _load_patients(self, patient_ids: Iterable[UUID]) -> Dict[UUID, Patient]:
+        patient_ids = list(patient_ids)
+        if not patient_ids:
+            return {}
+        if self.patient_repository is None:
+            raise Exception('Bills for registered patients cannot be created here')
+        return {p.patient_id: p for p in self.patient_repository.get_by_ids(patient_ids)}
+
     def _to_bill_dto(self, bill: Bill) -> BillDTO:
         return BillDTO(
             id=bill.id,
             patient_name=bill.patient_name,
             patient_age=bill.patient_age,
             total_amount=bill.total_amount,
+            created_date=bill.created_date,
+            patient_id=bill.patient_id,
             bill_items=[self._to_bill_item_dto(i) for i in bill.bill_items]
         )
 
     def _to_bill_item_dto(self, item: BillItem) -> BillItemDTO:
-        medicine_dto = MedicineDTO(id=item.medicine.id, name=item.medicine.name, price_per_unit=item.medicine.price_per_unit, stock=item.medicine.stock)
+        medicine_dto = MedicineDTO(id=item.medicine.id, name=item.medicine.name, price_per_unit=item.medicine.price_per_unit, stock=item.medicine.stock, version=item.medicine.version)
         return BillItemDTO(
             id=item.id,
             bill_id=item.bill_id,
@@ -60,3 +106,11 @@ class CreateBill:
             price_per_unit=item.price_per_unit,
             medicine=medicine_dto
         )
+
+def _billed_as(patient: Patient, patient_name: Optional[str], patient_age: Optional[int]) -> Tuple[str, int]:
+    """Name and age printed on the bill; the patient's record fills in what was not given."""
+    if not patient_name:
+        patient_name = " ".join(name for name in (patient.first_name, patient.last_name) if name)
+    if patient_age is None:
+        patient_age = patient.age
+    return patient_name, patient_age
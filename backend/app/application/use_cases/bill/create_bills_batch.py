@@ -0,0 +1,151 @@
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+from app.domain.models.bill import Bill, BillItem
+from app.domain.models.medicine import Medicine
+from app.domain.models.patient import Patient
+from app.application.dto.bill_dto import BillBatchResultDTO
+from app.application.use_cases.bill.create_bill import CreateBill, _billed_as
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
+
+MAX_ATTEMPTS = 3
+
+class CreateBillsBatch(CreateBill):
+    """
+    Create many bills at once. Bills are accepted in order while stock lasts;
+    a bill that cannot be filled is reported as failed without affecting the
+    others. All accepted bills are written in one transaction; if that write
+    fails, they are written one at a time so only the bill at fault fails.
+    """
+
+    def execute(self, bills: List[dict]) -> List[BillBatchResultDTO]:
+        medicine_ids = list({item['medicine_id'] for bill in bills for item in bill['items']})
+        patients = self._load_patients({bill['patient_id'] for bill in bills if bill.get('patient_id')})
+
+        for _ in range(MAX_ATTEMPTS):
+            medicines = {m.id: m for m in self.medicine_repository.get_by_ids(medicine_ids)}
+            results = self._try_create(bills, medicines, patients)
+            if results is not None:
+                return results
+
+        return [
+            BillBatchResultDTO(index=index, success=False, error='Stock changed during the batch, please retry')
+            for index in range(len(bills))
+        ]
+
+    def _try_create(self, bills: List[dict], medicines: Dict[int, Medicine], patients: Dict[UUID, Patient]):
+        accepted, errors, quantities = self._allocate(bills, medicines, patients)
+        results = {
+            index: BillBatchResultDTO(index=index, success=False, error=error)
+            for index, error in errors.items()
+        }
+
+        if accepted:
+            try:
+                created_bills = self._write([bill for _, bill in accepted], quantities)
+            except Exception:
+                # The write was rolled back; find the bill at fault
+                for index, bill in accepted:
+                    results[index] = self._write_one(index, bill)
+            else:
+                # Another sale may have taken stock since it was read; if so
+                # nothing was written and the caller allocates again.
+                if created_bills is None:
+                    return None
+                for (index, _), created in zip(accepted, created_bills):
+                    results[index] = BillBatchResultDTO(index=index, success=True, bill=self._to_bill_dto(created))
+            medicine_catalog_cache.invalidate()
+
+        return [results[index] for index in range(len(bills))]
+
+    def _write(self, bills: List[Bill], quantities: Dict[int, int]) -> Optional[List[Bill]]:
+        # None if stock ran short; any other failure is raised after the
+        # repositories have rolled back everything written for these bills
+        updated_medicines = self.medicine_repository.decrement_stock(quantities)
+        if updated_medicines is None:
+            return None
+
+        updated = {m.id: m for m in updated_medicines}
+        for bill in bills:
+            for item in bill.bill_items:
+                item.medicine = updated[item.medicine_id]
+        self.report_repository.record_bills(bills)
+        return self.bill_repository.create_many(bills)
+
+    def _write_one(self, index: int, bill: Bill) -> BillBatchResultDTO:
+        quantities = {}
+        for item in bill.bill_items:
+            quantities[item.medicine_id] = quantities.get(item.medicine_id, 0) + item.quantity
+        try:
+            created = self._write([bill], quantities)
+        except Exception as e:
+            # Refusals carry their reason; database errors are not passed on
+            detail = getattr(e, 'detail', None)
+            error = detail if isinstance(detail, str) else 'Bill could not be saved'
+            return BillBatchResultDTO(index=index, success=False, error=error)
+        if created is None:
+            return BillBatchResultDTO(index=index, success=False, error='Insufficient stock')
+        return BillBatchResultDTO(index=index, success=True, bill=self._to_bill_dto(created[0]))
+
+    def _allocate(self, bills: List[dict], medicines: Dict[int, Medicine], patients: Dict[UUID, Patient]):
+        available = {medicine_id: m.stock for medicine_id, m in medicines.items()}
+        accepted = []
+        errors = {}
+        quantities = {}
+        created_date = datetime.now(timezone.utc)
+
+        for index, bill in enumerate(bills):
+            patient_name, patient_age = bill.get('patient_name'), bill.get('patient_age')
+            if bill.get('patient_id'):
+                patient = patients.get(bill['patient_id'])
+                if not patient:
+                    errors[index] = 'Patient not found'
+                    continue
+                patient_name, patient_age = _billed_as(patient, patient_name, patient_age)
+
+            needed = {}
+            for item in bill['items']:
+                needed[item['medicine_id']] = needed.get(item['medicine_id'], 0) + item['quantity']
+            if any(medicine_id not in medicines for medicine_id in needed):
+                errors[index] = 'Medicine not found'
+                continue
+            if any(item['quantity'] <= 0 or (item.get('price_per_unit') or 0.0) < 0 for item in bill['items']):
+                errors[index] = 'Bill lines must sell a positive quantity at a non-negative price'
+                continue
+            if any(available.get(medicine_id, 0) < quantity for medicine_id, quantity in needed.items()):
+                errors[index] = 'Insufficient stock'
+                continue
+
+            for medicine_id, quantity in needed.items():
+                available[medicine_id] -= quantity
+                quantities[medicine_id] = quantities.get(medicine_id, 0) + quantity
+
+            bill_items = []
+            total_amount = 0.0
+            for item in bill['items']:
+                medicine = medicines[item['medicine_id']]
+                price_per_unit = item.get('price_per_unit')
+                if price_per_unit is None:
+                    price_per_unit = medicine.price_per_unit
+                total_amount += price_per_unit * item['quantity']
+                bill_items.append(BillItem(
+                    id=None,
+                    bill_id=None,
+                    medicine_id=item['medicine_id'],
+                    quantity=item['quantity'],
+                    price_per_unit=price_per_unit,
+                    medicine=medicine
+                ))
+
+            accepted.append((index, Bill(
+                id=None,
+                patient_name=patient_name,
+                patient_age=patient_age,
+                bill_items=bill_items,
+                total_amount=total_amount,
+                created_date=created_date,
+                patient_id=bill.get('patient_id')
+            )))
+
+        return accepted, errors, quantities
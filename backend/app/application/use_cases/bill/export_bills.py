@@ -0,0 +1,42 @@
+
+from datetime import datetime
+from typing import Iterator, Optional
+from app.domain.models.bill import Bill
+from app.domain.repositories.bill_repository import BillRepository
+from app.application.dto.bill_dto import BillDTO, BillItemDTO
+from app.application.dto.medicine_dto import MedicineDTO
+
+class ExportBills:
+    def __init__(self, bill_repository: BillRepository):
+        self.bill_repository = bill_repository
+
+    def execute(
+        self,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[BillDTO]:
+        for bill in self.bill_repository.iter_all(batch_size, created_from=created_from, created_to=created_to):
+            yield self._to_bill_dto(bill)
+
+    def _to_bill_dto(self, bill: Bill) -> BillDTO:
+        return BillDTO(
+            id=bill.id,
+            patient_name=bill.patient_name,
+            patient_age=bill.patient_age,
+            total_amount=bill.total_amount,
+            created_date=bill.created_date,
+            patient_id=bill.patient_id,
+            bill_items=[self._to_bill_item_dto(i) for i in bill.bill_items]
+        )
+
+    def _to_bill_item_dto(self, item) -> BillItemDTO:
+        medicine_dto = MedicineDTO(id=item.medicine.id, name=item.medicine.name, price_per_unit=item.medicine.price_per_unit, stock=item.medicine.stock, version=item.medicine.version)
+        return BillItemDTO(
+            id=item.id,
+            bill_id=item.bill_id,
+            medicine_id=item.medicine_id,
+            quantity=item.quantity,
+            price_per_unit=item.price_per_unit,
+            medicine=medicine_dto
+        )
@@ -1,28 +1,50 @@
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from app.domain.models.bill import Bill
 from app.domain.repositories.bill_repository import BillRepository
-from app.application.dto.bill_dto import BillDTO, BillItemDTO
+from app.application.dto.bill_dto import BillDTO, BillItemDTO, BillPageDTO
 from app.application.dto.medicine_dto import MedicineDTO
 
 class GetAllBills:
     def __init__(self, bill_repository: BillRepository):
         self.bill_repository = bill_repository
 
-    def execute(self) -> List[BillDTO]:
-        bills = self.bill_repository.get_all()
-        return [self._to_bill_dto(b) for b in bills]
+    def execute(
+        self,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        patient_name: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> BillPageDTO:
+        # Fetch one extra row to know whether another page follows
+        bills = self.bill_repository.get_page(
+            limit + 1,
+            before_id=cursor,
+            patient_name=patient_name,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        next_cursor = None
+        if len(bills) > limit:
+            bills = bills[:limit]
+            next_cursor = bills[-1].id
+        return BillPageDTO(items=[self._to_bill_dto(b) for b in bills], next_cursor=next_cursor)
 
     def _to_bill_dto(self, bill: Bill) -> BillDTO:
         return BillDTO(
             id=bill.id,
             patient_name=bill.patient_name,
             patient_age=bill.patient_age,
+            total_amount=bill.total_amount,
+            created_date=bill.created_date,
+            patient_id=bill.patient_id,
             bill_items=[self._to_bill_item_dto(i) for i in bill.bill_items]
         )
     
     def _to_bill_item_dto(self, item) -> BillItemDTO:
-        medicine_dto = MedicineDTO(id=item.medicine.id, name=item.medicine.name, price_per_unit=item.medicine.price_per_unit, stock=item.medicine.stock)
+        medicine_dto = MedicineDTO(id=item.medicine.id, name=item.medicine.name, price_per_unit=item.medicine.price_per_unit, stock=item.medicine.stock, version=item.medicine.version)
         return BillItemDTO(
             id=item.id,
             bill_id=item.bill_id,
@@ -0,0 +1,14 @@
+
+from typing import Optional
+from app.domain.repositories.bill_repository import BillRepository
+from app.application.dto.bill_dto import ReceiptDTO
+
+class GetBillReceipt:
+    def __init__(self, bill_repository: BillRepository):
+        self.bill_repository = bill_repository
+
+    def execute(self, bill_id: int) -> Optional[ReceiptDTO]:
+        receipt = self.bill_repository.get_receipt(bill_id)
+        if not receipt:
+            return None
+        return ReceiptDTO.model_validate(receipt)
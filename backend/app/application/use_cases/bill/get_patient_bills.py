@@ -0,0 +1,34 @@
+
+from typing import Optional
+from uuid import UUID
+from app.domain.repositories.bill_repository import BillRepository
+from app.domain.repositories.patient_repository import PatientRepository
+from app.application.dto.bill_dto import PatientBillsDTO
+from app.application.use_cases.bill.get_all_bills import GetAllBills
+
+class GetPatientBills(GetAllBills):
+    """A registered patient's billing history, newest first, with lifetime totals."""
+
+    def __init__(self, bill_repository: BillRepository, patient_repository: PatientRepository):
+        super().__init__(bill_repository)
+        self.patient_repository = patient_repository
+
+    def execute(self, patient_id: UUID, limit: int = 50, cursor: Optional[int] = None) -> Optional[PatientBillsDTO]:
+        if not self.patient_repository.get_by_id(patient_id):
+            return None
+        # Fetch one extra row to know whether another page follows
+        bills = self.bill_repository.get_patient_page(patient_id, limit + 1, before_id=cursor)
+        next_cursor = None
+        if len(bills) > limit:
+            bills = bills[:limit]
+            next_cursor = bills[-1].id
+        totals = self.bill_repository.get_patient_totals(patient_id)
+        return PatientBillsDTO(
+            patient_id=patient_id,
+            bill_count=totals.bill_count,
+            total_amount=totals.total_amount,
+            first_bill_date=totals.first_bill_date,
+            last_bill_date=totals.last_bill_date,
+            bills=[self._to_bill_dto(b) for b in bills],
+            next_cursor=next_cursor,
+        )
@@ -0,0 +1,63 @@
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+from uuid import UUID
+from app.domain.models.patient import Patient
+from app.domain.repositories.bill_repository import BillRepository
+from app.domain.repositories.patient_repository import PatientRepository
+from app.application.dto.bill_dto import BillLinkResultDTO
+
+BATCH_SIZE = 1000
+
+class LinkBillsToPatients:
+    """
+    Backfill `patient_id` on bills written before bills were linked to
+    patients. A bill is linked when exactly one active patient has the name
+    it was billed under (case and spacing ignored), using the age to tell
+    namesakes apart; anything ambiguous is left unlinked. Bills are read in
+    chunks of BATCH_SIZE in id order and each chunk is committed on its own,
+    so the job can be stopped and rerun at any time.
+    """
+
+    def __init__(self, bill_repository: BillRepository, patient_repository: PatientRepository):
+        self.bill_repository = bill_repository
+        self.patient_repository = patient_repository
+
+    def execute(self) -> BillLinkResultDTO:
+        result = BillLinkResultDTO(scanned=0, linked=0)
+        after_id = None
+        while True:
+            bills = self.bill_repository.get_unlinked(BATCH_SIZE, after_id)
+            if not bills:
+                return result
+            after_id = bills[-1][0]
+            links = self._match(bills)
+            self.bill_repository.link_patients(links)
+            result.scanned += len(bills)
+            result.linked += len(links)
+
+    def _match(self, bills) -> Dict[int, UUID]:
+        # First names may have several words, so every leading run of words
+        # of a billed name is a candidate first name
+        first_names = set()
+        for _, patient_name, _ in bills:
+            words = _name_key(patient_name).split()
+            first_names.update(" ".join(words[:n]) for n in range(1, len(words) + 1))
+        if not first_names:
+            return {}
+
+        patients_by_name: Dict[str, List[Patient]] = defaultdict(list)
+        for patient in self.patient_repository.get_by_first_names(list(first_names)):
+            patients_by_name[_name_key(f"{patient.first_name} {patient.last_name or ''}")].append(patient)
+
+        links = {}
+        for bill_id, patient_name, patient_age in bills:
+            candidates = patients_by_name.get(_name_key(patient_name), [])
+            if len(candidates) > 1:
+                candidates = [p for p in candidates if p.age == patient_age]
+            if len(candidates) == 1:
+                links[bill_id] = candidates[0].patient_id
+        return links
+
+def _name_key(name: Optional[str]) -> str:
+    return " ".join((name or "").lower().split())
@@ -2,6 +2,8 @@
 from app.domain.models.medicine import Medicine
 from app.domain.repositories.medicine_repository import MedicineRepository
 from app.application.dto.medicine_dto import MedicineDTO
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
+from app.application.use_cases.medicine.search_index import medicine_search_index
 
 class AddMedicine:
     def __init__(self, medicine_repository: MedicineRepository):
@@ -10,4 +12,6 @@ class AddMedicine:
     def execute(self, name: str, price_per_unit: float, stock: int) -> MedicineDTO:
         medicine = Medicine(id=None, name=name, price_per_unit=price_per_unit, stock=stock)
         created_medicine = self.medicine_repository.create(medicine)
-        return MedicineDTO(id=created_medicine.id, name=created_medicine.name, price_per_unit=created_medicine.price_per_unit, stock=created_medicine.stock)
+        medicine_catalog_cache.invalidate()
+        medicine_search_index.upsert(created_medicine.id, created_medicine.name)
+        return MedicineDTO(id=created_medicine.id, name=created_medicine.name, price_per_unit=created_medicine.price_per_unit, stock=created_medicine.stock, version=created_medicine.version)
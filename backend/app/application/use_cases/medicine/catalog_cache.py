@@ -0,0 +1,8 @@
+
+from app.core.cache import VersionedCache
+
+# Writes made by this process invalidate the catalog at once; the TTL bounds
+# how long a write made by another worker process can go unseen.
+CATALOG_CACHE_TTL_SECONDS = 30
+
+medicine_catalog_cache = VersionedCache(ttl_seconds=CATALOG_CACHE_TTL_SECONDS)
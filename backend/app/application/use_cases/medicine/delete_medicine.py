@@ -1,5 +1,7 @@
 
 from app.domain.repositories.medicine_repository import MedicineRepository
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
+from app.application.use_cases.medicine.search_index import medicine_search_index
 
 class DeleteMedicine:
     def __init__(self, medicine_repository: MedicineRepository):
@@ -7,3 +9,5 @@ class DeleteMedicine:
 
     def execute(self, id: int):
         self.medicine_repository.delete(id)
+        medicine_catalog_cache.invalidate()
+        medicine_search_index.remove(id)
@@ -1,12 +1,23 @@
 
-from typing import List
+import hashlib
+import json
 from app.domain.repositories.medicine_repository import MedicineRepository
-from app.application.dto.medicine_dto import MedicineDTO
+from app.application.dto.medicine_dto import MedicineDTO, MedicineCatalogDTO
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
 
 class GetAllMedicines:
-    def __init__(self, medicine_repository: MedicineRepository):
+    def __init__(self, medicine_repository: MedicineRepository, source: str = "primary"):
         self.medicine_repository = medicine_repository
+        # Catalogs read from different databases are cached apart, so one
+        # loaded from a lagging replica is never served to primary readers
+        self.source = source
 
-    def execute(self) -> List[MedicineDTO]:
+    def execute(self) -> MedicineCatalogDTO:
+        return medicine_catalog_cache.get_or_load(self._load, self.source)
+
+    def _load(self) -> MedicineCatalogDTO:
         medicines = self.medicine_repository.get_all()
-        return [MedicineDTO(id=m.id, name=m.name, price_per_unit=m.price_per_unit, stock=m.stock) for m in medicines]
+        dtos = [MedicineDTO(id=m.id, name=m.name, price_per_unit=m.price_per_unit, stock=m.stock, version=m.version) for m in medicines]
+        # Derived from the content, so every worker agrees on it
+        content = json.dumps([d.model_dump() for d in dtos], sort_keys=True)
+        return MedicineCatalogDTO(etag=hashlib.sha256(content.encode()).hexdigest()[:32], medicines=dtos)
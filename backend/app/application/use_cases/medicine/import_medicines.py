@@ -0,0 +1,78 @@
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.domain.models.medicine import Medicine
+from app.domain.repositories.medicine_repository import MedicineRepository
+from app.application.dto.medicine_dto import MedicineImportErrorDTO, MedicineImportResultDTO
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
+from app.application.use_cases.medicine.search_index import medicine_search_index
+
+BATCH_SIZE = 1000
+# Only the first errors are listed; the counts cover every row
+MAX_REPORTED_ERRORS = 100
+REQUIRED_FIELDS = ("name", "price_per_unit", "stock")
+
+class ImportMedicines:
+    """
+    Load many medicines at once, e.g. the catalog of a new pharmacy. Rows are
+    validated as they are read and written in batches of BATCH_SIZE, each in
+    its own transaction, so memory stays flat however long the input is.
+    Invalid rows and names that already exist are skipped and reported.
+    """
+
+    def __init__(self, medicine_repository: MedicineRepository):
+        self.medicine_repository = medicine_repository
+
+    def execute(self, rows: Iterable[Dict[str, str]]) -> MedicineImportResultDTO:
+        result = MedicineImportResultDTO(created=0, revived=0, skipped=0, errors=[])
+        seen_names = set()
+        batch: List[Tuple[int, Medicine]] = []
+
+        # Rows are numbered from 1, not counting a header line
+        for row_number, row in enumerate(rows, start=1):
+            medicine, error = _parse_row(row)
+            if medicine is not None and medicine.name in seen_names:
+                error = "Duplicate name in import"
+            if error:
+                _skip(result, row_number, error)
+                continue
+            seen_names.add(medicine.name)
+            batch.append((row_number, medicine))
+            if len(batch) >= BATCH_SIZE:
+                self._write(batch, result)
+                batch = []
+
+        if batch:
+            self._write(batch, result)
+        if result.created or result.revived:
+            medicine_catalog_cache.invalidate()
+            medicine_search_index.invalidate()
+        return result
+
+    def _write(self, batch: List[Tuple[int, Medicine]], result: MedicineImportResultDTO):
+        created, revived, existing = self.medicine_repository.import_batch([medicine for _, medicine in batch])
+        result.created += created
+        result.revived += revived
+        rows_by_name = {medicine.name: row_number for row_number, medicine in batch}
+        for name in existing:
+            _skip(result, rows_by_name[name], "Medicine with this name already exists")
+
+def _parse_row(row: Dict[str, Optional[str]]) -> Tuple[Optional[Medicine], Optional[str]]:
+    missing = [field for field in REQUIRED_FIELDS if not (row.get(field) or "").strip()]
+    if missing:
+        return None, "Missing " + ", ".join(missing)
+    try:
+        price_per_unit = float(row["price_per_unit"])
+    except ValueError:
+        return None, "price_per_unit must be a number"
+    try:
+        stock = int(row["stock"])
+    except ValueError:
+        return None, "stock must be a whole number"
+    if price_per_unit < 0 or stock < 0:
+        return None, "price_per_unit and stock must not be negative"
+    return Medicine(id=None, name=row["name"].strip(), price_per_unit=price_per_unit, stock=stock), None
+
+def _skip(result: MedicineImportResultDTO, row_number: int, error: str):
+    result.skipped += 1
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(MedicineImportErrorDTO(row=row_number, error=error))
@@ -0,0 +1,47 @@
+
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+from app.core.search_index import NgramIndex
+
+# Changes made by this process are applied to the index as they happen; a
+# periodic rebuild picks up changes made by other worker processes.
+INDEX_REFRESH_SECONDS = 300
+
+class MedicineSearchIndex:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._index: Optional[NgramIndex] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, limit: int, load: Callable[[], Iterable[Tuple[int, str]]]) -> List[Tuple[int, float]]:
+        index = self._index
+        if index is None or time.monotonic() - self._built_at > self.refresh_seconds:
+            index = self._rebuild(load)
+        return index.search(query, limit)
+
+    def upsert(self, medicine_id: int, name: str):
+        if self._index is not None:
+            self._index.add(medicine_id, name)
+
+    def remove(self, medicine_id: int):
+        if self._index is not None:
+            self._index.remove(medicine_id)
+
+    def invalidate(self):
+        """Drop the index after a bulk change; the next search rebuilds it."""
+        self._index = None
+
+    def _rebuild(self, load: Callable[[], Iterable[Tuple[int, str]]]) -> NgramIndex:
+        with self._lock:
+            # Another request may have rebuilt it while this one waited
+            if self._index is not None and time.monotonic() - self._built_at <= self.refresh_seconds:
+                return self._index
+            index = NgramIndex()
+            index.add_many(load())
+            self._index = index
+            self._built_at = time.monotonic()
+            return index
+
+medicine_search_index = MedicineSearchIndex(refresh_seconds=INDEX_REFRESH_SECONDS)
@@ -0,0 +1,24 @@
+
+from typing import List
+from app.domain.repositories.medicine_repository import MedicineRepository
+from app.application.dto.medicine_dto import MedicineDTO
+from app.application.use_cases.medicine.search_index import medicine_search_index
+
+class SearchMedicines:
+    def __init__(self, medicine_repository: MedicineRepository):
+        self.medicine_repository = medicine_repository
+
+    def execute(self, query: str, limit: int = 10) -> List[MedicineDTO]:
+        matches = medicine_search_index.search(query, limit, self._load_names)
+        if not matches:
+            return []
+        # Names come from the index; price and stock are read fresh
+        medicines = {m.id: m for m in self.medicine_repository.get_by_ids([medicine_id for medicine_id, _ in matches])}
+        return [
+            MedicineDTO(id=m.id, name=m.name, price_per_unit=m.price_per_unit, stock=m.stock, version=m.version)
+            for m in (medicines.get(medicine_id) for medicine_id, _ in matches)
+            if m is not None
+        ]
+
+    def _load_names(self):
+        return [(m.id, m.name) for m in self.medicine_repository.get_all()]
@@ -1,26 +1,34 @@
 from app.domain.models.medicine import Medicine
 from app.domain.repositories.medicine_repository import MedicineRepository
+from typing import Optional
 from app.application.dto.medicine_dto import MedicineDTO, MedicineUpdateDTO
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
+from app.application.use_cases.medicine.search_index import medicine_search_index
 
 class UpdateMedicine:
     def __init__(self, medicine_repository: MedicineRepository):
         self.medicine_repository = medicine_repository
 
-    def execute(self, id: int, update_dto: MedicineUpdateDTO) -> MedicineDTO:
+    def execute(self, id: int, update_dto: MedicineUpdateDTO, expected_version: Optional[int] = None) -> MedicineDTO:
         medicine = Medicine(
             id=id,
             name=update_dto.name,
             price_per_unit=update_dto.price_per_unit,
-            stock=update_dto.stock
+            stock=update_dto.stock,
+            version=expected_version
         )
 
         updated_medicine = self.medicine_repository.update(medicine)
         if not updated_medicine:
             return None
+        medicine_catalog_cache.invalidate()
+        if update_dto.name is not None:
+            medicine_search_index.upsert(updated_medicine.id, updated_medicine.name)
 
         return MedicineDTO(
             id=updated_medicine.id,
             name=updated_medicine.name,
             price_per_unit=updated_medicine.price_per_unit,
-            stock=updated_medicine.stock
+            stock=updated_medicine.stock,
+            version=updated_medicine.version
         )
@@ -0,0 +1,66 @@
+from typing import Optional
+from app.core.dedup import MatchRecord, find_matches
+from app.domain.repositories.patient_duplicate_repository import PatientDuplicateRepository
+from app.application.dto.patient_dto import (
+    DuplicateScanResultDTO,
+    PatientDTO,
+    PatientDuplicateDTO,
+    PatientDuplicatePageDTO,
+)
+
+
+class FindDuplicatePatients:
+    """
+    Scan all active patients for likely duplicates and store them for
+    review. Patients are only compared within blocks sharing a normalized
+    phone number, similar sounding names or a date of birth, so the work
+    grows with the block sizes rather than with the square of the table.
+    """
+
+    def __init__(self, patient_duplicate_repository: PatientDuplicateRepository):
+        self.patient_duplicate_repository = patient_duplicate_repository
+
+    def execute(self, workers: Optional[int] = None) -> DuplicateScanResultDTO:
+        records = [MatchRecord(*row) for row in self.patient_duplicate_repository.iter_match_records()]
+        matches, skipped_blocks = find_matches(records, workers)
+        added = self.patient_duplicate_repository.add_candidates(
+            [(m.a, m.b, m.score, list(m.reasons)) for m in matches]
+        )
+        return DuplicateScanResultDTO(
+            patients=len(records), candidates=len(matches), added=added, skipped_blocks=skipped_blocks
+        )
+
+
+class ListPatientDuplicates:
+    def __init__(self, patient_duplicate_repository: PatientDuplicateRepository):
+        self.patient_duplicate_repository = patient_duplicate_repository
+
+    def execute(self, limit: int = 20, cursor: Optional[int] = None) -> PatientDuplicatePageDTO:
+        # Fetch one extra row to know whether another page follows
+        duplicates = self.patient_duplicate_repository.get_open(limit + 1, after_id=cursor)
+        next_cursor = None
+        if len(duplicates) > limit:
+            duplicates = duplicates[:limit]
+            next_cursor = duplicates[-1].id
+        return PatientDuplicatePageDTO(
+            items=[PatientDuplicateDTO.model_validate(d) for d in duplicates], next_cursor=next_cursor
+        )
+
+
+class MergePatientDuplicate:
+    def __init__(self, patient_duplicate_repository: PatientDuplicateRepository):
+        self.patient_duplicate_repository = patient_duplicate_repository
+
+    def execute(self, duplicate_id: int) -> Optional[PatientDTO]:
+        patient = self.patient_duplicate_repository.merge(duplicate_id)
+        if not patient:
+            return None
+        return PatientDTO.model_validate(patient)
+
+
+class DismissPatientDuplicate:
+    def __init__(self, patient_duplicate_repository: PatientDuplicateRepository):
+        self.patient_duplicate_repository = patient_duplicate_repository
+
+    def execute(self, duplicate_id: int) -> bool:
+        return self.patient_duplicate_repository.dismiss(duplicate_id)
@@ -1,14 +1,28 @@
-from typing import List, Optional
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+from uuid import UUID
+from app.core.phone import normalize_phone
 from app.domain.repositories.patient_repository import PatientRepository
-from app.application.dto.patient_dto import PatientDTO
+from app.application.dto.patient_dto import PatientDTO, PatientFieldsPageDTO, PatientPageDTO
 from app.domain.models.patient import Patient
 
+# Fields that can be asked for with `fields`
+PATIENT_FIELDS = tuple(PatientDTO.model_fields)
+# Always returned with a field selection: they identify the patient and
+# the version its ETag / If-Match refer to
+ALWAYS_SELECTED = ("patient_id", "version")
+
 
 class GetPatient:
     def __init__(self, patient_repository: PatientRepository):
         self.patient_repository = patient_repository
 
-    def execute(self, patient_id: str) -> Optional[PatientDTO]:
+    def execute(self, patient_id: str, fields: Optional[List[str]] = None) -> Union[PatientDTO, Dict[str, Any], None]:
+        """The patient, or with `fields` only those fields of it as a dict."""
+        if fields is not None:
+            return self.patient_repository.get_fields_by_id(patient_id, select_fields(fields))
         patient = self.patient_repository.get_by_id(patient_id)
         if not patient:
             return None
@@ -19,8 +33,106 @@ class ListPatients:
     def __init__(self, patient_repository: PatientRepository):
         self.patient_repository = patient_repository
 
-    def execute(self, skip: int = 0, limit: int = 10) -> List[PatientDTO]:
-        patients = self.patient_repository.list_patients(skip, limit)
+    def execute(
+        self, limit: int = 10, cursor: Optional[str] = None, skip: int = 0, fields: Optional[List[str]] = None
+    ) -> Union[PatientPageDTO, PatientFieldsPageDTO]:
+        """
+        Patients in the order they were registered. Pass `next_cursor` back
+        as `cursor` for the next page; `skip` is only honoured without a
+        cursor and is kept for older clients. With `fields`, only those
+        fields are read and each patient is a dict.
+        """
+        if fields is not None:
+            return self._execute_fields(select_fields(fields), limit, cursor, skip)
+        # Fetch one extra row to know whether another page follows
+        if cursor is not None:
+            patients = self.patient_repository.get_page(limit + 1, after=decode_cursor(cursor))
+        elif skip:
+            patients = self.patient_repository.list_patients(skip, limit + 1)
+        else:
+            patients = self.patient_repository.get_page(limit + 1)
+        next_cursor = None
+        if len(patients) > limit:
+            patients = patients[:limit]
+            next_cursor = encode_cursor(patients[-1].create_at, patients[-1].patient_id)
+        return PatientPageDTO(
+            items=[PatientDTO.model_validate(p) for p in patients],
+            next_cursor=next_cursor,
+            total_estimate=self.patient_repository.estimate_count(),
+        )
+
+
+    def _execute_fields(self, fields: List[str], limit: int, cursor: Optional[str], skip: int) -> PatientFieldsPageDTO:
+        # The cursor is made from create_at, so it is read even if not asked for
+        columns = fields if "create_at" in fields else fields + ["create_at"]
+        if cursor is not None:
+            rows = self.patient_repository.get_page_fields(columns, limit + 1, after=decode_cursor(cursor))
+        elif skip:
+            rows = self.patient_repository.list_patient_fields(columns, skip, limit + 1)
+        else:
+            rows = self.patient_repository.get_page_fields(columns, limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["create_at"], rows[-1]["patient_id"])
+        if columns is not fields:
+            for row in rows:
+                del row["create_at"]
+        return PatientFieldsPageDTO(
+            items=rows,
+            next_cursor=next_cursor,
+            total_estimate=self.patient_repository.estimate_count(),
+        )
+
+
+def select_fields(fields: List[str]) -> List[str]:
+    """
+    The requested fields plus ALWAYS_SELECTED, without repeats; raises
+    ValueError for a name that is not a PatientDTO field.
+    """
+    unknown = [field for field in fields if field not in PATIENT_FIELDS]
+    if unknown:
+        raise ValueError("Unknown fields: " + ", ".join(unknown))
+    return list(dict.fromkeys([*ALWAYS_SELECTED, *fields]))
+
+
+def encode_cursor(created_date: datetime, patient_id: UUID) -> str:
+    raw = f"{created_date.isoformat()}|{patient_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of `encode_cursor`; raises ValueError for anything else."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_date, patient_id = raw.split("|")
+        return datetime.fromisoformat(created_date), UUID(patient_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+class SearchPatients:
+    """
+    Lookup for the reception desk. A query that looks like a phone number
+    ("+91-98450", "98450 12") is matched on the number's leading digits;
+    anything else is matched on the start of the first and last names.
+    """
+
+    # Shorter digit strings are treated as names, e.g. "Ward 3"
+    MIN_PHONE_DIGITS = 3
+
+    def __init__(self, patient_repository: PatientRepository):
+        self.patient_repository = patient_repository
+
+    def execute(self, query: str, limit: int = 10) -> List[PatientDTO]:
+        digits = normalize_phone(query)
+        if len(digits) >= self.MIN_PHONE_DIGITS and not any(c.isalpha() for c in query):
+            patients = self.patient_repository.search_by_phone(digits, limit)
+        else:
+            words = query.lower().split()
+            if not words:
+                return []
+            patients = self.patient_repository.search_by_name(words, limit)
         return [PatientDTO.model_validate(p) for p in patients]
 
 
@@ -28,8 +140,8 @@ class UpdatePatient:
     def __init__(self, patient_repository: PatientRepository):
         self.patient_repository = patient_repository
 
-    def execute(self, patient_id: str, patient_data: dict) -> Optional[PatientDTO]:
-        patient = self.patient_repository.update(patient_id, patient_data)
+    def execute(self, patient_id: str, patient_data: dict, expected_version: Optional[int] = None) -> Optional[PatientDTO]:
+        patient = self.patient_repository.update(patient_id, patient_data, expected_version)
         if not patient:
             return None
         return PatientDTO.model_validate(patient)
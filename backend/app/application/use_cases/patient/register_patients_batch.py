@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Dict, List
+from app.domain.models.patient import Patient, PatientType
+from app.domain.repositories.patient_repository import PatientRepository
+from app.application.dto.patient_dto import PatientBatchResultDTO, PatientDTO
+
+
+class RegisterPatientsBatch:
+    """
+    Register many patients at once, e.g. when moving an existing registry
+    over. Duplicates are resolved for the whole batch together and the new
+    patients are written in one transaction. Each row reports whether it
+    was created, revived, already registered or invalid, in request order.
+    """
+
+    def __init__(self, patient_repository: PatientRepository):
+        self.patient_repository = patient_repository
+
+    def execute(self, patients: List[dict]) -> List[PatientBatchResultDTO]:
+        results: Dict[int, PatientBatchResultDTO] = {}
+        accepted: Dict[str, int] = {}
+
+        for index, data in enumerate(patients):
+            error = _validate(data)
+            if error:
+                results[index] = PatientBatchResultDTO(index=index, status="invalid", error=error)
+            elif data["phone_number"] in accepted:
+                results[index] = PatientBatchResultDTO(index=index, status="duplicate", error="Duplicate phone number in batch")
+            else:
+                accepted[data["phone_number"]] = index
+
+        batch = [_to_patient(patients[index]) for index in accepted.values()]
+        created, revived = self.patient_repository.create_many(batch) if batch else ([], [])
+        for status, written in (("created", created), ("revived", revived)):
+            for patient in written:
+                index = accepted[patient.phone_number]
+                results[index] = PatientBatchResultDTO(index=index, status=status, patient=PatientDTO.model_validate(patient))
+        for index in accepted.values():
+            if index not in results:
+                results[index] = PatientBatchResultDTO(
+                    index=index, status="duplicate", error="Patient with this phone number already exists"
+                )
+
+        return [results[index] for index in range(len(patients))]
+
+
+def _validate(data: dict):
+    if data.get("date_of_birth"):
+        try:
+            datetime.fromisoformat(data["date_of_birth"])
+        except ValueError:
+            return "date_of_birth must be an ISO date"
+    if data.get("patient_type", "ADULT") not in PatientType.__members__:
+        return "patient_type must be one of " + ", ".join(PatientType.__members__)
+    return None
+
+
+def _to_patient(data: dict) -> Patient:
+    return Patient(
+        patient_id=None,
+        first_name=data["first_name"],
+        last_name=data.get("last_name"),
+        date_of_birth=data.get("date_of_birth"),
+        age=data["age"],
+        gender=data["gender"],
+        phone_number=data["phone_number"],
+        email=data.get("email"),
+        address=data.get("address"),
+        patient_type=PatientType(data.get("patient_type", "ADULT")),
+        guardian_name=data.get("guardian_name"),
+        guardian_phone=data.get("guardian_phone"),
+        create_at=None,
+        updated_at=None,
+    )
@@ -0,0 +1,36 @@
+
+from datetime import date
+from typing import List
+from app.domain.repositories.bill_repository import BillRepository
+from app.domain.repositories.report_repository import ReportRepository
+from app.application.dto.report_dto import DailyRevenueDTO, RevenueReportDTO, MedicineSalesDTO
+
+class GetRevenueReport:
+    def __init__(self, report_repository: ReportRepository):
+        self.report_repository = report_repository
+
+    def execute(self, date_from: date, date_to: date) -> RevenueReportDTO:
+        days = [DailyRevenueDTO.model_validate(d) for d in self.report_repository.get_daily_revenue(date_from, date_to)]
+        return RevenueReportDTO(
+            date_from=date_from,
+            date_to=date_to,
+            revenue=sum(d.revenue for d in days),
+            units_sold=sum(d.units_sold for d in days),
+            bill_count=sum(d.bill_count for d in days),
+            days=days,
+        )
+
+class GetMedicineSalesReport:
+    def __init__(self, report_repository: ReportRepository):
+        self.report_repository = report_repository
+
+    def execute(self, date_from: date, date_to: date) -> List[MedicineSalesDTO]:
+        return [MedicineSalesDTO.model_validate(m) for m in self.report_repository.get_medicine_sales(date_from, date_to)]
+
+class RebuildRevenueRollups:
+    def __init__(self, bill_repository: BillRepository, report_repository: ReportRepository):
+        self.bill_repository = bill_repository
+        self.report_repository = report_repository
+
+    def execute(self):
+        self.report_repository.rebuild(self.bill_repository.iter_all())
@@ -0,0 +1,78 @@
+from datetime import date, datetime
+from typing import List, Optional
+from app.domain.models.stock import RECEIPT, ADJUSTMENT
+from app.domain.repositories.stock_repository import StockRepository
+from app.application.dto.stock_dto import MedicineLotDTO, StockMovementDTO, StockMovementPageDTO, StockLevelDTO
+from app.application.use_cases.medicine.catalog_cache import medicine_catalog_cache
+
+class RecordStockMovement:
+    """Record stock received from a supplier, or a correction after a count."""
+
+    def __init__(self, stock_repository: StockRepository):
+        self.stock_repository = stock_repository
+
+    def execute(self, medicine_id: int, kind: str, quantity: int, note: Optional[str] = None, lot_id: Optional[int] = None) -> StockMovementDTO:
+        if kind not in (RECEIPT, ADJUSTMENT):
+            raise Exception('Only receipts and adjustments can be recorded directly')
+        if quantity == 0 or (kind == RECEIPT and quantity < 0):
+            raise Exception('Quantity must be positive for receipts and non-zero for adjustments')
+
+        movement = self.stock_repository.record(medicine_id, kind, quantity, note, lot_id)
+        if movement is None:
+            raise Exception('Insufficient stock')
+        medicine_catalog_cache.invalidate()
+        return StockMovementDTO.model_validate(movement)
+
+class ReceiveLot:
+    """Record a delivery of one batch, tracked by batch number and expiry date."""
+
+    def __init__(self, stock_repository: StockRepository):
+        self.stock_repository = stock_repository
+
+    def execute(self, medicine_id: int, batch_number: str, expiry_date: date, quantity: int, note: Optional[str] = None) -> MedicineLotDTO:
+        if quantity <= 0:
+            raise Exception('Quantity must be positive')
+        lot = self.stock_repository.receive_lot(medicine_id, batch_number.strip(), expiry_date, quantity, note)
+        medicine_catalog_cache.invalidate()
+        return MedicineLotDTO.model_validate(lot)
+
+class GetMedicineLots:
+    def __init__(self, stock_repository: StockRepository):
+        self.stock_repository = stock_repository
+
+    def execute(self, medicine_id: int) -> List[MedicineLotDTO]:
+        return [MedicineLotDTO.model_validate(lot) for lot in self.stock_repository.get_lots(medicine_id)]
+
+class GetExpiringLots:
+    def __init__(self, stock_repository: StockRepository):
+        self.stock_repository = stock_repository
+
+    def execute(self, expiring_by: date, limit: int = 100) -> List[MedicineLotDTO]:
+        return [MedicineLotDTO.model_validate(lot) for lot in self.stock_repository.get_expiring(expiring_by, limit)]
+
+class GetStockMovements:
+    def __init__(self, stock_repository: StockRepository):
+        self.stock_repository = stock_repository
+
+    def execute(self, medicine_id: int, limit: int = 50, cursor: Optional[int] = None) -> StockMovementPageDTO:
+        # Fetch one extra row to know whether another page follows
+        movements = self.stock_repository.get_movements(medicine_id, limit + 1, before_id=cursor)
+        next_cursor = None
+        if len(movements) > limit:
+            movements = movements[:limit]
+            next_cursor = movements[-1].id
+        return StockMovementPageDTO(items=[StockMovementDTO.model_validate(m) for m in movements], next_cursor=next_cursor)
+
+class GetStockLevel:
+    def __init__(self, stock_repository: StockRepository):
+        self.stock_repository = stock_repository
+
+    def execute(self, medicine_id: int, at: datetime) -> StockLevelDTO:
+        return StockLevelDTO(medicine_id=medicine_id, stock=self.stock_repository.get_stock_at(medicine_id, at), at=at)
+
+class CompactStockSnapshots:
+    def __init__(self, stock_repository: StockRepository):
+        self.stock_repository = stock_repository
+
+    def execute(self) -> int:
+        return self.stock_repository.compact()
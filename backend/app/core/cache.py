@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl_seconds`."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class VersionedCache:
+    """
+    A cached value, loaded on demand and dropped by `invalidate()`.
+    Entries also expire after `ttl_seconds`, which bounds staleness when the
+    data is changed by another process. Values loaded from different
+    sources are kept apart by `key`; `invalidate()` drops them all.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, loader: Callable[[], Any], key: Hashable = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            version = self._version
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        value = loader()
+        with self._lock:
+            # Keep the result only if nothing was invalidated while loading
+            if self._version == version:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
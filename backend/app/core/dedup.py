@@ -0,0 +1,172 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.search_index import normalize, trigrams
+
+# A pair is proposed when its score reaches MIN_SCORE. Name similarity
+# alone never does; it takes a shared phone number or date of birth too,
+# and differing dates of birth count against a pair.
+NAME_WEIGHT = 0.6
+PHONE_WEIGHT = 0.3
+DOB_WEIGHT = 0.3
+MIN_SCORE = 0.65
+# Names at least this similar are listed as a reason
+SIMILAR_NAME = 0.5
+# Shorter numbers are too likely to be placeholders to block on
+MIN_PHONE_LENGTH = 8
+# Larger blocks (e.g. a placeholder phone shared by thousands of rows)
+# would make the job quadratic again; they are skipped and counted
+MAX_BLOCK_SIZE = 1000
+# Blocks are handed to the workers in tasks of about this many comparisons
+PAIRS_PER_TASK = 200_000
+
+
+class MatchRecord(NamedTuple):
+    key: Hashable
+    first_name: str
+    last_name: str
+    # ISO date
+    date_of_birth: Optional[str]
+    # Normalized phone number
+    phone: str
+
+
+class Match(NamedTuple):
+    a: Hashable
+    b: Hashable
+    score: float
+    reasons: Tuple[str, ...]
+
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"), "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+
+def soundex(word: str) -> str:
+    """American Soundex, e.g. "Robert" and "Rupert" are both "r163"."""
+    word = "".join(c for c in word.lower() if c.isalpha() and c.isascii())
+    if not word:
+        return ""
+    code = word[0]
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for c in word[1:]:
+        digit = _SOUNDEX_CODES.get(c, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code; vowels do
+        if c not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def blocking_keys(record: MatchRecord) -> List[tuple]:
+    """Records are only compared with records sharing at least one key."""
+    first_name = normalize(record.first_name or "")
+    last_name = normalize(record.last_name or "")
+    keys = []
+    if len(record.phone) >= MIN_PHONE_LENGTH:
+        keys.append(("phone", record.phone))
+    if first_name:
+        keys.append(("name", soundex(first_name), soundex(last_name)))
+    if record.date_of_birth:
+        keys.append(("dob", record.date_of_birth, first_name[:1]))
+    return keys
+
+
+def score(a: MatchRecord, b: MatchRecord) -> Tuple[float, Tuple[str, ...]]:
+    return _score(a, b, _name_grams(a), _name_grams(b))
+
+
+def find_matches(records: Sequence[MatchRecord], workers: Optional[int] = None) -> Tuple[List[Match], int]:
+    """
+    Likely duplicates among `records`, best first, and the number of blocks
+    skipped for being larger than MAX_BLOCK_SIZE. Blocks are scored in
+    parallel by `workers` processes (one per CPU by default).
+    """
+    blocks: Dict[tuple, List[int]] = defaultdict(list)
+    for i, record in enumerate(records):
+        for key in blocking_keys(record):
+            blocks[key].append(i)
+
+    tasks, task, task_pairs, skipped = [], [], 0, 0
+    for block in blocks.values():
+        if len(block) > MAX_BLOCK_SIZE:
+            skipped += 1
+            continue
+        if len(block) < 2:
+            continue
+        task.append(block)
+        task_pairs += len(block) * (len(block) - 1) // 2
+        if task_pairs >= PAIRS_PER_TASK:
+            tasks.append(task)
+            task, task_pairs = [], 0
+    if task:
+        tasks.append(task)
+
+    # A pair sharing several keys is scored once per block; keep one
+    best: Dict[Tuple[int, int], Tuple[float, Tuple[str, ...]]] = {}
+    if tasks:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(records,)) as pool:
+            for pairs in pool.map(_score_blocks, tasks):
+                for i, j, pair_score, reasons in pairs:
+                    best[(i, j)] = (pair_score, reasons)
+
+    matches = [Match(records[i].key, records[j].key, pair_score, reasons) for (i, j), (pair_score, reasons) in best.items()]
+    matches.sort(key=lambda m: -m.score)
+    return matches, skipped
+
+
+# Set in each worker process, so tasks only carry record positions
+_records: Sequence[MatchRecord] = ()
+
+
+def _init_worker(records: Sequence[MatchRecord]):
+    global _records
+    _records = records
+
+
+def _score_blocks(blocks: List[List[int]]) -> List[Tuple[int, int, float, Tuple[str, ...]]]:
+    grams = {}
+    seen = set()
+    pairs = []
+    for block in blocks:
+        for i in block:
+            if i not in grams:
+                grams[i] = _name_grams(_records[i])
+        for x, i in enumerate(block):
+            for j in block[x + 1:]:
+                pair = (i, j) if i < j else (j, i)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                pair_score, reasons = _score(_records[pair[0]], _records[pair[1]], grams[pair[0]], grams[pair[1]])
+                if pair_score >= MIN_SCORE:
+                    pairs.append((pair[0], pair[1], pair_score, reasons))
+    return pairs
+
+
+def _name_grams(record: MatchRecord):
+    return trigrams(normalize(f"{record.first_name or ''} {record.last_name or ''}"))
+
+
+def _score(a: MatchRecord, b: MatchRecord, a_grams, b_grams) -> Tuple[float, Tuple[str, ...]]:
+    shared = len(a_grams & b_grams)
+    union = len(a_grams) + len(b_grams) - shared
+    name_similarity = shared / union if union else 0.0
+    total = NAME_WEIGHT * name_similarity
+    reasons = ["name"] if name_similarity >= SIMILAR_NAME else []
+    if a.phone and a.phone == b.phone:
+        total += PHONE_WEIGHT
+        reasons.append("phone")
+    if a.date_of_birth and b.date_of_birth:
+        if a.date_of_birth == b.date_of_birth:
+            total += DOB_WEIGHT
+            reasons.append("date_of_birth")
+        else:
+            total -= DOB_WEIGHT
+    return round(total, 3), tuple(reasons)
@@ -0,0 +1,23 @@
+import re
+
+# Numbers are stored as entered; lookups compare them without the
+# country code, trunk prefix and punctuation
+COUNTRY_CODE = "91"
+NATIONAL_NUMBER_LENGTH = 10
+
+_INTERNATIONAL_PREFIX = re.compile(r"^\s*(\+|00)" + COUNTRY_CODE)
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Digits of the national number, e.g. "+91-98450 12345", "098450-12345"
+    and "9845012345" all become "9845012345". Partial numbers keep their
+    digits, so a normalized prefix still matches the stored value.
+    """
+    digits = _NON_DIGITS.sub("", _INTERNATIONAL_PREFIX.sub("", phone or ""))
+    if len(digits) == NATIONAL_NUMBER_LENGTH + len(COUNTRY_CODE) and digits.startswith(COUNTRY_CODE):
+        return digits[len(COUNTRY_CODE):]
+    if len(digits) == NATIONAL_NUMBER_LENGTH + 1 and digits.startswith("0"):
+        return digits[1:]
+    return digits
@@ -0,0 +1,165 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Queries must share at least this much of their trigrams with a name to
+# count as a fuzzy match
+MIN_SIMILARITY = 0.25
+PREFIX_BONUS = 1.0
+WORD_PREFIX_BONUS = 0.5
+# Trigrams found in more names than this (e.g. from "tablet" or "500mg") are
+# too common to find candidates with; they still count when scoring
+COMMON_GRAM_FRACTION = 0.05
+MIN_COMMON_GRAM_POSTINGS = 1000
+# Shorter queries are matched by prefix only; their trigrams say too little
+MIN_FUZZY_QUERY_LENGTH = 3
+# Upper bound on words visited for one prefix lookup, so one-letter queries stay cheap
+MAX_PREFIX_SCAN = 200
+
+
+def normalize(text: str) -> str:
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of each word, padded like pg_trgm so word starts weigh more."""
+    grams = set()
+    for word in text.split():
+        padded = "  " + word + " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """
+    In-memory index for typo-tolerant, ranked lookups by name. Combines a
+    trigram inverted index (fuzzy matches) with a sorted word list (prefix
+    matches). Entries can be added, replaced and removed one at a time.
+    """
+
+    def __init__(self):
+        self._names: Dict[int, str] = {}
+        self._grams: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._words: List[Tuple[str, int]] = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, doc_id: int, name: str):
+        with self._lock:
+            if doc_id in self._names:
+                self.remove(doc_id)
+            for word in self._index(doc_id, name):
+                bisect.insort(self._words, (word, doc_id))
+
+    def add_many(self, entries: Iterable[Tuple[int, str]]):
+        """Bulk load; sorts the word list once instead of per entry."""
+        with self._lock:
+            for doc_id, name in entries:
+                if doc_id in self._names:
+                    self.remove(doc_id)
+                self._words.extend((word, doc_id) for word in self._index(doc_id, name))
+            self._words.sort()
+
+    def _index(self, doc_id: int, name: str) -> Set[str]:
+        normalized = normalize(name)
+        grams = trigrams(normalized)
+        self._names[doc_id] = normalized
+        self._grams[doc_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc_id)
+        return set(normalized.split())
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            normalized = self._names.pop(doc_id, None)
+            if normalized is None:
+                return
+            for gram in self._grams.pop(doc_id):
+                postings = self._postings[gram]
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+            for word in set(normalized.split()):
+                i = bisect.bisect_left(self._words, (word, doc_id))
+                if i < len(self._words) and self._words[i] == (word, doc_id):
+                    del self._words[i]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Best matching ids with their scores, highest first."""
+        query = normalize(query)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+
+        with self._lock:
+            scores: Dict[int, float] = {}
+
+            # A name with similarity >= MIN_SIMILARITY shares at least
+            # `min_overlap` trigrams with the query. Shared trigrams are counted
+            # over the posting lists in one pass, and only names that can still
+            # reach the threshold get an exact score.
+            min_overlap = max(1, math.ceil(MIN_SIMILARITY * len(query_grams)))
+            common = max(MIN_COMMON_GRAM_POSTINGS, COMMON_GRAM_FRACTION * len(self._names))
+            shared = Counter()
+            common_grams = 0
+            fuzzy_grams = query_grams if len(query) >= MIN_FUZZY_QUERY_LENGTH else ()
+            for gram in fuzzy_grams:
+                postings = self._postings.get(gram, ())
+                if len(postings) > common:
+                    common_grams += 1
+                else:
+                    shared.update(postings)
+            needed = max(1, min_overlap - common_grams)
+            query_size = len(query_grams)
+            bounds = []
+            for doc_id, count in shared.items():
+                if count < needed:
+                    continue
+                # Best case: every common trigram is shared as well
+                best = count + common_grams
+                bound = best / (query_size + len(self._grams[doc_id]) - best)
+                if bound >= MIN_SIMILARITY:
+                    bounds.append((bound, doc_id))
+
+            # Score exactly in order of the upper bound, stopping once no
+            # remaining name can beat the current top `limit`
+            bounds.sort(reverse=True)
+            top = []
+            for bound, doc_id in bounds:
+                if len(top) >= limit and bound <= top[0]:
+                    break
+                similarity = self._similarity(query_grams, doc_id)
+                if similarity >= MIN_SIMILARITY:
+                    scores[doc_id] = similarity
+                    if len(top) < limit:
+                        heapq.heappush(top, similarity)
+                    else:
+                        heapq.heappushpop(top, similarity)
+
+            # Prefix matches on any word of the name, found by bisecting the word list
+            first_word = query.split()[0]
+            i = bisect.bisect_left(self._words, (first_word,))
+            end = min(len(self._words), i + MAX_PREFIX_SCAN)
+            while i < end and self._words[i][0].startswith(first_word):
+                doc_id = self._words[i][1]
+                name = self._names[doc_id]
+                if query in name:
+                    bonus = PREFIX_BONUS if name.startswith(query) else WORD_PREFIX_BONUS
+                    scores[doc_id] = max(scores.get(doc_id, 0.0), self._similarity(query_grams, doc_id) + bonus)
+                i += 1
+
+            return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self._names[item[0]]))
+
+    def _similarity(self, query_grams: Set[str], doc_id: int) -> float:
+        doc_grams = self._grams[doc_id]
+        shared = len(query_grams & doc_grams)
+        return shared / (len(query_grams) + len(doc_grams) - shared)
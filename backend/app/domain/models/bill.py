@@ -1,6 +1,8 @@
 
 from dataclasses import dataclass
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
 from .medicine import Medicine
 
 @dataclass
@@ -19,3 +21,32 @@ class Bill:
     patient_age: int
     bill_items: List[BillItem]
     total_amount: float = 0.0
+    created_date: Optional[datetime] = None
+    patient_id: Optional[UUID] = None
+
+@dataclass
+class BillTotals:
+    bill_count: int = 0
+    total_amount: float = 0.0
+    first_bill_date: Optional[datetime] = None
+    last_bill_date: Optional[datetime] = None
+
+@dataclass
+class ReceiptItem:
+    medicine_id: int
+    medicine_name: str
+    quantity: int
+    price_per_unit: float
+
+    @property
+    def line_total(self) -> float:
+        return self.price_per_unit * self.quantity
+
+@dataclass
+class Receipt:
+    bill_id: int
+    patient_name: str
+    patient_age: int
+    total_amount: float
+    items: List[ReceiptItem]
+    created_date: Optional[datetime] = None
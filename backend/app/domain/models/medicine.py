@@ -7,3 +7,4 @@ class Medicine:
     name: Optional[str] = None
     price_per_unit: Optional[float] = None
     stock: Optional[int] = None
+    version: Optional[int] = None
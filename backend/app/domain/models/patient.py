@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -29,3 +29,15 @@ class Patient:
     patient_type: PatientType = PatientType.ADULT
     guardian_name: Optional[str] = None
     guardian_phone: Optional[str] = None
+    version: Optional[int] = None
+
+
+@dataclass
+class PatientDuplicate:
+    id: int
+    patient_a: Patient
+    patient_b: Patient
+    score: float
+    reasons: List[str]
+    status: str = "open"
+    created_date: Optional[datetime] = None
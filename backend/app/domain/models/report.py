@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+@dataclass
+class DailyRevenue:
+    day: date
+    revenue: float = 0.0
+    units_sold: int = 0
+    bill_count: int = 0
+
+@dataclass
+class MedicineSales:
+    medicine_id: int
+    medicine_name: Optional[str] = None
+    revenue: float = 0.0
+    units_sold: int = 0
+    bill_count: int = 0
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+SALE = "SALE"
+RECEIPT = "RECEIPT"
+ADJUSTMENT = "ADJUSTMENT"
+
+@dataclass
+class StockMovement:
+    id: int
+    medicine_id: int
+    kind: str
+    quantity: int
+    note: Optional[str] = None
+    created_date: Optional[datetime] = None
+    lot_id: Optional[int] = None
+
+@dataclass
+class MedicineLot:
+    id: int
+    medicine_id: int
+    batch_number: str
+    expiry_date: date
+    remaining: int = 0
+    received_date: Optional[datetime] = None
+    medicine_name: Optional[str] = None
@@ -1,7 +1,9 @@
 
 from abc import ABC, abstractmethod
-from typing import List
-from app.domain.models.bill import Bill
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from app.domain.models.bill import Bill, BillTotals, Receipt
 
 class BillRepository(ABC):
 
@@ -9,10 +11,54 @@ class BillRepository(ABC):
     def get_all(self) -> List[Bill]:
         pass
 
+    @abstractmethod
+    def get_page(
+        self,
+        limit: int,
+        before_id: Optional[int] = None,
+        patient_name: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Bill]:
+        pass
+
+    @abstractmethod
+    def get_patient_page(self, patient_id: UUID, limit: int, before_id: Optional[int] = None) -> List[Bill]:
+        pass
+
+    @abstractmethod
+    def get_patient_totals(self, patient_id: UUID) -> BillTotals:
+        pass
+
+    @abstractmethod
+    def get_unlinked(self, limit: int, after_id: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        pass
+
+    @abstractmethod
+    def link_patients(self, patient_ids: Dict[int, UUID]):
+        pass
+
+    @abstractmethod
+    def iter_all(
+        self,
+        batch_size: int = 1000,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Iterator[Bill]:
+        pass
+
     @abstractmethod
     def get_by_id(self, bill_id: int) -> Bill:
         pass
 
+    @abstractmethod
+    def get_receipt(self, bill_id: int) -> Optional[Receipt]:
+        pass
+
     @abstractmethod
     def create(self, bill: Bill) -> Bill:
         pass
+
+    @abstractmethod
+    def create_many(self, bills: List[Bill]) -> List[Bill]:
+        pass
@@ -1,6 +1,6 @@
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from app.domain.models.medicine import Medicine
 
 class MedicineRepository(ABC):
@@ -13,10 +13,22 @@ class MedicineRepository(ABC):
     def get_by_id(self, medicine_id: int) -> Medicine:
         pass
 
+    @abstractmethod
+    def get_by_ids(self, medicine_ids: List[int]) -> List[Medicine]:
+        pass
+
+    @abstractmethod
+    def decrement_stock(self, quantities: Dict[int, int]) -> Optional[List[Medicine]]:
+        pass
+
     @abstractmethod
     def create(self, medicine: Medicine) -> Medicine:
         pass
 
+    @abstractmethod
+    def import_batch(self, medicines: List[Medicine]) -> Tuple[int, int, List[str]]:
+        pass
+
     @abstractmethod
     def update(self, medicine: Medicine) -> Medicine:
         pass
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
+from uuid import UUID
+from app.domain.models.patient import Patient, PatientDuplicate
+
+
+class PatientDuplicateRepository(ABC):
+
+    @abstractmethod
+    def iter_match_records(self) -> Iterator[Tuple[UUID, str, Optional[str], Optional[str], str]]:
+        pass
+
+    @abstractmethod
+    def add_candidates(self, candidates: List[Tuple[UUID, UUID, float, List[str]]]) -> int:
+        pass
+
+    @abstractmethod
+    def get_open(self, limit: int, after_id: Optional[int] = None) -> List[PatientDuplicate]:
+        pass
+
+    @abstractmethod
+    def merge(self, duplicate_id: int) -> Optional[Patient]:
+        pass
+
+    @abstractmethod
+    def dismiss(self, duplicate_id: int) -> bool:
+        pass
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
 from app.domain.models.patient import Patient
 
 
@@ -9,16 +11,56 @@ class PatientRepository(ABC):
     def create(self, patient: Patient) -> Patient:
         pass
 
+    @abstractmethod
+    def create_many(self, patients: List[Patient]) -> Tuple[List[Patient], List[Patient]]:
+        pass
+
     @abstractmethod
     def get_by_id(self, patient_id: str) -> Patient:
         pass
 
+    @abstractmethod
+    def get_by_ids(self, patient_ids: List[UUID]) -> List[Patient]:
+        pass
+
+    @abstractmethod
+    def get_by_first_names(self, first_names: List[str]) -> List[Patient]:
+        pass
+
     @abstractmethod
     def list_patients(self, skip: int = 0, limit: int = 10) -> List[Patient]:
         pass
 
     @abstractmethod
-    def update(self, patient_id: str, patient_data: dict) -> Patient:
+    def get_page(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> List[Patient]:
+        pass
+
+    @abstractmethod
+    def get_fields_by_id(self, patient_id: str, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def list_patient_fields(self, fields: Sequence[str], skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def get_page_fields(self, fields: Sequence[str], limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def search_by_phone(self, digits: str, limit: int) -> List[Patient]:
+        pass
+
+    @abstractmethod
+    def search_by_name(self, words: List[str], limit: int) -> List[Patient]:
+        pass
+
+    @abstractmethod
+    def estimate_count(self) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def update(self, patient_id: str, patient_data: dict, expected_version: Optional[int] = None) -> Patient:
         pass
 
     @abstractmethod
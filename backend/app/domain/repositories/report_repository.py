@@ -0,0 +1,24 @@
+
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Iterable, List
+from app.domain.models.bill import Bill
+from app.domain.models.report import DailyRevenue, MedicineSales
+
+class ReportRepository(ABC):
+
+    @abstractmethod
+    def record_bills(self, bills: List[Bill]):
+        pass
+
+    @abstractmethod
+    def get_daily_revenue(self, date_from: date, date_to: date) -> List[DailyRevenue]:
+        pass
+
+    @abstractmethod
+    def get_medicine_sales(self, date_from: date, date_to: date) -> List[MedicineSales]:
+        pass
+
+    @abstractmethod
+    def rebuild(self, bills: Iterable[Bill]):
+        pass
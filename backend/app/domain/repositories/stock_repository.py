@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import List, Optional
+from app.domain.models.stock import MedicineLot, StockMovement
+
+class StockRepository(ABC):
+
+    @abstractmethod
+    def record(self, medicine_id: int, kind: str, quantity: int, note: Optional[str] = None, lot_id: Optional[int] = None) -> Optional[StockMovement]:
+        pass
+
+    @abstractmethod
+    def receive_lot(self, medicine_id: int, batch_number: str, expiry_date: date, quantity: int, note: Optional[str] = None) -> MedicineLot:
+        pass
+
+    @abstractmethod
+    def get_lots(self, medicine_id: int) -> List[MedicineLot]:
+        pass
+
+    @abstractmethod
+    def get_expiring(self, expiring_by: date, limit: int) -> List[MedicineLot]:
+        pass
+
+    @abstractmethod
+    def get_movements(self, medicine_id: int, limit: int, before_id: Optional[int] = None) -> List[StockMovement]:
+        pass
+
+    @abstractmethod
+    def get_stock_at(self, medicine_id: int, at: datetime) -> int:
+        pass
+
+    @abstractmethod
+    def compact(self, batch_size: int = 500) -> int:
+        pass
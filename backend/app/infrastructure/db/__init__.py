@@ -1,6 +1,7 @@
-
 from .base import Base
-from .session import engine
+from .session import engine, settings
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    # The schema is only ever changed by the migrations
+    from .migrations import get_runner
+    get_runner(engine, settings.MIGRATION_LOCK_TIMEOUT_SECONDS).migrate()
@@ -0,0 +1,7 @@
+from sqlalchemy.engine import Engine
+from .runner import DestructiveMigrationError, Migration, MigrationRunner
+from .versions import MIGRATIONS
+
+
+def get_runner(engine: Engine, lock_timeout_seconds: int = 5) -> MigrationRunner:
+    return MigrationRunner(engine, MIGRATIONS, lock_timeout_seconds=lock_timeout_seconds)
@@ -0,0 +1,270 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Same key in every process, so only one of them migrates at a time
+ADVISORY_LOCK_KEY = 7284061
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+# Statements that drop, delete, rewrite or rename, and ALTERs that drop or
+# rename part of a table. Keywords are matched where they start a statement
+# or clause, so e.g. ON DELETE CASCADE in a foreign key is not flagged.
+_DESTRUCTIVE_SQL = re.compile(
+    r"(?:^|;)\s*(?:DROP|TRUNCATE|VACUUM\s+FULL|CLUSTER|REINDEX)\b"
+    r"|\bDELETE\s+FROM\b"
+    r"|\bALTER\s+\w+\s[^;]*\b(?:DROP|RENAME)\b"
+    r"|\bALTER\s+COLUMN\b[^;]*\bTYPE\b"
+    r"|\bSET\s+NOT\s+NULL\b",
+    re.IGNORECASE,
+)
+
+
+class DestructiveMigrationError(Exception):
+    pass
+
+
+class Operation:
+    """One idempotent schema change. Re-running an applied operation is a no-op."""
+
+    # Operations that cannot run inside a transaction get their own
+    # autocommit connection
+    transactional = True
+
+    def apply(self, conn: Connection):
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return type(self).__name__
+
+
+class CreateTables(Operation):
+    """
+    Create tables (with their indexes) that do not exist yet. Pass frozen
+    tables from migrations.tables, never a model's __table__, so the
+    migration keeps creating the same schema when the model changes.
+    """
+
+    def __init__(self, *tables: Table):
+        self.tables = tables
+
+    def apply(self, conn: Connection):
+        # Tables they reference are created first; other referenced tables
+        # must come from earlier migrations
+        for table in self.tables[0].metadata.sorted_tables:
+            if table in self.tables:
+                table.create(conn, checkfirst=True)
+
+    def describe(self) -> str:
+        return "create tables " + ", ".join(t.name for t in self.tables)
+
+
+class AddColumn(Operation):
+    """
+    Add a column. It must be nullable or have a constant default, which
+    Postgres 11+ records in the catalog without rewriting the table.
+    """
+
+    def __init__(self, table: str, column: str, ddl_type: str, nullable: bool = True, default: Optional[str] = None):
+        if not nullable and default is None:
+            raise DestructiveMigrationError(f"{table}.{column}: a NOT NULL column needs a constant default")
+        self.table = table
+        self.column = column
+        self.ddl_type = ddl_type
+        self.nullable = nullable
+        self.default = default
+
+    def apply(self, conn: Connection):
+        if self.column in {c["name"] for c in inspect(conn).get_columns(self.table)}:
+            return
+        ddl = f"ALTER TABLE {self.table} ADD COLUMN {self.column} {self.ddl_type}"
+        if not self.nullable:
+            ddl += " NOT NULL"
+        if self.default is not None:
+            ddl += f" DEFAULT {self.default}"
+        conn.execute(text(ddl))
+
+    def describe(self) -> str:
+        return f"add column {self.table}.{self.column}"
+
+
+class CreateIndex(Operation):
+    """
+    Build an index without blocking writes: CREATE INDEX CONCURRENTLY on
+    Postgres, a plain CREATE INDEX elsewhere. `postgresql_columns` overrides
+    `columns` on Postgres, e.g. to add an operator class, and
+    `postgresql_using` picks the index method there. An index that only
+    makes sense on one database names it in `dialect`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        columns: str,
+        unique: bool = False,
+        postgresql_columns: Optional[str] = None,
+        postgresql_using: Optional[str] = None,
+        dialect: Optional[str] = None,
+    ):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.unique = unique
+        self.postgresql_columns = postgresql_columns or columns
+        self.postgresql_using = postgresql_using
+        self.dialect = dialect
+
+    transactional = False
+
+    def apply(self, conn: Connection):
+        if self.dialect is not None and conn.dialect.name != self.dialect:
+            return
+        unique = "UNIQUE " if self.unique else ""
+        if conn.dialect.name != "postgresql":
+            conn.execute(text(f"CREATE {unique}INDEX IF NOT EXISTS {self.name} ON {self.table} ({self.columns})"))
+            return
+
+        # An interrupted concurrent build leaves an invalid index behind;
+        # it is unused by queries, so it is dropped and built again
+        valid = conn.execute(
+            text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"),
+            {"name": self.name},
+        ).scalar()
+        if valid is True:
+            return
+        if valid is False:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {self.name}"))
+        using = f" USING {self.postgresql_using}" if self.postgresql_using else ""
+        conn.execute(text(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {self.table}{using} ({self.postgresql_columns})"))
+
+    def describe(self) -> str:
+        return f"create index {self.name}"
+
+
+class ExecuteSQL(Operation):
+    """
+    Arbitrary additive SQL; anything that drops, rewrites or deletes is
+    refused. Set `dialect` for SQL that only one database understands.
+    """
+
+    def __init__(self, sql: str, dialect: Optional[str] = None):
+        if _DESTRUCTIVE_SQL.search(sql):
+            raise DestructiveMigrationError(f"Refusing destructive SQL: {sql.strip()}")
+        self.sql = sql
+        self.dialect = dialect
+
+    def apply(self, conn: Connection):
+        if self.dialect is not None and conn.dialect.name != self.dialect:
+            return
+        conn.execute(text(self.sql))
+
+
+class RunPython(Operation):
+    """
+    A data step, such as a backfill. It must be safe to run more than once.
+    A step that works through a large table in chunks sets `transactional`
+    to False, so each statement commits on its own and no lock is held for
+    the whole backfill.
+    """
+
+    def __init__(self, func: Callable[[Connection], None], transactional: bool = True):
+        self.func = func
+        self.transactional = transactional
+
+    def apply(self, conn: Connection):
+        self.func(conn)
+
+    def describe(self) -> str:
+        return f"run {self.func.__name__}"
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    operations: List[Operation] = field(default_factory=list)
+
+
+class MigrationRunner:
+    def __init__(self, engine: Engine, migrations: Sequence[Migration], lock_timeout_seconds: int = 5):
+        versions = [m.version for m in migrations]
+        if versions != sorted(set(versions)):
+            raise ValueError("Migration versions must be unique and in ascending order")
+        for migration in migrations:
+            for operation in migration.operations:
+                if not isinstance(operation, Operation):
+                    raise DestructiveMigrationError(f"Migration {migration.version}: unsupported operation {operation!r}")
+        self.engine = engine
+        self.migrations = migrations
+        self.lock_timeout_seconds = lock_timeout_seconds
+
+    def applied(self) -> Dict[int, datetime]:
+        with self.engine.connect() as conn:
+            if not inspect(conn).has_table(schema_migrations.name):
+                return {}
+            return dict(conn.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at)).all())
+
+    def pending(self) -> List[Migration]:
+        applied = self.applied()
+        return [m for m in self.migrations if m.version not in applied]
+
+    def migrate(self, log: Callable[[str], None] = lambda message: None) -> List[Migration]:
+        """Apply pending migrations in order; returns the ones applied."""
+        with self.engine.connect() as lock_conn:
+            is_postgres = lock_conn.dialect.name == "postgresql"
+            if is_postgres:
+                lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                lock_conn.commit()
+            try:
+                with self.engine.begin() as conn:
+                    schema_migrations.create(conn, checkfirst=True)
+                # Read after taking the lock; another process may have migrated meanwhile
+                applied = []
+                for migration in self.pending():
+                    log(f"Applying {migration.version:04d}_{migration.name}")
+                    for operation in migration.operations:
+                        log(f"  {operation.describe()}")
+                        self._apply(operation)
+                    with self.engine.begin() as conn:
+                        conn.execute(schema_migrations.insert().values(
+                            version=migration.version,
+                            name=migration.name,
+                            applied_at=datetime.now(timezone.utc),
+                        ))
+                    applied.append(migration)
+                return applied
+            finally:
+                if is_postgres:
+                    lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                    lock_conn.commit()
+
+    def _apply(self, operation: Operation):
+        if operation.transactional:
+            with self.engine.begin() as conn:
+                self._set_lock_timeout(conn, local=True)
+                operation.apply(conn)
+        else:
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                self._set_lock_timeout(conn, local=False)
+                try:
+                    operation.apply(conn)
+                finally:
+                    if conn.dialect.name == "postgresql":
+                        conn.execute(text("RESET lock_timeout"))
+
+    def _set_lock_timeout(self, conn: Connection, local: bool):
+        # DDL waiting for a table lock blocks every query queued behind it, so
+        # give up quickly instead; the migration can simply be run again
+        if conn.dialect.name == "postgresql":
+            scope = "LOCAL " if local else ""
+            conn.execute(text(f"SET {scope}lock_timeout = '{int(self.lock_timeout_seconds)}s'"))
@@ -0,0 +1,184 @@
+"""
+Tables exactly as the migrations created them. A released migration must
+keep creating the same table whatever the models look like later, so these
+are frozen copies, not the models' tables; never edit one once released.
+Later changes to a table are new migrations (AddColumn, CreateIndex, ...).
+"""
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import (
+    Boolean, CheckConstraint, Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table,
+    Text, UniqueConstraint, UUID,
+)
+
+metadata = MetaData()
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+# 0001_initial_schema: the schema before migrations existed
+medicines = Table(
+    "medicines", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, index=True, unique=True),
+    Column("price_per_unit", Float),
+    Column("stock", Integer),
+    Column("created_date", DateTime(timezone=True), default=_now),
+    Column("updated_date", DateTime(timezone=True), default=_now, onupdate=_now),
+    Column("is_deleted", Boolean, default=False),
+    Column("deleted_at", DateTime(timezone=True), nullable=True),
+)
+
+patients = Table(
+    "patients", metadata,
+    Column("patient_id", UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4),
+    Column("first_name", String, index=True),
+    Column("last_name", String, index=True),
+    Column("date_of_birth", DateTime(timezone=True)),
+    Column("age", Integer),
+    Column("gender", String, CheckConstraint("gender IN ('male', 'female', 'other')", name="gender_valid_values")),
+    Column("phone_number", String, unique=True),
+    Column("email", String, nullable=True),
+    Column("address", String),
+    Column("created_date", DateTime(timezone=True), default=_now),
+    Column("updated_date", DateTime(timezone=True), default=_now, onupdate=_now),
+    Column("is_active", Boolean, default=True),
+    Column("patient_type", String, default="ADULT"),
+    Column("guardian_name", String, nullable=True),
+    Column("guardian_phone", String, nullable=True),
+)
+
+bills = Table(
+    "bills", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("patient_name", String),
+    Column("patient_age", Integer),
+    Column("total_amount", Float),
+)
+
+bill_items = Table(
+    "bill_items", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("bill_id", Integer, ForeignKey("bills.id")),
+    Column("medicine_id", Integer, ForeignKey("medicines.id")),
+    Column("quantity", Integer),
+    Column("price_per_unit", Float),
+)
+
+# 0004_revenue_rollups
+daily_revenue = Table(
+    "daily_revenue", metadata,
+    Column("day", Date, primary_key=True),
+    Column("revenue", Float, nullable=False, default=0.0),
+    Column("units_sold", Integer, nullable=False, default=0),
+    Column("bill_count", Integer, nullable=False, default=0),
+)
+
+daily_medicine_sales = Table(
+    "daily_medicine_sales", metadata,
+    Column("day", Date, primary_key=True),
+    Column("medicine_id", Integer, ForeignKey("medicines.id"), primary_key=True),
+    Column("revenue", Float, nullable=False, default=0.0),
+    Column("units_sold", Integer, nullable=False, default=0),
+    Column("bill_count", Integer, nullable=False, default=0),
+)
+
+# 0005_idempotency_keys
+idempotency_keys = Table(
+    "idempotency_keys", metadata,
+    Column("scope", String, primary_key=True),
+    Column("key", String, primary_key=True),
+    Column("request_hash", String, nullable=False),
+    Column("status_code", Integer, nullable=True),
+    Column("response_body", Text, nullable=True),
+    Column("created_date", DateTime(timezone=True), default=_now),
+    Column("expires_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+# 0006_bill_receipts
+bill_receipts = Table(
+    "bill_receipts", metadata,
+    Column("bill_id", Integer, ForeignKey("bills.id"), primary_key=True),
+    Column("payload", Text, nullable=False),
+)
+
+# 0007_stock_ledger
+stock_movements = Table(
+    "stock_movements", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("medicine_id", Integer, ForeignKey("medicines.id"), nullable=False),
+    Column("kind", String, nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("note", String, nullable=True),
+    Column("created_date", DateTime(timezone=True), nullable=False, default=_now),
+    Index("ix_stock_movements_medicine_id_id", "medicine_id", "id"),
+    Index("ix_stock_movements_medicine_id_created_date", "medicine_id", "created_date"),
+)
+
+stock_snapshots = Table(
+    "stock_snapshots", metadata,
+    Column("medicine_id", Integer, ForeignKey("medicines.id"), primary_key=True),
+    Column("stock", Integer, nullable=False),
+    Column("last_movement_id", Integer, nullable=False),
+    Column("taken_at", DateTime(timezone=True), nullable=False, default=_now),
+)
+
+# 0010_medicine_lots
+medicine_lots = Table(
+    "medicine_lots", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("medicine_id", Integer, ForeignKey("medicines.id"), nullable=False),
+    Column("batch_number", String, nullable=False),
+    Column("expiry_date", Date, nullable=False),
+    Column("received_date", DateTime(timezone=True), nullable=False, default=_now),
+    UniqueConstraint("medicine_id", "batch_number", name="uq_medicine_lots_medicine_id_batch_number"),
+    Index("ix_medicine_lots_medicine_id_expiry_date", "medicine_id", "expiry_date"),
+    Index("ix_medicine_lots_expiry_date", "expiry_date"),
+)
+
+# 0013_patient_duplicates
+patient_duplicates = Table(
+    "patient_duplicates", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("patient_id_a", UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True),
+    Column("patient_id_b", UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True),
+    Column("score", Float, nullable=False),
+    Column("reasons", String, nullable=False),
+    Column("status", String, nullable=False, default="open"),
+    Column("created_date", DateTime(timezone=True), default=_now),
+    Column("resolved_date", DateTime(timezone=True), nullable=True),
+    UniqueConstraint("patient_id_a", "patient_id_b", name="uq_patient_duplicates_pair"),
+    Index("ix_patient_duplicates_status_id", "status", "id"),
+)
+
+# 0015_revenue_rollup_slots
+daily_revenue_slots = Table(
+    "daily_revenue_slots", metadata,
+    Column("day", Date, primary_key=True),
+    Column("slot", Integer, primary_key=True),
+    Column("revenue", Float, nullable=False, default=0.0),
+    Column("units_sold", Integer, nullable=False, default=0),
+    Column("bill_count", Integer, nullable=False, default=0),
+)
+
+daily_medicine_sales_slots = Table(
+    "daily_medicine_sales_slots", metadata,
+    Column("day", Date, primary_key=True),
+    Column("medicine_id", Integer, ForeignKey("medicines.id"), primary_key=True),
+    Column("slot", Integer, primary_key=True),
+    Column("revenue", Float, nullable=False, default=0.0),
+    Column("units_sold", Integer, nullable=False, default=0),
+    Column("bill_count", Integer, nullable=False, default=0),
+)
+
+# 0016_lot_snapshots
+lot_snapshots = Table(
+    "lot_snapshots", metadata,
+    Column("lot_id", Integer, ForeignKey("medicine_lots.id"), primary_key=True),
+    Column("remaining", Integer, nullable=False),
+    Column("last_movement_id", Integer, nullable=False),
+    Column("taken_at", DateTime(timezone=True), nullable=False, default=_now),
+)
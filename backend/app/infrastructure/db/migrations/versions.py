@@ -0,0 +1,160 @@
+"""
+The schema history, oldest first. Append new migrations with the next
+version number; never edit or reorder one that has been released.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from app.infrastructure.db.migrations import tables
+from app.infrastructure.db.migrations.runner import AddColumn, CreateIndex, CreateTables, ExecuteSQL, Migration, RunPython
+from app.core.phone import normalize_phone
+
+
+def seed_opening_stock(conn: Connection):
+    # Stock used to live in medicines.stock; carry it over as opening
+    # balances for medicines that have no movements yet
+    if "stock" not in {c["name"] for c in inspect(conn).get_columns("medicines")}:
+        return
+    conn.execute(
+        text(
+            """
+        INSERT INTO stock_movements (medicine_id, kind, quantity, note, created_date)
+        SELECT m.id, 'ADJUSTMENT', m.stock, 'Opening balance', :now
+        FROM medicines m
+        WHERE m.stock IS NOT NULL AND m.stock <> 0
+          AND NOT EXISTS (SELECT 1 FROM stock_movements s WHERE s.medicine_id = m.id)
+    """
+        ),
+        {"now": datetime.now(timezone.utc)},
+    )
+
+
+def backfill_patient_created_date(conn: Connection):
+    # The patient listing pages by created date, so every row needs one
+    conn.execute(
+        text("UPDATE patients SET created_date = COALESCE(updated_date, :now) WHERE created_date IS NULL"),
+        {"now": datetime.now(timezone.utc)},
+    )
+
+
+def backfill_phone_normalized(conn: Connection):
+    # Runs without a transaction, so each chunk commits on its own and its
+    # row locks are released before the next one
+    while True:
+        rows = conn.execute(text(
+            "SELECT patient_id, phone_number FROM patients"
+            " WHERE phone_normalized IS NULL AND phone_number IS NOT NULL LIMIT 1000"
+        )).all()
+        if not rows:
+            return
+        conn.execute(
+            text("UPDATE patients SET phone_normalized = :phone WHERE patient_id = :patient_id"),
+            [{"patient_id": row.patient_id, "phone": normalize_phone(row.phone_number)} for row in rows],
+        )
+
+
+def copy_revenue_rollups(conn: Connection):
+    # The rollups moved to tables keyed by slot; carry the old rows over
+    # as slot 0, once
+    if conn.execute(text("SELECT 1 FROM daily_revenue_slots LIMIT 1")).first():
+        return
+    conn.execute(text(
+        "INSERT INTO daily_revenue_slots (day, slot, revenue, units_sold, bill_count)"
+        " SELECT day, 0, revenue, units_sold, bill_count FROM daily_revenue"
+    ))
+    conn.execute(text(
+        "INSERT INTO daily_medicine_sales_slots (day, medicine_id, slot, revenue, units_sold, bill_count)"
+        " SELECT day, medicine_id, 0, revenue, units_sold, bill_count FROM daily_medicine_sales"
+    ))
+
+
+MIGRATIONS = [
+    Migration(1, "initial_schema", [
+        CreateTables(tables.medicines, tables.patients, tables.bills, tables.bill_items),
+    ]),
+    Migration(2, "patient_email", [
+        AddColumn("patients", "email", "VARCHAR"),
+    ]),
+    Migration(3, "bill_created_date", [
+        AddColumn("bills", "created_date", "TIMESTAMP WITH TIME ZONE"),
+        CreateIndex("ix_bills_created_date", "bills", "created_date"),
+        CreateIndex(
+            "ix_bills_patient_name_lower", "bills", "lower(patient_name)",
+            postgresql_columns="lower(patient_name) text_pattern_ops",
+        ),
+    ]),
+    Migration(4, "revenue_rollups", [
+        CreateTables(tables.daily_revenue, tables.daily_medicine_sales),
+    ]),
+    Migration(5, "idempotency_keys", [
+        CreateTables(tables.idempotency_keys),
+    ]),
+    Migration(6, "bill_receipts", [
+        CreateTables(tables.bill_receipts),
+    ]),
+    Migration(7, "stock_ledger", [
+        CreateTables(tables.stock_movements, tables.stock_snapshots),
+        RunPython(seed_opening_stock),
+    ]),
+    Migration(8, "optimistic_locking", [
+        AddColumn("medicines", "version", "INTEGER", nullable=False, default="1"),
+        AddColumn("patients", "version", "INTEGER", nullable=False, default="1"),
+    ]),
+    Migration(9, "bill_item_indexes", [
+        # Used by the bill listing's item loads and the per-medicine reports
+        CreateIndex("ix_bill_items_bill_id", "bill_items", "bill_id"),
+        CreateIndex("ix_bill_items_medicine_id", "bill_items", "medicine_id"),
+    ]),
+    Migration(10, "medicine_lots", [
+        CreateTables(tables.medicine_lots),
+        AddColumn("stock_movements", "lot_id", "INTEGER REFERENCES medicine_lots (id)"),
+        CreateIndex("ix_stock_movements_lot_id", "stock_movements", "lot_id"),
+    ]),
+    Migration(11, "patient_listing_index", [
+        RunPython(backfill_patient_created_date),
+        CreateIndex("ix_patients_created_date_patient_id", "patients", "created_date, patient_id"),
+    ]),
+    Migration(12, "patient_search", [
+        AddColumn("patients", "phone_normalized", "VARCHAR"),
+        RunPython(backfill_phone_normalized, transactional=False),
+        CreateIndex(
+            "ix_patients_phone_normalized", "patients", "phone_normalized",
+            postgresql_columns="phone_normalized text_pattern_ops",
+        ),
+        CreateIndex(
+            "ix_patients_first_name_lower", "patients", "lower(first_name)",
+            postgresql_columns="lower(first_name) text_pattern_ops",
+        ),
+        CreateIndex(
+            "ix_patients_last_name_lower", "patients", "lower(last_name)",
+            postgresql_columns="lower(last_name) text_pattern_ops",
+        ),
+        ExecuteSQL("CREATE EXTENSION IF NOT EXISTS pg_trgm", dialect="postgresql"),
+        CreateIndex(
+            "ix_patients_first_name_trgm", "patients", "lower(first_name) gin_trgm_ops",
+            postgresql_using="gin", dialect="postgresql",
+        ),
+        CreateIndex(
+            "ix_patients_last_name_trgm", "patients", "lower(last_name) gin_trgm_ops",
+            postgresql_using="gin", dialect="postgresql",
+        ),
+    ]),
+    Migration(13, "patient_duplicates", [
+        AddColumn("patients", "merged_into", "UUID REFERENCES patients (patient_id)"),
+        CreateTables(tables.patient_duplicates),
+    ]),
+    Migration(14, "bill_patient_id", [
+        AddColumn("bills", "patient_id", "UUID REFERENCES patients (patient_id)"),
+        CreateIndex("ix_bills_patient_id_id", "bills", "patient_id, id"),
+    ]),
+    Migration(15, "revenue_rollup_slots", [
+        # daily_revenue and daily_medicine_sales are no longer written
+        CreateTables(tables.daily_revenue_slots, tables.daily_medicine_sales_slots),
+        RunPython(copy_revenue_rollups),
+    ]),
+    Migration(16, "lot_snapshots", [
+        CreateTables(tables.lot_snapshots),
+        CreateIndex("ix_stock_movements_lot_id_id", "stock_movements", "lot_id, id"),
+    ]),
+]
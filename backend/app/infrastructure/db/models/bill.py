@@ -1,7 +1,9 @@
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, Text, UUID, func
 from sqlalchemy.orm import relationship
 from app.infrastructure.db.base import Base
+from app.infrastructure.db.models.patient import Patient
+from datetime import datetime, timezone
 
 class Bill(Base):
     __tablename__ = "bills"
@@ -10,17 +12,38 @@ class Bill(Base):
     patient_name = Column(String)
     patient_age = Column(Integer)
     total_amount = Column(Float)
+    created_date = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+    # The registered patient billed, when known; patient_name is kept as billed
+    patient_id = Column(UUID(as_uuid=True), ForeignKey(Patient.patient_id), nullable=True)
 
     items = relationship("BillItem", back_populates="bill")
 
+    __table_args__ = (
+        # Case-insensitive prefix search on patient name
+        Index(
+            "ix_bills_patient_name_lower",
+            func.lower(patient_name).label("patient_name_lower"),
+            postgresql_ops={"patient_name_lower": "text_pattern_ops"},
+        ),
+        # A patient's bills, newest first
+        Index("ix_bills_patient_id_id", patient_id, id),
+    )
+
 class BillItem(Base):
     __tablename__ = "bill_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    bill_id = Column(Integer, ForeignKey("bills.id"))
-    medicine_id = Column(Integer, ForeignKey("medicines.id"))
+    bill_id = Column(Integer, ForeignKey("bills.id"), index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), index=True)
     quantity = Column(Integer)
     price_per_unit = Column(Float)
 
     bill = relationship("Bill", back_populates="items")
     medicine = relationship("Medicine")
+
+class BillReceipt(Base):
+    """Denormalized receipt as billed, written once when the bill is created."""
+    __tablename__ = "bill_receipts"
+
+    bill_id = Column(Integer, ForeignKey("bills.id"), primary_key=True)
+    payload = Column(Text, nullable=False)
@@ -1,5 +1,7 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy.orm import column_property
 from app.infrastructure.db.base import Base
+from app.infrastructure.db.models.stock import current_stock
 from datetime import datetime, timezone
 
 class Medicine(Base):
@@ -8,8 +10,13 @@ class Medicine(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, unique=True)
     price_per_unit = Column(Float)
-    stock = Column(Integer)
+    # Read-only: stock is changed by appending to stock_movements
+    stock = column_property(current_stock(id))
     created_date = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_date = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     is_deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped by every UPDATE; an update made from a stale version fails
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, UUID, CheckConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, UUID, CheckConstraint, Float, ForeignKey, Index, UniqueConstraint, func
 from app.infrastructure.db.base import Base
 from datetime import datetime, timezone
 
@@ -21,6 +21,8 @@ class Patient(Base):
         ),
     )
     phone_number = Column(String, unique=True)
+    # phone_number reduced to the digits of the national number, for lookups
+    phone_normalized = Column(String, nullable=True)
     email = Column(String, nullable=True)
     address = Column(String)
     created_date = Column(
@@ -35,3 +37,54 @@ class Patient(Base):
     patient_type = Column(String, default="ADULT")
     guardian_name = Column(String, nullable=True)
     guardian_phone = Column(String, nullable=True)
+    # Bumped by every UPDATE; an update made from a stale version fails
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Set when this patient was merged into another one as a duplicate
+    merged_into = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        # Sort key of the patient listing; the id breaks ties between equal dates
+        Index("ix_patients_created_date_patient_id", created_date, patient_id),
+        # Prefix search on phone and names. On Postgres the names also have
+        # trigram indexes for fuzzy matches; those need the pg_trgm extension
+        # and are created by the migrations only.
+        Index(
+            "ix_patients_phone_normalized",
+            phone_normalized,
+            postgresql_ops={"phone_normalized": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_patients_first_name_lower",
+            func.lower(first_name).label("first_name_lower"),
+            postgresql_ops={"first_name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_patients_last_name_lower",
+            func.lower(last_name).label("last_name_lower"),
+            postgresql_ops={"last_name_lower": "text_pattern_ops"},
+        ),
+    )
+
+
+class PatientDuplicate(Base):
+    """A pair of patients the dedup job found likely to be the same person."""
+    __tablename__ = "patient_duplicates"
+
+    id = Column(Integer, primary_key=True)
+    # The pair is stored once, with the lower id first
+    patient_id_a = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True)
+    patient_id_b = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    # Comma separated, e.g. "name,phone"
+    reasons = Column(String, nullable=False)
+    # open, merged or dismissed
+    status = Column(String, nullable=False, default="open")
+    created_date = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    resolved_date = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("patient_id_a", "patient_id_b", name="uq_patient_duplicates_pair"),
+        Index("ix_patient_duplicates_status_id", "status", "id"),
+    )
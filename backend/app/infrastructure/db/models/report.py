@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from app.infrastructure.db.base import Base
+
+# Each day's totals are spread over this many rows, summed when read, so
+# concurrent bills rarely update the same row
+ROLLUP_SLOTS = 16
+
+class DailyRevenue(Base):
+    __tablename__ = "daily_revenue_slots"
+
+    day = Column(Date, primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    units_sold = Column(Integer, nullable=False, default=0)
+    bill_count = Column(Integer, nullable=False, default=0)
+
+class DailyMedicineSales(Base):
+    __tablename__ = "daily_medicine_sales_slots"
+
+    day = Column(Date, primary_key=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    units_sold = Column(Integer, nullable=False, default=0)
+    bill_count = Column(Integer, nullable=False, default=0)
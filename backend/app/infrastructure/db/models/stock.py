@@ -0,0 +1,104 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, UniqueConstraint, func, select
+from sqlalchemy.orm import column_property
+from app.infrastructure.db.base import Base
+from datetime import datetime, timezone
+
+class StockMovement(Base):
+    """Append-only ledger of every change to a medicine's stock."""
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
+    # Set when the units came from or went to a specific lot
+    lot_id = Column(Integer, ForeignKey("medicine_lots.id"), nullable=True, index=True)
+    kind = Column(String, nullable=False)
+    # Signed change in units: negative for sales
+    quantity = Column(Integer, nullable=False)
+    note = Column(String, nullable=True)
+    created_date = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_stock_movements_medicine_id_id", medicine_id, id),
+        Index("ix_stock_movements_medicine_id_created_date", medicine_id, created_date),
+        # A lot's movements since its snapshot
+        Index("ix_stock_movements_lot_id_id", lot_id, id),
+    )
+
+class StockSnapshot(Base):
+    """A medicine's stock folded up to and including `last_movement_id`."""
+    __tablename__ = "stock_snapshots"
+
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), primary_key=True)
+    stock = Column(Integer, nullable=False)
+    last_movement_id = Column(Integer, nullable=False)
+    taken_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+class LotSnapshot(Base):
+    """A lot's remaining units folded up to and including `last_movement_id`."""
+    __tablename__ = "lot_snapshots"
+
+    lot_id = Column(Integer, ForeignKey("medicine_lots.id"), primary_key=True)
+    remaining = Column(Integer, nullable=False)
+    last_movement_id = Column(Integer, nullable=False)
+    taken_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+def lot_remaining(lot_id):
+    """SQL expression for a lot's remaining units: its snapshot plus the movements since."""
+    snapshot_remaining = (
+        select(LotSnapshot.remaining)
+        .where(LotSnapshot.lot_id == lot_id)
+        .correlate_except(LotSnapshot)
+        .scalar_subquery()
+    )
+    delta = (
+        select(func.sum(StockMovement.quantity))
+        .select_from(StockMovement)
+        .outerjoin(LotSnapshot, LotSnapshot.lot_id == StockMovement.lot_id)
+        .where(
+            StockMovement.lot_id == lot_id,
+            StockMovement.id > func.coalesce(LotSnapshot.last_movement_id, 0),
+        )
+        .correlate_except(StockMovement, LotSnapshot)
+        .scalar_subquery()
+    )
+    return func.coalesce(snapshot_remaining, 0) + func.coalesce(delta, 0)
+
+class MedicineLot(Base):
+    """A batch of one medicine received with its own expiry date."""
+    __tablename__ = "medicine_lots"
+
+    id = Column(Integer, primary_key=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
+    batch_number = Column(String, nullable=False)
+    expiry_date = Column(Date, nullable=False)
+    received_date = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    # Read-only: units left, the lot's snapshot plus the movements since
+    remaining = column_property(lot_remaining(id))
+
+    __table_args__ = (
+        UniqueConstraint("medicine_id", "batch_number", name="uq_medicine_lots_medicine_id_batch_number"),
+        # First-expiry-first-out order within a medicine, and the expiring-soon scan
+        Index("ix_medicine_lots_medicine_id_expiry_date", medicine_id, expiry_date),
+        Index("ix_medicine_lots_expiry_date", expiry_date),
+    )
+
+def current_stock(medicine_id):
+    """SQL expression for a medicine's stock: its snapshot plus the movements since."""
+    snapshot_stock = (
+        select(StockSnapshot.stock)
+        .where(StockSnapshot.medicine_id == medicine_id)
+        .correlate_except(StockSnapshot)
+        .scalar_subquery()
+    )
+    delta = (
+        select(func.sum(StockMovement.quantity))
+        .select_from(StockMovement)
+        .outerjoin(StockSnapshot, StockSnapshot.medicine_id == StockMovement.medicine_id)
+        .where(
+            StockMovement.medicine_id == medicine_id,
+            StockMovement.id > func.coalesce(StockSnapshot.last_movement_id, 0),
+        )
+        .correlate_except(StockMovement, StockSnapshot)
+        .scalar_subquery()
+    )
+    return func.coalesce(snapshot_stock, 0) + func.coalesce(delta, 0)
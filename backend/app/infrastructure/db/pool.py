@@ -0,0 +1,129 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+
+class _CheckoutStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_total_seconds = 0.0
+        self.wait_max_seconds = 0.0
+
+    def started(self):
+        with self._lock:
+            self.waiting += 1
+
+    def finished(self, seconds: float, timed_out: bool):
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total_seconds += seconds
+            self.wait_max_seconds = max(self.wait_max_seconds, seconds)
+
+
+class _TimedPoolMixin:
+    """Records how long each checkout waited for a connection, and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = _CheckoutStats()
+
+    def connect(self):
+        stats = self.checkout_stats
+        stats.started()
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            stats.finished(time.perf_counter() - started, timed_out)
+
+    def capacity(self) -> int:
+        return self.size() + max(self._max_overflow, 0)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+@dataclass
+class PoolStats:
+    name: str
+    size: int
+    capacity: int
+    checked_out: int
+    idle: int
+    overflow: int
+    # Checkouts blocked waiting for a free connection right now
+    waiting: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+    # Share of the connections the pool may open that are in use
+    saturation: float
+
+
+# Engines whose pools are reported by pool_stats(), by name
+_engines: Dict[str, Engine] = {}
+
+
+def pool_options(url: str, pool_size: int, max_overflow: int, timeout: float, recycle: int, pre_ping: bool) -> dict:
+    """create_engine arguments for a timed, sized connection pool."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's pool
+        return {}
+    return dict(
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=timeout,
+        pool_recycle=recycle,
+        pool_pre_ping=pre_ping,
+    )
+
+
+def register_engine(name: str, engine: Engine):
+    _engines[name] = engine
+
+
+def pool_stats() -> List[PoolStats]:
+    return [stats for stats in (_stats(name, engine) for name, engine in _engines.items()) if stats]
+
+
+def _stats(name: str, engine: Engine) -> Optional[PoolStats]:
+    # The pool is read from the engine each time, as dispose() replaces it
+    pool = engine.pool
+    if not isinstance(pool, _TimedPoolMixin):
+        return None
+    checkout = pool.checkout_stats
+    checked_out = pool.checkedout()
+    return PoolStats(
+        name=name,
+        size=pool.size(),
+        capacity=pool.capacity(),
+        checked_out=checked_out,
+        idle=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        waiting=checkout.waiting,
+        checkouts=checkout.checkouts,
+        timeouts=checkout.timeouts,
+        wait_avg_ms=round(checkout.wait_total_seconds / checkout.checkouts * 1000, 3) if checkout.checkouts else 0.0,
+        wait_max_ms=round(checkout.wait_max_seconds * 1000, 3),
+        saturation=round(checked_out / pool.capacity(), 3) if pool.capacity() else 0.0,
+    )
@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine: Engine):
+    """Count the SQL statements sent to the database inside the block."""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine, max_queries: int):
+    """Fail if the block issues more than `max_queries` SQL statements."""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > max_queries:
+        raise AssertionError(
+            "Expected at most {} queries, got {}:\n{}".format(
+                max_queries, counter.count, "\n".join(counter.statements)
+            )
+        )
@@ -1,14 +1,69 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from pydantic_settings import BaseSettings
+from typing import Optional
+from app.infrastructure.db.pool import pool_options, register_engine
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Optional read replica of DATABASE_URL for the heavy read-only routes
+    DATABASE_REPLICA_URL: Optional[str] = None
+    # After a write, the client reads from the primary for this long, so it
+    # sees its own writes however far the replica lags
+    READ_YOUR_WRITES_SECONDS: float = 5
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    # How long a reserved key waits for its request to commit before it is
+    # given up as abandoned; longer than any request takes
+    IDEMPOTENCY_LEASE_SECONDS: int = 5 * 60
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    # Apply pending migrations when the app starts; turn off where they are
+    # run separately with `python migrate.py`
+    MIGRATE_ON_STARTUP: bool = True
+    MIGRATION_LOCK_TIMEOUT_SECONDS: int = 5
+    # Threads serving sync routes
+    THREADPOOL_SIZE: int = 40
+    # Connections kept open per engine, and how many more may be opened
+    # under load; by default the pool can grow to one per thread, so a
+    # thread never waits for a connection another thread is not using
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: Optional[int] = None
+    # How long a checkout waits for a free connection before failing
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    # Connections older than this are replaced, before a server or proxy
+    # idle timeout can drop them
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Test each connection with a cheap round trip on checkout
+    DB_POOL_PRE_PING: bool = True
+
+    @property
+    def db_max_overflow(self) -> int:
+        if self.DB_MAX_OVERFLOW is not None:
+            return self.DB_MAX_OVERFLOW
+        return max(self.THREADPOOL_SIZE - self.DB_POOL_SIZE, 0)
+
+    def pool_options(self, url: str) -> dict:
+        return pool_options(
+            url,
+            pool_size=self.DB_POOL_SIZE,
+            max_overflow=self.db_max_overflow,
+            timeout=self.DB_POOL_TIMEOUT_SECONDS,
+            recycle=self.DB_POOL_RECYCLE_SECONDS,
+            pre_ping=self.DB_POOL_PRE_PING,
+        )
 
     class Config:
         env_file = ".env"
 
 settings = Settings()
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+engine = create_engine(settings.DATABASE_URL, **settings.pool_options(settings.DATABASE_URL))
+register_engine("primary", engine)
+# Sessions check a connection out on their first query, not when created
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(settings.DATABASE_REPLICA_URL, **settings.pool_options(settings.DATABASE_REPLICA_URL))
+    register_engine("replica", replica_engine)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+else:
+    ReplicaSessionLocal = None
\ No newline at end of file
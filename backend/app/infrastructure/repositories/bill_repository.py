@@ -1,9 +1,14 @@
 
-from typing import List
-from sqlalchemy.orm import Session
-from app.domain.models.bill import Bill as DomainBill, BillItem as DomainBillItem
+import json
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from app.domain.models.bill import Bill as DomainBill, BillItem as DomainBillItem, BillTotals, Receipt as DomainReceipt, ReceiptItem as DomainReceiptItem
 from app.domain.models.medicine import Medicine as DomainMedicine
-from app.infrastructure.db.models.bill import Bill as DbBill, BillItem as DbBillItem
+from app.infrastructure.db.models.bill import Bill as DbBill, BillItem as DbBillItem, BillReceipt as DbBillReceipt
 from app.infrastructure.db.models.medicine import Medicine as DbMedicine
 from app.domain.repositories.bill_repository import BillRepository
 
@@ -12,32 +17,255 @@ class BillRepositoryImpl(BillRepository):
         self.session = session
 
     def get_all(self) -> List[DomainBill]:
-        bills = self.session.query(DbBill).all()
+        # Bills, their items and the referenced medicines are fetched in three
+        # queries in total, no matter how many bills or items there are.
+        bills = self._query_with_items().all()
         return [self._to_domain_bill(b) for b in bills]
 
+    def get_page(
+        self,
+        limit: int,
+        before_id: Optional[int] = None,
+        patient_name: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[DomainBill]:
+        # Keyset pagination: newest bills first, continuing below the last id seen
+        query = self._query_with_items()
+        if before_id is not None:
+            query = query.filter(DbBill.id < before_id)
+        if patient_name:
+            query = query.filter(
+                func.lower(DbBill.patient_name).like(_escape_like(patient_name.lower()) + "%", escape="\\")
+            )
+        if created_from is not None:
+            query = query.filter(DbBill.created_date >= created_from)
+        if created_to is not None:
+            query = query.filter(DbBill.created_date < created_to)
+
+        bills = query.order_by(DbBill.id.desc()).limit(limit).all()
+        return [self._to_domain_bill(b) for b in bills]
+
+    def get_patient_page(self, patient_id: UUID, limit: int, before_id: Optional[int] = None) -> List[DomainBill]:
+        # Range scan on (patient_id, id): newest first, below the last id seen
+        query = self._query_with_items().filter(DbBill.patient_id == patient_id)
+        if before_id is not None:
+            query = query.filter(DbBill.id < before_id)
+        bills = query.order_by(DbBill.id.desc()).limit(limit).all()
+        return [self._to_domain_bill(b) for b in bills]
+
+    def get_patient_totals(self, patient_id: UUID) -> BillTotals:
+        # Reads only this patient's bills, found through the patient_id index
+        row = self.session.execute(
+            select(
+                func.count(DbBill.id),
+                func.coalesce(func.sum(DbBill.total_amount), 0.0),
+                func.min(DbBill.created_date),
+                func.max(DbBill.created_date),
+            ).where(DbBill.patient_id == patient_id)
+        ).one()
+        return BillTotals(bill_count=row[0], total_amount=row[1], first_bill_date=row[2], last_bill_date=row[3])
+
+    def get_unlinked(self, limit: int, after_id: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        stmt = select(DbBill.id, DbBill.patient_name, DbBill.patient_age).where(DbBill.patient_id.is_(None))
+        if after_id is not None:
+            stmt = stmt.where(DbBill.id > after_id)
+        return [tuple(row) for row in self.session.execute(stmt.order_by(DbBill.id).limit(limit))]
+
+    def link_patients(self, patient_ids: Dict[int, UUID]):
+        if patient_ids:
+            self.session.execute(
+                update(DbBill.__table__).where(DbBill.__table__.c.id == bindparam("bill_id")),
+                [{"bill_id": bill_id, "patient_id": patient_id} for bill_id, patient_id in patient_ids.items()],
+            )
+        self.session.commit()
+
+    def iter_all(
+        self,
+        batch_size: int = 1000,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Iterator[DomainBill]:
+        # One joined query read through a server-side cursor, `batch_size` rows
+        # at a time. Rows arrive ordered by bill, so each bill is yielded as
+        # soon as its last item has been read. Stock is summed from the
+        # ledger, so it is read before the stream starts, once per medicine
+        # billed, instead of once per item row; nothing else is kept around.
+        filters = []
+        if created_from is not None:
+            filters.append(DbBill.created_date >= created_from)
+        if created_to is not None:
+            filters.append(DbBill.created_date < created_to)
+        billed = select(DbBillItem.medicine_id).join(DbBill, DbBill.id == DbBillItem.bill_id).where(*filters)
+        stock = dict(self.session.execute(
+            select(DbMedicine.id, DbMedicine.stock).where(DbMedicine.id.in_(billed))
+        ).all())
+
+        stmt = (
+            select(
+                DbBill.id,
+                DbBill.patient_name,
+                DbBill.patient_age,
+                DbBill.total_amount,
+                DbBill.created_date,
+                DbBill.patient_id,
+                DbBillItem.id.label("item_id"),
+                DbBillItem.medicine_id,
+                DbBillItem.quantity,
+                DbBillItem.price_per_unit,
+                DbMedicine.name.label("medicine_name"),
+                DbMedicine.price_per_unit.label("medicine_price_per_unit"),
+                DbMedicine.version.label("medicine_version"),
+            )
+            .outerjoin(DbBillItem, DbBillItem.bill_id == DbBill.id)
+            .outerjoin(DbMedicine, DbMedicine.id == DbBillItem.medicine_id)
+            .where(*filters)
+            .order_by(DbBill.id, DbBillItem.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        current = None
+        for row in self.session.execute(stmt):
+            if current is None or current.id != row.id:
+                if current is not None:
+                    yield current
+                current = DomainBill(
+                    id=row.id,
+                    patient_name=row.patient_name,
+                    patient_age=row.patient_age,
+                    total_amount=row.total_amount,
+                    created_date=row.created_date,
+                    patient_id=row.patient_id,
+                    bill_items=[],
+                )
+            if row.item_id is not None:
+                current.bill_items.append(DomainBillItem(
+                    id=row.item_id,
+                    bill_id=row.id,
+                    medicine_id=row.medicine_id,
+                    quantity=row.quantity,
+                    price_per_unit=row.price_per_unit,
+                    medicine=DomainMedicine(
+                        id=row.medicine_id,
+                        name=row.medicine_name,
+                        price_per_unit=row.medicine_price_per_unit,
+                        stock=stock.get(row.medicine_id),
+                        version=row.medicine_version,
+                    ),
+                ))
+        if current is not None:
+            yield current
+
     def get_by_id(self, bill_id: int) -> DomainBill:
-        bill = self.session.query(DbBill).filter(DbBill.id == bill_id).first()
+        bill = self._query_with_items().filter(DbBill.id == bill_id).first()
         return self._to_domain_bill(bill) if bill else None
 
+    def get_receipt(self, bill_id: int) -> Optional[DomainReceipt]:
+        snapshot = self.session.get(DbBillReceipt, bill_id)
+        if snapshot:
+            return _receipt_from_payload(snapshot.payload)
+
+        # Bills created before receipts were snapshotted get one on first read
+        bill = self.get_by_id(bill_id)
+        if not bill:
+            return None
+        receipt = _receipt_from_bill(bill)
+        self.session.add(DbBillReceipt(bill_id=bill_id, payload=_receipt_payload(receipt)))
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # A concurrent read already stored it
+            self.session.rollback()
+        return receipt
+
     def create(self, bill: DomainBill) -> DomainBill:
-        db_bill = DbBill(patient_name=bill.patient_name, patient_age=bill.patient_age, total_amount=bill.total_amount)
-        self.session.add(db_bill)
-        self.session.commit()
-        self.session.refresh(db_bill)
+        return self.create_many([bill])[0]
 
-        for item in bill.bill_items:
-            db_item = DbBillItem(
-                bill_id=db_bill.id,
-                medicine_id=item.medicine_id,
-                quantity=item.quantity,
-                price_per_unit=item.price_per_unit
+    def create_many(self, bills: List[DomainBill]) -> List[DomainBill]:
+        # All bills go in with one multi-row INSERT, all of their items and
+        # receipts with one more each, and a single commit, which also commits
+        # any stock changes already made on this session for these bills.
+        if not bills:
+            return []
+        now = datetime.now(timezone.utc)
+        created_dates = [bill.created_date or now for bill in bills]
+        try:
+            bill_ids = self.session.scalars(
+                insert(DbBill).returning(DbBill.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "patient_name": bill.patient_name,
+                        "patient_age": bill.patient_age,
+                        "total_amount": bill.total_amount,
+                        "created_date": created_date,
+                        "patient_id": bill.patient_id,
+                    }
+                    for bill, created_date in zip(bills, created_dates)
+                ],
+            ).all()
+
+            item_rows = [
+                {
+                    "bill_id": bill_id,
+                    "medicine_id": item.medicine_id,
+                    "quantity": item.quantity,
+                    "price_per_unit": item.price_per_unit,
+                }
+                for bill_id, bill in zip(bill_ids, bills)
+                for item in bill.bill_items
+            ]
+            item_ids = []
+            if item_rows:
+                item_ids = self.session.scalars(
+                    insert(DbBillItem).returning(DbBillItem.id, sort_by_parameter_order=True),
+                    item_rows,
+                ).all()
+
+            item_id_iter = iter(item_ids)
+            created_bills = [
+                DomainBill(
+                    id=bill_id,
+                    patient_name=bill.patient_name,
+                    patient_age=bill.patient_age,
+                    total_amount=bill.total_amount,
+                    created_date=created_date,
+                    patient_id=bill.patient_id,
+                    bill_items=[
+                        DomainBillItem(
+                            id=next(item_id_iter),
+                            bill_id=bill_id,
+                            medicine_id=item.medicine_id,
+                            quantity=item.quantity,
+                            price_per_unit=item.price_per_unit,
+                            medicine=item.medicine,
+                        )
+                        for item in bill.bill_items
+                    ],
+                )
+                for bill_id, bill, created_date in zip(bill_ids, bills, created_dates)
+            ]
+
+            # Receipts are frozen as billed, so later medicine edits never change them
+            self.session.execute(
+                insert(DbBillReceipt),
+                [
+                    {"bill_id": created.id, "payload": _receipt_payload(_receipt_from_bill(created))}
+                    for created in created_bills
+                ],
             )
-            self.session.add(db_item)
-        
-        self.session.commit()
-        self.session.refresh(db_bill)
 
-        return self._to_domain_bill(db_bill)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return created_bills
+
+
+    def _query_with_items(self):
+        return self.session.query(DbBill).options(
+            selectinload(DbBill.items).selectinload(DbBillItem.medicine)
+        )
 
     def _to_domain_bill(self, bill: DbBill) -> DomainBill:
         return DomainBill(
@@ -45,12 +273,14 @@ class BillRepositoryImpl(BillRepository):
             patient_name=bill.patient_name,
             patient_age=bill.patient_age,
             total_amount=bill.total_amount,
+            created_date=bill.created_date,
+            patient_id=bill.patient_id,
             bill_items=[self._to_domain_bill_item(i) for i in bill.items]
         )
 
     def _to_domain_bill_item(self, item: DbBillItem) -> DomainBillItem:
-        medicine = self.session.query(DbMedicine).filter(DbMedicine.id == item.medicine_id).first()
-        domain_medicine = DomainMedicine(id=medicine.id, name=medicine.name, price_per_unit=medicine.price_per_unit, stock=medicine.stock)
+        medicine = item.medicine
+        domain_medicine = DomainMedicine(id=medicine.id, name=medicine.name, price_per_unit=medicine.price_per_unit, stock=medicine.stock, version=medicine.version)
         return DomainBillItem(
             id=item.id,
             bill_id=item.bill_id,
@@ -59,3 +289,57 @@ class BillRepositoryImpl(BillRepository):
             price_per_unit=item.price_per_unit,
             medicine=domain_medicine
         )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _receipt_from_bill(bill: DomainBill) -> DomainReceipt:
+    return DomainReceipt(
+        bill_id=bill.id,
+        patient_name=bill.patient_name,
+        patient_age=bill.patient_age,
+        total_amount=bill.total_amount,
+        created_date=bill.created_date,
+        items=[
+            DomainReceiptItem(
+                medicine_id=item.medicine_id,
+                medicine_name=item.medicine.name,
+                quantity=item.quantity,
+                price_per_unit=item.price_per_unit,
+            )
+            for item in bill.bill_items
+        ],
+    )
+
+
+def _receipt_payload(receipt: DomainReceipt) -> str:
+    return json.dumps({
+        "bill_id": receipt.bill_id,
+        "patient_name": receipt.patient_name,
+        "patient_age": receipt.patient_age,
+        "total_amount": receipt.total_amount,
+        "created_date": receipt.created_date.isoformat() if receipt.created_date else None,
+        "items": [
+            {
+                "medicine_id": item.medicine_id,
+                "medicine_name": item.medicine_name,
+                "quantity": item.quantity,
+                "price_per_unit": item.price_per_unit,
+            }
+            for item in receipt.items
+        ],
+    })
+
+
+def _receipt_from_payload(payload: str) -> DomainReceipt:
+    data = json.loads(payload)
+    return DomainReceipt(
+        bill_id=data["bill_id"],
+        patient_name=data["patient_name"],
+        patient_age=data["patient_age"],
+        total_amount=data["total_amount"],
+        created_date=datetime.fromisoformat(data["created_date"]) if data["created_date"] else None,
+        items=[DomainReceiptItem(**item) for item in data["items"]],
+    )
@@ -0,0 +1,170 @@
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, event, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.cache import LRUCache
+from app.infrastructure.db.models.idempotency import IdempotencyKey as DbIdempotencyKey
+from app.infrastructure.db.session import settings
+
+PURGE_INTERVAL_SECONDS = 60
+
+# Completed responses never change, so every process keeps the recent ones in memory
+_completed = LRUCache(max_size=settings.IDEMPOTENCY_CACHE_SIZE, ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+_last_purge = 0.0
+
+
+@dataclass
+class StoredResponse:
+    request_hash: str
+    status_code: Optional[int] = None
+    response_body: Optional[str] = None
+    # When the stored row expires and the key may be reused
+    expires_at: Optional[datetime] = None
+
+    @property
+    def in_progress(self) -> bool:
+        return self.status_code is None
+
+
+class IdempotencyStore:
+    """
+    Responses of create requests keyed by (scope, Idempotency-Key). A key is
+    reserved before the request runs and completed with its response, so a
+    retry either replays the response or sees the original still in progress.
+    A reservation is only leased until the request commits: if the request
+    dies first, nothing was written and the key frees up after the lease.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        ttl_seconds: int = settings.IDEMPOTENCY_TTL_SECONDS,
+        lease_seconds: int = settings.IDEMPOTENCY_LEASE_SECONDS,
+    ):
+        self.session = session
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+
+    def get(self, scope: str, key: str) -> Optional[StoredResponse]:
+        cached = _completed.get((scope, key))
+        if cached is not None:
+            # The cache must not outlive the row: once it expires another
+            # process may reuse the key for a different request
+            if not _is_expired(cached.expires_at):
+                return cached
+            _completed.delete((scope, key))
+
+        row = self.session.get(DbIdempotencyKey, (scope, key))
+        if row is None or _is_expired(row.expires_at):
+            return None
+        stored = StoredResponse(
+            request_hash=row.request_hash,
+            status_code=row.status_code,
+            response_body=row.response_body,
+            expires_at=row.expires_at,
+        )
+        if not stored.in_progress:
+            _completed.set((scope, key), stored)
+        return stored
+
+    def reserve(self, scope: str, key: str, request_hash: str) -> bool:
+        """Claim the key for a new request; False if it is already taken."""
+        self._purge_expired()
+        # Expired keys may be reused
+        self.session.execute(
+            delete(DbIdempotencyKey).where(
+                DbIdempotencyKey.scope == scope,
+                DbIdempotencyKey.key == key,
+                DbIdempotencyKey.expires_at < datetime.now(timezone.utc),
+            )
+        )
+        self.session.add(DbIdempotencyKey(
+            scope=scope,
+            key=key,
+            request_hash=request_hash,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds),
+        ))
+        try:
+            self.session.commit()
+            return True
+        except IntegrityError:
+            self.session.rollback()
+            return False
+
+    @contextmanager
+    def hold_on_commit(self, scope: str, key: str):
+        """
+        While inside, the first commit of the session also extends the
+        reservation from its lease to the full TTL, in the same transaction,
+        so a request whose writes committed is never run again. Yields a
+        list that holds True once that has happened.
+        """
+        held = []
+
+        def hold(session):
+            if held:
+                return
+            held.append(True)
+            session.execute(
+                update(DbIdempotencyKey)
+                .where(DbIdempotencyKey.scope == scope, DbIdempotencyKey.key == key, DbIdempotencyKey.status_code.is_(None))
+                .values(expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds))
+            )
+
+        event.listen(self.session, "before_commit", hold)
+        try:
+            yield held
+        finally:
+            event.remove(self.session, "before_commit", hold)
+
+    def complete(self, scope: str, key: str, request_hash: str, status_code: int, response_body: str):
+        expires_at = self.session.execute(
+            update(DbIdempotencyKey)
+            .where(DbIdempotencyKey.scope == scope, DbIdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                response_body=response_body,
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds),
+            )
+            .returning(DbIdempotencyKey.expires_at)
+        ).scalar_one_or_none()
+        self.session.commit()
+        if expires_at is None:
+            return
+        _completed.set((scope, key), StoredResponse(
+            request_hash=request_hash,
+            status_code=status_code,
+            response_body=response_body,
+            expires_at=expires_at,
+        ))
+
+    def release(self, scope: str, key: str):
+        """Drop a reservation whose request failed, so it can be retried."""
+        self.session.rollback()
+        self.session.execute(
+            delete(DbIdempotencyKey).where(
+                DbIdempotencyKey.scope == scope,
+                DbIdempotencyKey.key == key,
+                DbIdempotencyKey.status_code.is_(None),
+            )
+        )
+        self.session.commit()
+
+    def _purge_expired(self):
+        global _last_purge
+        now = time.monotonic()
+        if now - _last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = now
+        self.session.execute(delete(DbIdempotencyKey).where(DbIdempotencyKey.expires_at < datetime.now(timezone.utc)))
+
+
+def _is_expired(expires_at: datetime) -> bool:
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
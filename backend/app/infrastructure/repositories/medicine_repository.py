@@ -1,11 +1,16 @@
 
 from fastapi import HTTPException
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.domain.models.medicine import Medicine as DomainMedicine
 from app.infrastructure.db.models.medicine import Medicine as DbMedicine
 from app.domain.repositories.medicine_repository import MedicineRepository
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, select
+from app.domain.models.stock import SALE, RECEIPT, ADJUSTMENT
+from app.infrastructure.db.models.stock import MedicineLot as DbMedicineLot, StockMovement as DbStockMovement
+from app.infrastructure.repositories.stock_ledger import allocate_sale, append_movements, lock_stock
+from app.infrastructure.repositories.upsert import insert_or_revive
 from datetime import datetime, timezone
 
 
@@ -15,41 +20,142 @@ class MedicineRepositoryImpl(MedicineRepository):
 
     def get_all(self) -> List[DomainMedicine]:
         medicines = self.session.query(DbMedicine).filter(DbMedicine.is_deleted == False).all()
-        return [DomainMedicine(id=m.id, name=m.name, price_per_unit=m.price_per_unit, stock=m.stock) for m in medicines]
+        return [DomainMedicine(id=m.id, name=m.name, price_per_unit=m.price_per_unit, stock=m.stock, version=m.version) for m in medicines]
 
     def get_by_id(self, medicine_id: int) -> DomainMedicine:
-        medicine = self.session.query(DbMedicine).filter(and_(DbMedicine.id == medicine_id, DbMedicine.is_deleted == False)).first()
+        medicine = self.session.query(DbMedicine).filter(and_(DbMedicine.id == medicine_id, DbMedicine.is_deleted == False)).populate_existing().first()
         if medicine:
-            return DomainMedicine(id=medicine.id, name=medicine.name, price_per_unit=medicine.price_per_unit, stock=medicine.stock)
+            return DomainMedicine(id=medicine.id, name=medicine.name, price_per_unit=medicine.price_per_unit, stock=medicine.stock, version=medicine.version)
         return None
 
+    def get_by_ids(self, medicine_ids: List[int]) -> List[DomainMedicine]:
+        # Stock is computed from the ledger, so reload rows this session already holds
+        medicines = self.session.query(DbMedicine).filter(and_(DbMedicine.id.in_(medicine_ids), DbMedicine.is_deleted == False)).populate_existing().all()
+        return [DomainMedicine(id=m.id, name=m.name, price_per_unit=m.price_per_unit, stock=m.stock, version=m.version) for m in medicines]
+
+    def decrement_stock(self, quantities: Dict[int, int]) -> Optional[List[DomainMedicine]]:
+        # Sold units are taken first-expiry-first-out from the medicines'
+        # lots, then from stock not tracked in a lot, and appended as SALE
+        # movements. Whatever is sold from is locked first: only the lots
+        # used when lots cover the sale, so concurrent sales of one medicine
+        # take different lots, else the medicines' whole stock, so sales of
+        # stock outside lots still run one at a time per medicine. Stock can
+        # never go negative. Nothing is committed here; the caller commits
+        # together with the bill. If any medicine is short, or the sale cannot
+        # be written, the whole transaction is rolled back. Selling a negative
+        # amount would add stock, so it is refused.
+        if not quantities:
+            # A bill without items sells nothing
+            return []
+        if any(units <= 0 for units in quantities.values()):
+            raise HTTPException(status_code=400, detail="Sold quantities must be positive")
+        try:
+            parts = allocate_sale(self.session, quantities, datetime.now(timezone.utc).date())
+            if parts is not None:
+                now = datetime.now(timezone.utc)
+                self.session.execute(insert(DbStockMovement), [
+                    dict(medicine_id=medicine_id, lot_id=lot_id, kind=SALE, quantity=-units, created_date=now)
+                    for medicine_id, lot_id, units in parts
+                ])
+        except Exception:
+            self.session.rollback()
+            raise
+        if parts is None:
+            self.session.rollback()
+            return None
+        medicines = self.session.execute(
+            select(DbMedicine.id, DbMedicine.name, DbMedicine.price_per_unit, DbMedicine.stock, DbMedicine.version)
+            .where(DbMedicine.id.in_(list(quantities)))
+        ).all()
+        return [DomainMedicine(id=m.id, name=m.name, price_per_unit=m.price_per_unit, stock=m.stock, version=m.version) for m in medicines]
+
     def create(self, medicine: DomainMedicine) -> DomainMedicine:
-        existing_medicine = self.session.query(DbMedicine).filter(and_(DbMedicine.name == medicine.name, 
-                                    DbMedicine.is_deleted == False
-                                    )).first()
-        if existing_medicine:
+        # One upsert inserts the medicine, or revives it if it was
+        # soft-deleted; concurrent creates of the same name cannot both win
+        now = datetime.now(timezone.utc)
+        medicines_table = DbMedicine.__table__
+        stmt = insert_or_revive(
+            self.session, medicines_table, medicines_table.c.name, medicines_table.c.is_deleted == True,
+            ("price_per_unit",), is_deleted=False, deleted_at=None, updated_date=now,
+        )
+        row = self.session.execute(stmt, dict(
+            name=medicine.name, price_per_unit=medicine.price_per_unit,
+            is_deleted=False, created_date=now, updated_date=now,
+        )).first()
+        if row is None:
+            self.session.rollback()
             raise HTTPException(status_code=400, detail="Medicine with this name already exists")
-        
-        deleted_medicine = self.session.query(DbMedicine).filter(and_(DbMedicine.name == medicine.name, 
-                                    DbMedicine.is_deleted == True
-                                    )).first()
-        # Recreating the deleted medicine if it was soft-deleted
-        if deleted_medicine:
-            deleted_medicine.is_deleted = False
-            deleted_medicine.deleted_at = None
-            deleted_medicine.price_per_unit = medicine.price_per_unit
-            deleted_medicine.stock = medicine.stock
-            self.session.commit()
-            self.session.refresh(deleted_medicine)
-            return DomainMedicine(id=deleted_medicine.id, name=deleted_medicine.name, price_per_unit=deleted_medicine.price_per_unit, stock=deleted_medicine.stock)
-        
-        db_medicine = DbMedicine(name=medicine.name, price_per_unit=medicine.price_per_unit, stock=medicine.stock)
-        self.session.add(db_medicine)
+
+        if row.version == 1:
+            self._adjust_stock(row.id, RECEIPT, medicine.stock, "Opening stock")
+        else:
+            # A revived medicine may still hold stock from before it was deleted
+            lock_stock(self.session, [row.id])
+            previous_stock = self.session.execute(select(DbMedicine.stock).where(DbMedicine.id == row.id)).scalar()
+            self._adjust_stock(row.id, ADJUSTMENT, medicine.stock - previous_stock, "Medicine re-added")
         self.session.commit()
-        self.session.refresh(db_medicine)
-        return DomainMedicine(id=db_medicine.id, name=db_medicine.name, price_per_unit=db_medicine.price_per_unit, stock=db_medicine.stock)
+        return DomainMedicine(id=row.id, name=row.name, price_per_unit=row.price_per_unit, stock=medicine.stock, version=row.version)
+
+    def import_batch(self, medicines: List[DomainMedicine]) -> Tuple[int, int, List[str]]:
+        """
+        Insert many medicines with one upsert and commit them. Same rules as
+        `create`: a soft-deleted medicine with the same name is revived with
+        the new price and stock, an active one is left alone. Returns the
+        number created, the number revived and the names that already exist.
+        """
+        names = [m.name for m in medicines]
+        existing = dict(self.session.execute(
+            select(DbMedicine.name, DbMedicine.is_deleted).where(DbMedicine.name.in_(names))
+        ).all())
+        new_medicines = [m for m in medicines if existing.get(m.name) is not False]
+        if not new_medicines:
+            return 0, 0, names
+
+        now = datetime.now(timezone.utc)
+        # Core insert executed with a parameter list, so SQLAlchemy batches the
+        # rows into multi-row statements without compiling one per batch. A
+        # medicine made active by a concurrent request is left untouched and
+        # reported as already existing.
+        medicines_table = DbMedicine.__table__
+        stmt = insert_or_revive(
+            self.session, medicines_table, medicines_table.c.name, medicines_table.c.is_deleted == True,
+            ("price_per_unit",), is_deleted=False, deleted_at=None, updated_date=now,
+        )
+        params = [
+            dict(name=m.name, price_per_unit=m.price_per_unit,
+                 is_deleted=False, created_date=now, updated_date=now)
+            for m in new_medicines
+        ]
+        stock_by_name = {m.name: m.stock for m in new_medicines}
+        try:
+            written = {row.name: row.id for row in self.session.execute(stmt, params)}
+            revived_ids = [medicine_id for name, medicine_id in written.items() if existing.get(name) is True]
+            # Revived medicines may still hold stock from before they were deleted
+            previous_stock = dict(self.session.execute(
+                select(DbMedicine.id, DbMedicine.stock).where(DbMedicine.id.in_(revived_ids))
+            ).all()) if revived_ids else {}
+
+            movements = []
+            for name, medicine_id in written.items():
+                kind, note = (ADJUSTMENT, "Medicine re-added") if medicine_id in previous_stock else (RECEIPT, "Opening stock")
+                quantity = stock_by_name[name] - previous_stock.get(medicine_id, 0)
+                if quantity:
+                    movements.append(dict(medicine_id=medicine_id, kind=kind, quantity=quantity, note=note, created_date=now))
+            if movements:
+                self.session.execute(insert(DbStockMovement), movements)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return len(written) - len(revived_ids), len(revived_ids), [name for name in names if name not in written]
 
     def update(self, medicine: DomainMedicine) -> DomainMedicine:
+        """
+        Apply the non-None fields. If `medicine.version` is set, the update
+        only succeeds while the stored version still matches it; otherwise
+        HTTP 412 is raised and nothing is changed.
+        """
         db_medicine = (
             self.session.query(DbMedicine)
             .filter(DbMedicine.id == medicine.id)
@@ -57,6 +163,8 @@ class MedicineRepositoryImpl(MedicineRepository):
         )
         if not db_medicine:
             return None
+        if medicine.version is not None and medicine.version != db_medicine.version:
+            raise HTTPException(status_code=412, detail="Medicine was modified by another request")
 
         # Update only fields that are provided (non-None)
         if medicine.name is not None:
@@ -64,16 +172,32 @@ class MedicineRepositoryImpl(MedicineRepository):
         if medicine.price_per_unit is not None:
             db_medicine.price_per_unit = medicine.price_per_unit
         if medicine.stock is not None:
-            db_medicine.stock = medicine.stock
+            # Setting the stock records the difference as an adjustment; a
+            # lower stock is written off like a deletion, lot by lot
+            lock_stock(self.session, [db_medicine.id])
+            self.session.refresh(db_medicine, ["stock"])
+            change = medicine.stock - db_medicine.stock
+            if change < 0:
+                self._write_off(db_medicine.id, -change, "Stock updated")
+            else:
+                self._adjust_stock(db_medicine.id, ADJUSTMENT, change, "Stock updated")
+        # Always write the row, so the version moves on even for stock-only updates
+        db_medicine.updated_date = datetime.now(timezone.utc)
 
-        self.session.commit()
+        try:
+            self.session.commit()
+        except StaleDataError:
+            # Another request updated the row after it was read here
+            self.session.rollback()
+            raise HTTPException(status_code=412, detail="Medicine was modified by another request")
         self.session.refresh(db_medicine)
 
         return DomainMedicine(
             id=db_medicine.id,
             name=db_medicine.name,
             price_per_unit=db_medicine.price_per_unit,
-            stock=db_medicine.stock
+            stock=db_medicine.stock,
+            version=db_medicine.version
         )
 
     def delete(self, medicine_id: int) -> bool:
@@ -85,9 +209,53 @@ class MedicineRepositoryImpl(MedicineRepository):
         if not db_medicine:
             raise HTTPException(status_code=404, detail="Medicine not found or already deleted")
 
+        # Write off everything left, lot by lot, so no lot outlives its medicine
+        lock_stock(self.session, [db_medicine.id])
+        self.session.refresh(db_medicine, ["stock"])
+        lots = self.session.execute(
+            select(DbMedicineLot.id, DbMedicineLot.remaining)
+            .where(DbMedicineLot.medicine_id == db_medicine.id, DbMedicineLot.remaining != 0)
+        ).all()
+        untracked = db_medicine.stock - sum(lot.remaining for lot in lots)
+        write_offs = [(lot.id, -lot.remaining) for lot in lots] + ([(None, -untracked)] if untracked else [])
+        if write_offs:
+            now = datetime.now(timezone.utc)
+            self.session.execute(insert(DbStockMovement), [
+                dict(medicine_id=db_medicine.id, lot_id=lot_id, kind=ADJUSTMENT, quantity=quantity, note="Medicine deleted", created_date=now)
+                for lot_id, quantity in write_offs
+            ])
         db_medicine.is_deleted = True
-        db_medicine.stock = 0
         db_medicine.deleted_at = datetime.now(timezone.utc)
 
         self.session.commit()
-        return True
\ No newline at end of file
+        return True
+
+    def _write_off(self, medicine_id: int, units: int, note: str):
+        # Take the units from lots, earliest expiry first, then from stock not
+        # tracked in any lot. Call with lock_stock held.
+        lots = self.session.execute(
+            select(DbMedicineLot.id, DbMedicineLot.remaining)
+            .where(DbMedicineLot.medicine_id == medicine_id, DbMedicineLot.remaining > 0)
+            .order_by(DbMedicineLot.expiry_date, DbMedicineLot.id)
+        ).all()
+        write_offs = []
+        for lot in lots:
+            if not units:
+                break
+            taken = min(lot.remaining, units)
+            write_offs.append((lot.id, -taken))
+            units -= taken
+        if write_offs:
+            now = datetime.now(timezone.utc)
+            self.session.execute(insert(DbStockMovement), [
+                dict(medicine_id=medicine_id, lot_id=lot_id, kind=ADJUSTMENT, quantity=quantity, note=note, created_date=now)
+                for lot_id, quantity in write_offs
+            ])
+        self._adjust_stock(medicine_id, ADJUSTMENT, -units, note)
+
+    def _adjust_stock(self, medicine_id: int, kind: str, quantity: int, note: str):
+        if not quantity:
+            return
+        if not append_movements(self.session, kind, {medicine_id: quantity}, note):
+            self.session.rollback()
+            raise HTTPException(status_code=400, detail="Stock must not be negative")
@@ -0,0 +1,149 @@
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.domain.models.patient import Patient as DomainPatient, PatientDuplicate as DomainPatientDuplicate
+from app.domain.repositories.patient_duplicate_repository import PatientDuplicateRepository
+from app.infrastructure.db.models.bill import Bill as DbBill
+from app.infrastructure.db.models.patient import Patient as DbPatient, PatientDuplicate as DbPatientDuplicate
+from app.infrastructure.repositories.patient_repository import PatientRepositoryImpl
+from app.infrastructure.repositories.upsert import dialect_insert
+
+# Copied from the merged-away patient where the surviving one has no value
+MERGED_FIELDS = (
+    "last_name", "date_of_birth", "email", "address", "guardian_name", "guardian_phone",
+)
+INSERT_BATCH_SIZE = 1000
+
+
+class PatientDuplicateRepositoryImpl(PatientDuplicateRepository):
+    def __init__(self, session: Session):
+        self.session = session
+        self.patients = PatientRepositoryImpl(session)
+
+    def iter_match_records(self) -> Iterator[Tuple[UUID, str, Optional[str], Optional[str], str]]:
+        # Streamed, so the whole table is never held as ORM objects
+        rows = self.session.execute(
+            select(
+                DbPatient.patient_id,
+                DbPatient.first_name,
+                DbPatient.last_name,
+                DbPatient.date_of_birth,
+                DbPatient.phone_normalized,
+            )
+            .where(DbPatient.is_active == True)
+            .execution_options(yield_per=10000)
+        )
+        for row in rows:
+            date_of_birth = row.date_of_birth.date().isoformat() if row.date_of_birth else None
+            yield row.patient_id, row.first_name, row.last_name, date_of_birth, row.phone_normalized or ""
+
+    def add_candidates(self, candidates: List[Tuple[UUID, UUID, float, List[str]]]) -> int:
+        """
+        Store proposed pairs, skipping pairs already stored, so a pair
+        that was dismissed is not proposed again. Returns the number added.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = dialect_insert(self.session, DbPatientDuplicate.__table__)
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[DbPatientDuplicate.patient_id_a, DbPatientDuplicate.patient_id_b]
+        ).returning(DbPatientDuplicate.id)
+        added = 0
+        try:
+            for start in range(0, len(candidates), INSERT_BATCH_SIZE):
+                params = []
+                for a, b, score, reasons in candidates[start:start + INSERT_BATCH_SIZE]:
+                    a, b = (a, b) if str(a) < str(b) else (b, a)
+                    params.append(dict(
+                        patient_id_a=a, patient_id_b=b, score=score,
+                        reasons=",".join(reasons), status="open", created_date=now,
+                    ))
+                added += len(self.session.execute(stmt, params).all())
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return added
+
+    def get_open(self, limit: int, after_id: Optional[int] = None) -> List[DomainPatientDuplicate]:
+        # Pairs where either patient has since been merged or deactivated are left out
+        patient_a = aliased(DbPatient)
+        patient_b = aliased(DbPatient)
+        query = (
+            self.session.query(DbPatientDuplicate, patient_a, patient_b)
+            .join(patient_a, patient_a.patient_id == DbPatientDuplicate.patient_id_a)
+            .join(patient_b, patient_b.patient_id == DbPatientDuplicate.patient_id_b)
+            .filter(
+                DbPatientDuplicate.status == "open",
+                patient_a.is_active == True,
+                patient_b.is_active == True,
+            )
+        )
+        if after_id is not None:
+            query = query.filter(DbPatientDuplicate.id > after_id)
+        rows = query.order_by(DbPatientDuplicate.id).limit(limit).all()
+        return [
+            DomainPatientDuplicate(
+                id=d.id,
+                patient_a=self.patients._to_domain(a),
+                patient_b=self.patients._to_domain(b),
+                score=d.score,
+                reasons=d.reasons.split(",") if d.reasons else [],
+                status=d.status,
+                created_date=d.created_date,
+            )
+            for d, a, b in rows
+        ]
+
+    def merge(self, duplicate_id: int) -> Optional[DomainPatient]:
+        """
+        Keep the patient registered first and deactivate the other, copying
+        over details the kept patient lacks and moving its bills over. Returns the kept patient, or
+        None if the pair is unknown or already resolved.
+        """
+        duplicate = self.session.get(DbPatientDuplicate, duplicate_id)
+        if not duplicate or duplicate.status != "open":
+            return None
+        patients = [
+            self.session.get(DbPatient, duplicate.patient_id_a),
+            self.session.get(DbPatient, duplicate.patient_id_b),
+        ]
+        if not all(p is not None and p.is_active for p in patients):
+            raise HTTPException(status_code=400, detail="Patient was deactivated or merged since the duplicate was found")
+        survivor, merged = sorted(patients, key=lambda p: (p.created_date is None, p.created_date))
+
+        now = datetime.now(timezone.utc)
+        for field in MERGED_FIELDS:
+            if getattr(survivor, field) in (None, "") and getattr(merged, field) not in (None, ""):
+                setattr(survivor, field, getattr(merged, field))
+        survivor.updated_date = now
+        merged.is_active = False
+        merged.merged_into = survivor.patient_id
+        merged.updated_date = now
+        duplicate.status = "merged"
+        duplicate.resolved_date = now
+        # The kept patient takes over the billing history
+        self.session.execute(
+            update(DbBill).where(DbBill.patient_id == merged.patient_id).values(patient_id=survivor.patient_id)
+        )
+        try:
+            self.session.commit()
+        except StaleDataError:
+            # One of the patients changed after it was read here
+            self.session.rollback()
+            raise HTTPException(status_code=412, detail="Patient was modified by another request")
+        self.session.refresh(survivor)
+        return self.patients._to_domain(survivor)
+
+    def dismiss(self, duplicate_id: int) -> bool:
+        duplicate = self.session.get(DbPatientDuplicate, duplicate_id)
+        if not duplicate or duplicate.status != "open":
+            return False
+        duplicate.status = "dismissed"
+        duplicate.resolved_date = datetime.now(timezone.utc)
+        self.session.commit()
+        return True
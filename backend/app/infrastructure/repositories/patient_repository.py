@@ -1,12 +1,42 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import and_, or_, func, select, text
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timezone
+from uuid import UUID
 
+from app.core.phone import normalize_phone
 from app.domain.models.patient import Patient as DomainPatient, PatientType
 from app.domain.repositories.patient_repository import PatientRepository
 from app.infrastructure.db.models.patient import Patient as DbPatient
+from app.infrastructure.repositories.upsert import insert_or_revive
+
+# Taken from the new registration when a deactivated patient is revived
+REVIVED_FIELDS = (
+    "first_name", "last_name", "date_of_birth", "age", "gender", "email",
+    "address", "patient_type", "guardian_name", "guardian_phone", "phone_normalized",
+)
+
+# Columns behind each patient field, for reading only some of them
+FIELD_COLUMNS = {
+    "patient_id": DbPatient.patient_id,
+    "first_name": DbPatient.first_name,
+    "last_name": DbPatient.last_name,
+    "date_of_birth": DbPatient.date_of_birth,
+    "age": DbPatient.age,
+    "gender": DbPatient.gender,
+    "phone_number": DbPatient.phone_number,
+    "email": DbPatient.email,
+    "address": DbPatient.address,
+    "create_at": DbPatient.created_date,
+    "updated_at": DbPatient.updated_date,
+    "is_active": DbPatient.is_active,
+    "patient_type": DbPatient.patient_type,
+    "guardian_name": DbPatient.guardian_name,
+    "guardian_phone": DbPatient.guardian_phone,
+    "version": DbPatient.version,
+}
 
 
 class PatientRepositoryImpl(PatientRepository):
@@ -14,78 +44,55 @@ class PatientRepositoryImpl(PatientRepository):
         self.session = session
 
     def create(self, patient: DomainPatient) -> DomainPatient:
-        existing_patient = (
-            self.session.query(DbPatient)
-            .filter(
-                and_(
-                    DbPatient.phone_number == patient.phone_number,
-                    DbPatient.is_active == True,
-                )
-            )
-            .first()
-        )
-        if existing_patient:
+        # One upsert inserts the patient, or revives a deactivated patient
+        # with the same phone number; concurrent registrations cannot both win
+        now = datetime.now(timezone.utc)
+        row = self.session.execute(self._insert_or_revive(now), _to_row(patient, now)).first()
+        if row is None:
+            self.session.rollback()
             raise HTTPException(
                 status_code=400,
                 detail="Patient with this {} already exists".format(
                     patient.phone_number
                 ),
             )
+        self.session.commit()
+        return self._to_domain(row)
 
-        deleted_patient = (
-            self.session.query(DbPatient)
-            .filter(
-                and_(
-                    DbPatient.phone_number == patient.phone_number,
-                    DbPatient.is_active == False,
-                )
-            )
-            .first()
-        )
-        if deleted_patient:
-            deleted_patient.is_active = True
-            deleted_patient.updated_at = datetime.now(timezone.utc)
-            # Update other fields if necessary
-            deleted_patient.first_name = patient.first_name
-            deleted_patient.last_name = patient.last_name
-            deleted_patient.date_of_birth = (
-                datetime.fromisoformat(patient.date_of_birth)
-                if patient.date_of_birth
-                else None
-            )
-            deleted_patient.age = patient.age
-            deleted_patient.gender = patient.gender
-            deleted_patient.email = patient.email
-            deleted_patient.address = patient.address
-            deleted_patient.patient_type = patient.patient_type.value
-            deleted_patient.guardian_name = patient.guardian_name
-            deleted_patient.guardian_phone = patient.guardian_phone
+    def create_many(self, patients: List[DomainPatient]) -> Tuple[List[DomainPatient], List[DomainPatient]]:
+        """
+        Register many patients with one upsert and commit them. Same rules as
+        `create`: a deactivated patient with the same phone number is revived
+        with the new details, an active one is left alone. Returns the
+        patients created and the patients revived; the rest already exist.
+        """
+        phone_numbers = [p.phone_number for p in patients]
+        existing = dict(self.session.execute(
+            select(DbPatient.phone_number, DbPatient.is_active).where(DbPatient.phone_number.in_(phone_numbers))
+        ).all())
+        new_patients = [p for p in patients if existing.get(p.phone_number) is not True]
+        if not new_patients:
+            return [], []
 
+        now = datetime.now(timezone.utc)
+        params = [_to_row(p, now) for p in new_patients]
+        try:
+            written = [self._to_domain(row) for row in self.session.execute(self._insert_or_revive(now), params)]
             self.session.commit()
-            self.session.refresh(deleted_patient)
-            return self._to_domain(deleted_patient)
-
-        DB_patient = DbPatient(
-            first_name=patient.first_name,
-            last_name=patient.last_name,
-            date_of_birth=(
-                datetime.fromisoformat(patient.date_of_birth)
-                if patient.date_of_birth
-                else None
-            ),
-            age=patient.age,
-            gender=patient.gender,
-            phone_number=patient.phone_number,
-            email=patient.email,
-            address=patient.address,
-            patient_type=patient.patient_type.value,
-            guardian_name=patient.guardian_name,
-            guardian_phone=patient.guardian_phone,
+        except Exception:
+            self.session.rollback()
+            raise
+
+        created = [p for p in written if existing.get(p.phone_number) is None]
+        revived = [p for p in written if existing.get(p.phone_number) is False]
+        return created, revived
+
+    def _insert_or_revive(self, now: datetime):
+        patients_table = DbPatient.__table__
+        return insert_or_revive(
+            self.session, patients_table, patients_table.c.phone_number, patients_table.c.is_active == False,
+            REVIVED_FIELDS, is_active=True, merged_into=None, updated_date=now,
         )
-        self.session.add(DB_patient)
-        self.session.commit()
-        self.session.refresh(DB_patient)
-        return self._to_domain(DB_patient)
 
     def get_by_id(self, patient_id: str) -> DomainPatient:
         db_patient = (
@@ -97,17 +104,137 @@ class PatientRepositoryImpl(PatientRepository):
             return None
         return self._to_domain(db_patient)
 
+    def get_by_ids(self, patient_ids: List[UUID]) -> List[DomainPatient]:
+        db_patients = (
+            self.session.query(DbPatient)
+            .filter(DbPatient.patient_id.in_(patient_ids), DbPatient.is_active == True)
+            .all()
+        )
+        return [self._to_domain(p) for p in db_patients]
+
+    def get_by_first_names(self, first_names: List[str]) -> List[DomainPatient]:
+        # Lowercase names, looked up through the lower(first_name) index
+        db_patients = (
+            self.session.query(DbPatient)
+            .filter(func.lower(DbPatient.first_name).in_(first_names), DbPatient.is_active == True)
+            .all()
+        )
+        return [self._to_domain(p) for p in db_patients]
+
     def list_patients(self, skip: int = 0, limit: int = 10) -> List[DomainPatient]:
         db_patients = (
             self.session.query(DbPatient)
             .filter(DbPatient.is_active == True)
+            .order_by(DbPatient.created_date, DbPatient.patient_id)
             .offset(skip)
             .limit(limit)
             .all()
         )
         return [self._to_domain(p) for p in db_patients]
 
-    def update(self, patient_id: str, patient_data: dict) -> DomainPatient:
+    def get_page(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> List[DomainPatient]:
+        # Keyset pagination: oldest patients first, continuing after the
+        # (created_date, patient_id) of the last patient seen. The outer
+        # created_date bound lets the index range scan start at the cursor.
+        query = self.session.query(DbPatient).filter(DbPatient.is_active == True)
+        db_patients = _after(query, after).order_by(DbPatient.created_date, DbPatient.patient_id).limit(limit).all()
+        return [self._to_domain(p) for p in db_patients]
+
+    # The *_fields reads select only the requested FIELD_COLUMNS and return
+    # plain dicts, skipping the ORM and domain objects; for list screens
+    # that show a few columns of many patients.
+
+    def get_fields_by_id(self, patient_id: str, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        row = self.session.execute(
+            _select_fields(fields).where(DbPatient.patient_id == patient_id, DbPatient.is_active == True)
+        ).first()
+        return _fields_row(row) if row else None
+
+    def list_patient_fields(self, fields: Sequence[str], skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        stmt = (
+            _select_fields(fields)
+            .where(DbPatient.is_active == True)
+            .order_by(DbPatient.created_date, DbPatient.patient_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [_fields_row(row) for row in self.session.execute(stmt)]
+
+    def get_page_fields(self, fields: Sequence[str], limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> List[Dict[str, Any]]:
+        stmt = _after(_select_fields(fields).where(DbPatient.is_active == True), after)
+        stmt = stmt.order_by(DbPatient.created_date, DbPatient.patient_id).limit(limit)
+        return [_fields_row(row) for row in self.session.execute(stmt)]
+
+    def search_by_phone(self, digits: str, limit: int) -> List[DomainPatient]:
+        # Range scan on the normalized phone index
+        db_patients = (
+            self.session.query(DbPatient)
+            .filter(self._starts_with(DbPatient.phone_normalized, digits), DbPatient.is_active == True)
+            .order_by(DbPatient.phone_normalized)
+            .limit(limit)
+            .all()
+        )
+        return [self._to_domain(p) for p in db_patients]
+
+    def search_by_name(self, words: List[str], limit: int) -> List[DomainPatient]:
+        """
+        Patients whose first and last name start with the given lowercase
+        words, in either order: "ravi ku" finds Ravi Kumar and also Kumar
+        Ravi. First-name matches come first. On Postgres, if that leaves
+        room, names similar to the longest word (pg_trgm) fill the rest.
+        """
+        first_name = func.lower(DbPatient.first_name)
+        last_name = func.lower(DbPatient.last_name)
+        # Each query walks one prefix index in order and stops at `limit`
+        found = {}
+        for leading, other in ((first_name, last_name), (last_name, first_name)):
+            query = self.session.query(DbPatient).filter(self._starts_with(leading, words[0]), DbPatient.is_active == True)
+            for word in words[1:]:
+                query = query.filter(self._starts_with(other, word))
+            for p in query.order_by(leading, DbPatient.patient_id).limit(limit):
+                found.setdefault(p.patient_id, p)
+            if len(found) >= limit:
+                break
+
+        if len(found) < limit and self.session.get_bind().dialect.name == "postgresql":
+            word = max(words, key=len)
+            similarity = func.greatest(func.similarity(first_name, word), func.similarity(last_name, word))
+            similar = (
+                self.session.query(DbPatient)
+                .filter(or_(first_name.op("%")(word), last_name.op("%")(word)), DbPatient.is_active == True)
+                .order_by(similarity.desc(), DbPatient.patient_id)
+                .limit(limit)
+            )
+            for p in similar:
+                found.setdefault(p.patient_id, p)
+
+        return [self._to_domain(p) for p in list(found.values())[:limit]]
+
+    def _starts_with(self, column, prefix: str):
+        condition = column.like(_escape_like(prefix) + "%", escape="\\")
+        if self.session.get_bind().dialect.name == "sqlite":
+            # SQLite only uses an index for the equivalent range
+            condition = and_(condition, column >= prefix, column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        return condition
+
+    def estimate_count(self) -> Optional[int]:
+        """
+        Rough number of patients, deactivated ones included, read from
+        table statistics instead of counting rows. None when unknown.
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            # reltuples is -1 until the table is first vacuumed or analyzed
+            estimate = self.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'patients'::regclass")
+            ).scalar()
+            return estimate if estimate is not None and estimate >= 0 else None
+        if dialect == "sqlite":
+            # Rowids only grow, so the largest one bounds the row count
+            return self.session.execute(select(func.max(text("rowid"))).select_from(DbPatient)).scalar() or 0
+        return None
+
+    def update(self, patient_id: str, patient_data: dict, expected_version: Optional[int] = None) -> DomainPatient:
         db_patient = (
             self.session.query(DbPatient)
             .filter(DbPatient.patient_id == patient_id, DbPatient.is_active == True)
@@ -115,13 +242,22 @@ class PatientRepositoryImpl(PatientRepository):
         )
         if not db_patient:
             return None
+        if expected_version is not None and expected_version != db_patient.version:
+            raise HTTPException(status_code=412, detail="Patient was modified by another request")
 
         for key, value in patient_data.items():
-            if hasattr(db_patient, key):
+            if hasattr(db_patient, key) and key not in ("version", "phone_normalized"):
                 setattr(db_patient, key, value)
+        if "phone_number" in patient_data:
+            db_patient.phone_normalized = normalize_phone(db_patient.phone_number)
 
         db_patient.updated_date = datetime.now(timezone.utc)
-        self.session.commit()
+        try:
+            self.session.commit()
+        except StaleDataError:
+            # Another request updated the row after it was read here
+            self.session.rollback()
+            raise HTTPException(status_code=412, detail="Patient was modified by another request")
         self.session.refresh(db_patient)
         return self._to_domain(db_patient)
 
@@ -167,4 +303,60 @@ class PatientRepositoryImpl(PatientRepository):
             patient_type=PatientType(db_patient.patient_type),
             guardian_name=db_patient.guardian_name,
             guardian_phone=db_patient.guardian_phone,
+            version=db_patient.version,
         )
+
+
+def _after(query, after: Optional[Tuple[datetime, UUID]]):
+    if after is None:
+        return query
+    created_date, patient_id = after
+    return query.filter(
+        DbPatient.created_date >= created_date,
+        or_(
+            DbPatient.created_date > created_date,
+            DbPatient.patient_id > patient_id,
+        ),
+    )
+
+
+def _select_fields(fields: Sequence[str]):
+    return select(*(FIELD_COLUMNS[field].label(field) for field in fields))
+
+
+def _fields_row(row) -> Dict[str, Any]:
+    # Same values as _to_domain gives for these fields
+    values = dict(row._mapping)
+    if values.get("date_of_birth") is not None:
+        values["date_of_birth"] = values["date_of_birth"].isoformat()
+    if "gender" in values:
+        values["gender"] = values["gender"] or "Unknown"
+    return values
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _to_row(patient: DomainPatient, now: datetime) -> dict:
+    return dict(
+        first_name=patient.first_name,
+        last_name=patient.last_name,
+        date_of_birth=(
+            datetime.fromisoformat(patient.date_of_birth)
+            if patient.date_of_birth
+            else None
+        ),
+        age=patient.age,
+        gender=patient.gender,
+        phone_number=patient.phone_number,
+        phone_normalized=normalize_phone(patient.phone_number),
+        email=patient.email,
+        address=patient.address,
+        patient_type=patient.patient_type.value,
+        guardian_name=patient.guardian_name,
+        guardian_phone=patient.guardian_phone,
+        is_active=True,
+        created_date=now,
+        updated_date=now,
+    )
@@ -0,0 +1,180 @@
+
+import random
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import delete, false, func, select, text, update
+from sqlalchemy.orm import Session
+from app.domain.models.bill import Bill as DomainBill
+from app.domain.models.report import DailyRevenue as DomainDailyRevenue, MedicineSales
+from app.domain.repositories.report_repository import ReportRepository
+from app.infrastructure.db.models.report import ROLLUP_SLOTS, DailyRevenue as DbDailyRevenue, DailyMedicineSales as DbDailyMedicineSales
+from app.infrastructure.db.models.medicine import Medicine as DbMedicine
+from app.infrastructure.repositories.upsert import dialect_insert
+
+class ReportRepositoryImpl(ReportRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record_bills(self, bills: List[DomainBill]):
+        # Adds the bills to the daily rollups with one upsert per table.
+        # Each call writes to one randomly picked slot of the day's rows, so
+        # concurrent bills seldom wait on each other; the slots are summed
+        # when read. Rows are written in key order so concurrent bills lock
+        # them in the same order. Nothing is committed here; the caller
+        # commits with the bills. On failure the transaction is rolled back.
+        for bill in bills:
+            if any(item.quantity <= 0 or (item.price_per_unit or 0.0) < 0 for item in bill.bill_items):
+                self.session.rollback()
+                raise ValueError("Bill lines must sell a positive quantity at a non-negative price")
+        daily, per_medicine = _aggregate(bills)
+        if not daily:
+            return
+        slot = random.randrange(ROLLUP_SLOTS)
+
+        try:
+            stmt = dialect_insert(self.session, DbDailyRevenue).values(
+                [_rollup_values(day=day, slot=slot, totals=totals) for day, totals in sorted(daily.items())]
+            )
+            self.session.execute(stmt.on_conflict_do_update(
+                index_elements=[DbDailyRevenue.day, DbDailyRevenue.slot],
+                set_=_increment(DbDailyRevenue, stmt.excluded),
+            ))
+
+            if per_medicine:
+                stmt = dialect_insert(self.session, DbDailyMedicineSales).values(
+                    [
+                        _rollup_values(day=day, medicine_id=medicine_id, slot=slot, totals=totals)
+                        for (day, medicine_id), totals in sorted(per_medicine.items())
+                    ]
+                )
+                self.session.execute(stmt.on_conflict_do_update(
+                    index_elements=[DbDailyMedicineSales.day, DbDailyMedicineSales.medicine_id, DbDailyMedicineSales.slot],
+                    set_=_increment(DbDailyMedicineSales, stmt.excluded),
+                ))
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def get_daily_revenue(self, date_from: date, date_to: date) -> List[DomainDailyRevenue]:
+        rows = self.session.execute(
+            select(
+                DbDailyRevenue.day,
+                func.sum(DbDailyRevenue.revenue).label("revenue"),
+                func.sum(DbDailyRevenue.units_sold).label("units_sold"),
+                func.sum(DbDailyRevenue.bill_count).label("bill_count"),
+            )
+            .where(DbDailyRevenue.day >= date_from, DbDailyRevenue.day <= date_to)
+            .group_by(DbDailyRevenue.day)
+            .order_by(DbDailyRevenue.day)
+        ).all()
+        return [
+            DomainDailyRevenue(day=r.day, revenue=r.revenue, units_sold=r.units_sold, bill_count=r.bill_count)
+            for r in rows
+        ]
+
+    def get_medicine_sales(self, date_from: date, date_to: date) -> List[MedicineSales]:
+        revenue = func.sum(DbDailyMedicineSales.revenue)
+        rows = self.session.execute(
+            select(
+                DbDailyMedicineSales.medicine_id,
+                DbMedicine.name,
+                revenue.label("revenue"),
+                func.sum(DbDailyMedicineSales.units_sold).label("units_sold"),
+                func.sum(DbDailyMedicineSales.bill_count).label("bill_count"),
+            )
+            .join(DbMedicine, DbMedicine.id == DbDailyMedicineSales.medicine_id)
+            .where(DbDailyMedicineSales.day >= date_from, DbDailyMedicineSales.day <= date_to)
+            .group_by(DbDailyMedicineSales.medicine_id, DbMedicine.name)
+            .order_by(revenue.desc())
+        ).all()
+        return [
+            MedicineSales(
+                medicine_id=r.medicine_id,
+                medicine_name=r.name,
+                revenue=r.revenue,
+                units_sold=r.units_sold,
+                bill_count=r.bill_count,
+            )
+            for r in rows
+        ]
+
+    def rebuild(self, bills: Iterable[DomainBill]):
+        # The rollups are locked before the bills are read, and stay locked
+        # until the rebuilt rows are committed. A bill committed before the
+        # lock is in the rebuild; a bill still in progress waits for the
+        # lock to add itself, so no bill is lost or counted twice.
+        try:
+            self._lock_rollups()
+            daily, per_medicine = _aggregate(bills)
+            self.session.execute(delete(DbDailyMedicineSales))
+            self.session.execute(delete(DbDailyRevenue))
+            if daily:
+                self.session.execute(
+                    DbDailyRevenue.__table__.insert(),
+                    [_rollup_values(day=day, slot=0, totals=totals) for day, totals in daily.items()],
+                )
+            if per_medicine:
+                self.session.execute(
+                    DbDailyMedicineSales.__table__.insert(),
+                    [
+                        _rollup_values(day=day, medicine_id=medicine_id, slot=0, totals=totals)
+                        for (day, medicine_id), totals in per_medicine.items()
+                    ],
+                )
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def _lock_rollups(self):
+        # Blocks rollup writes, not reads, and one rebuild at a time. SQLite
+        # has no table locks; there the database write lock is taken instead.
+        if self.session.get_bind().dialect.name == "sqlite":
+            self.session.execute(update(DbDailyRevenue).where(false()).values(slot=DbDailyRevenue.slot))
+            return
+        self.session.execute(text(
+            f"LOCK TABLE {DbDailyRevenue.__tablename__}, {DbDailyMedicineSales.__tablename__} IN SHARE ROW EXCLUSIVE MODE"
+        ))
+
+
+def _aggregate(bills: Iterable[DomainBill]) -> Tuple[Dict[date, list], Dict[Tuple[date, int], list]]:
+    # [revenue, units_sold, bill_count] per day and per (day, medicine)
+    daily = defaultdict(lambda: [0.0, 0, 0])
+    per_medicine = defaultdict(lambda: [0.0, 0, 0])
+    for bill in bills:
+        if bill.created_date is None:
+            continue
+        day = _utc_day(bill.created_date)
+        totals = daily[day]
+        totals[0] += bill.total_amount or 0.0
+        totals[2] += 1
+
+        medicines_in_bill = set()
+        for item in bill.bill_items:
+            totals[1] += item.quantity
+            medicine_totals = per_medicine[(day, item.medicine_id)]
+            medicine_totals[0] += (item.price_per_unit or 0.0) * item.quantity
+            medicine_totals[1] += item.quantity
+            if item.medicine_id not in medicines_in_bill:
+                medicines_in_bill.add(item.medicine_id)
+                medicine_totals[2] += 1
+    return daily, per_medicine
+
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _rollup_values(totals: list, **keys) -> dict:
+    return dict(keys, revenue=totals[0], units_sold=totals[1], bill_count=totals[2])
+
+
+def _increment(model, excluded) -> dict:
+    return {
+        "revenue": model.revenue + excluded.revenue,
+        "units_sold": model.units_sold + excluded.units_sold,
+        "bill_count": model.bill_count + excluded.bill_count,
+    }
@@ -0,0 +1,211 @@
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import DateTime, Integer, String, case, false, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from app.infrastructure.db.models.medicine import Medicine as DbMedicine
+from app.infrastructure.db.models.stock import MedicineLot as DbMedicineLot, StockMovement as DbStockMovement
+
+
+def lock_stock(session: Session, medicine_ids: Iterable[int]):
+    """
+    Hold the medicines' whole stock until the transaction ends: every lot of
+    theirs, then the medicine rows. Every stock movement is written under
+    this lock or, for a sale from lots, under the lots' locks alone (see
+    claim_lots), so a stock check stays true until commit and a snapshot
+    never skips a movement still in flight. Lots are locked before
+    medicines, each in id order, so concurrent writers cannot deadlock; the
+    rows are never rewritten. SQLite has no row locks; there the database
+    write lock is taken instead.
+    """
+    medicine_ids = sorted(medicine_ids)
+    if _take_write_lock(session):
+        return
+    session.execute(
+        select(DbMedicineLot.id)
+        .where(DbMedicineLot.medicine_id.in_(medicine_ids))
+        .order_by(DbMedicineLot.id)
+        .with_for_update()
+    )
+    session.execute(
+        select(DbMedicine.id)
+        .where(DbMedicine.id.in_(medicine_ids))
+        .order_by(DbMedicine.id)
+        .with_for_update()
+    )
+
+
+def _take_write_lock(session: Session) -> bool:
+    # On SQLite, take the database write lock and return True
+    if session.get_bind().dialect.name != "sqlite":
+        return False
+    medicines = DbMedicine.__table__
+    session.execute(update(medicines).where(false()).values(id=medicines.c.id))
+    return True
+
+
+def append_movements(
+    session: Session,
+    kind: str,
+    quantities: Dict[int, int],
+    note: Optional[str] = None,
+    lot_id: Optional[int] = None,
+) -> List:
+    """
+    Append one movement per medicine, but only for active medicines whose
+    stock stays non-negative, and either the lot's if one is given or else
+    the stock not tracked in any lot; checked and inserted in the same
+    statement. Returns the inserted rows. Call with the stock locked;
+    nothing is committed here.
+    """
+    quantity = case(quantities, value=DbMedicine.id)
+    conditions = [
+        DbMedicine.id.in_(list(quantities)),
+        DbMedicine.is_deleted == False,
+        DbMedicine.stock + quantity >= 0,
+    ]
+    if lot_id is not None:
+        lot_remaining = select(DbMedicineLot.remaining).where(
+            DbMedicineLot.id == lot_id, DbMedicineLot.medicine_id == DbMedicine.id
+        ).scalar_subquery()
+        conditions.append(lot_remaining + quantity >= 0)
+    else:
+        # Sales from lots only check their lot, so the stock outside lots
+        # must not go negative either, or they could sell it twice
+        in_lots = select(func.coalesce(func.sum(DbMedicineLot.remaining), 0)).where(
+            DbMedicineLot.medicine_id == DbMedicine.id
+        ).scalar_subquery()
+        conditions.append(DbMedicine.stock - in_lots + quantity >= 0)
+    rows = (
+        select(
+            DbMedicine.id,
+            literal(lot_id, Integer),
+            literal(kind, String),
+            quantity,
+            literal(note, String),
+            literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+        )
+        .where(*conditions)
+    )
+    stmt = (
+        insert(DbStockMovement)
+        .from_select(["medicine_id", "lot_id", "kind", "quantity", "note", "created_date"], rows)
+        .returning(*DbStockMovement.__table__.c)
+    )
+    return session.execute(stmt).all()
+
+
+def allocate_sale(
+    session: Session,
+    quantities: Dict[int, int],
+    today: date,
+) -> Optional[List[Tuple[int, Optional[int], int]]]:
+    """
+    Decide where sold units come from and lock what they are taken from, as
+    allocate_fefo does. Sales that lots can cover first try claim_lots, so
+    concurrent sales of one medicine take different lots instead of waiting
+    for each other. Otherwise the medicines' whole stock is locked and
+    allocated exactly. That includes every sale of stock not tracked in a
+    lot, the usual case for stock set by POST, CSV import or PATCH: such
+    sales of one medicine still wait for each other on its row lock.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        savepoint = session.begin_nested()
+        parts = claim_lots(session, quantities, today)
+        if parts is not None:
+            savepoint.commit()
+            return parts
+        # Releases the lots claimed so far, so lock_stock takes them in order
+        savepoint.rollback()
+    lock_stock(session, quantities)
+    return allocate_fefo(session, quantities, today)
+
+
+def claim_lots(
+    session: Session,
+    quantities: Dict[int, int],
+    today: date,
+) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Take sold units from unexpired lots, earliest expiry first, skipping
+    lots another sale holds right now; each lot used is locked. Returns
+    (medicine_id, lot_id, units) parts, or None if the free lots cannot
+    cover the sale. Postgres only: relies on FOR UPDATE SKIP LOCKED.
+    """
+    if any(units <= 0 for units in quantities.values()):
+        raise ValueError("Sold quantities must be positive")
+    parts = []
+    for medicine_id, quantity in sorted(quantities.items()):
+        claimed = []
+        needed = quantity
+        while needed:
+            lot_id = session.execute(
+                select(DbMedicineLot.id)
+                .where(
+                    DbMedicineLot.medicine_id == medicine_id,
+                    DbMedicineLot.expiry_date >= today,
+                    DbMedicineLot.id.not_in(claimed),
+                    DbMedicineLot.remaining > 0,
+                )
+                .order_by(DbMedicineLot.expiry_date, DbMedicineLot.id)
+                .limit(1)
+                .with_for_update(of=DbMedicineLot, skip_locked=True)
+            ).scalar()
+            if lot_id is None:
+                return None
+            claimed.append(lot_id)
+            # Read again now that the lot is held: the statement above may
+            # predate a sale from it that committed just before the lock
+            remaining = session.execute(select(DbMedicineLot.remaining).where(DbMedicineLot.id == lot_id)).scalar()
+            units = min(remaining, needed)
+            if units > 0:
+                parts.append((medicine_id, lot_id, units))
+                needed -= units
+    return parts
+
+
+def allocate_fefo(
+    session: Session,
+    quantities: Dict[int, int],
+    today: date,
+) -> Optional[List[Tuple[int, Optional[int], int]]]:
+    """
+    Decide where sold units come from: unexpired lots first, earliest expiry
+    first, then stock not tracked in any lot. Expired lots are never sold.
+    Returns (medicine_id, lot_id or None, units) parts, or None if a medicine
+    does not have enough sellable stock. Call with lock_stock held.
+    Raises ValueError for a quantity that is not positive.
+    """
+    if any(units <= 0 for units in quantities.values()):
+        raise ValueError("Sold quantities must be positive")
+    stock = dict(session.execute(
+        select(DbMedicine.id, DbMedicine.stock)
+        .where(DbMedicine.id.in_(list(quantities)), DbMedicine.is_deleted == False)
+    ).all())
+    # Served by ix_medicine_lots_medicine_id_expiry_date
+    lots = session.execute(
+        select(DbMedicineLot.id, DbMedicineLot.medicine_id, DbMedicineLot.expiry_date, DbMedicineLot.remaining)
+        .where(DbMedicineLot.medicine_id.in_(list(quantities)), DbMedicineLot.remaining > 0)
+        .order_by(DbMedicineLot.medicine_id, DbMedicineLot.expiry_date, DbMedicineLot.id)
+    ).all()
+
+    parts = []
+    for medicine_id, quantity in quantities.items():
+        if medicine_id not in stock:
+            return None
+        medicine_lots = [lot for lot in lots if lot.medicine_id == medicine_id]
+        expired = sum(lot.remaining for lot in medicine_lots if lot.expiry_date < today)
+        if stock[medicine_id] - expired < quantity:
+            return None
+
+        needed = quantity
+        for lot in medicine_lots:
+            if needed == 0:
+                break
+            if lot.expiry_date < today:
+                continue
+            units = min(lot.remaining, needed)
+            parts.append((medicine_id, lot.id, units))
+            needed -= units
+        if needed:
+            parts.append((medicine_id, None, needed))
+    return parts
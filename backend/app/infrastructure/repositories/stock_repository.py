@@ -0,0 +1,238 @@
+from fastapi import HTTPException
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.domain.models.stock import RECEIPT, MedicineLot as DomainMedicineLot, StockMovement as DomainStockMovement
+from app.domain.repositories.stock_repository import StockRepository
+from app.infrastructure.db.models.medicine import Medicine as DbMedicine
+from app.infrastructure.db.models.stock import (
+    LotSnapshot as DbLotSnapshot, MedicineLot as DbMedicineLot, StockMovement as DbStockMovement, StockSnapshot as DbStockSnapshot,
+)
+from app.infrastructure.repositories.stock_ledger import append_movements, lock_stock
+from app.infrastructure.repositories.upsert import dialect_insert
+
+class StockRepositoryImpl(StockRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record(self, medicine_id: int, kind: str, quantity: int, note: Optional[str] = None, lot_id: Optional[int] = None) -> Optional[DomainStockMovement]:
+        """Append and commit one movement; None if it would make stock negative."""
+        self._get_medicine(medicine_id)
+        if lot_id is not None:
+            self._get_lot(medicine_id, lot_id)
+        lock_stock(self.session, [medicine_id])
+        rows = append_movements(self.session, kind, {medicine_id: quantity}, note, lot_id=lot_id)
+        if not rows:
+            self.session.rollback()
+            return None
+        self.session.commit()
+        return _to_domain_movement(rows[0])
+
+    def receive_lot(self, medicine_id: int, batch_number: str, expiry_date: date, quantity: int, note: Optional[str] = None) -> DomainMedicineLot:
+        """
+        Record a delivery into a lot, creating the lot the first time its
+        batch number is seen for the medicine. Commits.
+        """
+        medicine = self._get_medicine(medicine_id)
+        if medicine.is_deleted:
+            raise HTTPException(status_code=404, detail="Medicine not found")
+        lock_stock(self.session, [medicine_id])
+        lot = (
+            self.session.query(DbMedicineLot)
+            .filter(DbMedicineLot.medicine_id == medicine_id, DbMedicineLot.batch_number == batch_number)
+            .first()
+        )
+        if lot is None:
+            lot = DbMedicineLot(medicine_id=medicine_id, batch_number=batch_number, expiry_date=expiry_date)
+            self.session.add(lot)
+            self.session.flush()
+        elif lot.expiry_date != expiry_date:
+            self.session.rollback()
+            raise HTTPException(status_code=400, detail="Batch already exists with a different expiry date")
+
+        append_movements(self.session, RECEIPT, {medicine_id: quantity}, note, lot_id=lot.id)
+        self.session.commit()
+        self.session.refresh(lot)
+        return _to_domain_lot(lot, medicine.name)
+
+    def get_lots(self, medicine_id: int) -> List[DomainMedicineLot]:
+        """Lots with units left, in the order sales draw from them."""
+        medicine = self._get_medicine(medicine_id)
+        lots = (
+            self.session.query(DbMedicineLot)
+            .filter(DbMedicineLot.medicine_id == medicine_id, DbMedicineLot.remaining > 0)
+            .order_by(DbMedicineLot.expiry_date, DbMedicineLot.id)
+            .all()
+        )
+        return [_to_domain_lot(lot, medicine.name) for lot in lots]
+
+    def get_expiring(self, expiring_by: date, limit: int) -> List[DomainMedicineLot]:
+        """
+        Lots with units left that expire on or before `expiring_by`, already
+        expired ones included, soonest first. Walks ix_medicine_lots_expiry_date
+        in order, so only lots inside the window are read.
+        """
+        rows = (
+            self.session.query(DbMedicineLot, DbMedicine.name)
+            .join(DbMedicine, DbMedicine.id == DbMedicineLot.medicine_id)
+            .filter(
+                DbMedicineLot.expiry_date <= expiring_by,
+                DbMedicineLot.remaining > 0,
+                DbMedicine.is_deleted == False,
+            )
+            .order_by(DbMedicineLot.expiry_date, DbMedicineLot.id)
+            .limit(limit)
+            .all()
+        )
+        return [_to_domain_lot(lot, name) for lot, name in rows]
+
+    def get_movements(self, medicine_id: int, limit: int, before_id: Optional[int] = None) -> List[DomainStockMovement]:
+        # Keyset pagination: newest movements first, continuing below the last id seen
+        self._get_medicine(medicine_id)
+        query = self.session.query(DbStockMovement).filter(DbStockMovement.medicine_id == medicine_id)
+        if before_id is not None:
+            query = query.filter(DbStockMovement.id < before_id)
+        movements = query.order_by(DbStockMovement.id.desc()).limit(limit).all()
+        return [_to_domain_movement(m) for m in movements]
+
+    def get_stock_at(self, medicine_id: int, at: datetime) -> int:
+        # Snapshots only hold the latest state, so past stock is summed from
+        # the ledger itself, which is never rewritten
+        self._get_medicine(medicine_id)
+        stock = self.session.execute(
+            select(func.sum(DbStockMovement.quantity)).where(
+                DbStockMovement.medicine_id == medicine_id,
+                DbStockMovement.created_date <= at,
+            )
+        ).scalar()
+        return stock or 0
+
+    def compact(self, batch_size: int = 500) -> int:
+        """
+        Fold the movements recorded since each medicine's snapshot into a new
+        snapshot, and those of each of its lots into the lot's, so reading
+        current stock or a lot's remaining units only sums a short tail of
+        the ledger. Movements are kept for auditing. Returns the number of
+        medicine snapshots written.
+        """
+        after_snapshot = DbStockMovement.id > func.coalesce(DbStockSnapshot.last_movement_id, 0)
+        medicine_ids = self.session.execute(
+            select(DbStockMovement.medicine_id)
+            .outerjoin(DbStockSnapshot, DbStockSnapshot.medicine_id == DbStockMovement.medicine_id)
+            .where(after_snapshot)
+            .distinct()
+        ).scalars().all()
+        self.session.rollback()
+
+        compacted = 0
+        for start in range(0, len(medicine_ids), batch_size):
+            batch = medicine_ids[start:start + batch_size]
+            try:
+                # Under the lock no movement for these medicines is in flight,
+                # so none can later commit with an id below the snapshot's
+                lock_stock(self.session, batch)
+                rows = self.session.execute(
+                    select(
+                        DbStockMovement.medicine_id,
+                        func.coalesce(DbStockSnapshot.stock, 0).label("stock"),
+                        func.sum(DbStockMovement.quantity).label("delta"),
+                        func.max(DbStockMovement.id).label("last_movement_id"),
+                    )
+                    .outerjoin(DbStockSnapshot, DbStockSnapshot.medicine_id == DbStockMovement.medicine_id)
+                    .where(DbStockMovement.medicine_id.in_(batch), after_snapshot)
+                    .group_by(DbStockMovement.medicine_id, DbStockSnapshot.stock)
+                ).all()
+                if rows:
+                    taken_at = datetime.now(timezone.utc)
+                    stmt = dialect_insert(self.session, DbStockSnapshot).values([
+                        dict(
+                            medicine_id=r.medicine_id,
+                            stock=r.stock + r.delta,
+                            last_movement_id=r.last_movement_id,
+                            taken_at=taken_at,
+                        )
+                        for r in rows
+                    ])
+                    self.session.execute(stmt.on_conflict_do_update(
+                        index_elements=[DbStockSnapshot.medicine_id],
+                        set_=dict(
+                            stock=stmt.excluded.stock,
+                            last_movement_id=stmt.excluded.last_movement_id,
+                            taken_at=stmt.excluded.taken_at,
+                        ),
+                    ))
+                    self._compact_lots(batch, taken_at)
+                self.session.commit()
+            except Exception:
+                self.session.rollback()
+                raise
+            compacted += len(rows)
+        return compacted
+
+    def _compact_lots(self, medicine_ids: List[int], taken_at: datetime):
+        # Called under the medicines' stock lock, like their own snapshots
+        rows = self.session.execute(
+            select(
+                DbStockMovement.lot_id,
+                func.coalesce(DbLotSnapshot.remaining, 0).label("remaining"),
+                func.sum(DbStockMovement.quantity).label("delta"),
+                func.max(DbStockMovement.id).label("last_movement_id"),
+            )
+            .outerjoin(DbLotSnapshot, DbLotSnapshot.lot_id == DbStockMovement.lot_id)
+            .where(
+                DbStockMovement.medicine_id.in_(medicine_ids),
+                DbStockMovement.lot_id.is_not(None),
+                DbStockMovement.id > func.coalesce(DbLotSnapshot.last_movement_id, 0),
+            )
+            .group_by(DbStockMovement.lot_id, DbLotSnapshot.remaining)
+        ).all()
+        if not rows:
+            return
+        stmt = dialect_insert(self.session, DbLotSnapshot).values([
+            dict(lot_id=r.lot_id, remaining=r.remaining + r.delta, last_movement_id=r.last_movement_id, taken_at=taken_at)
+            for r in rows
+        ])
+        self.session.execute(stmt.on_conflict_do_update(
+            index_elements=[DbLotSnapshot.lot_id],
+            set_=dict(
+                remaining=stmt.excluded.remaining,
+                last_movement_id=stmt.excluded.last_movement_id,
+                taken_at=stmt.excluded.taken_at,
+            ),
+        ))
+
+    def _get_lot(self, medicine_id: int, lot_id: int) -> DbMedicineLot:
+        lot = self.session.get(DbMedicineLot, lot_id)
+        if not lot or lot.medicine_id != medicine_id:
+            raise HTTPException(status_code=404, detail="Lot not found")
+        return lot
+
+    def _get_medicine(self, medicine_id: int) -> DbMedicine:
+        # Deleted medicines keep their history, so they are not filtered out
+        medicine = self.session.get(DbMedicine, medicine_id)
+        if not medicine:
+            raise HTTPException(status_code=404, detail="Medicine not found")
+        return medicine
+
+def _to_domain_movement(movement) -> DomainStockMovement:
+    return DomainStockMovement(
+        id=movement.id,
+        medicine_id=movement.medicine_id,
+        kind=movement.kind,
+        quantity=movement.quantity,
+        note=movement.note,
+        created_date=movement.created_date,
+        lot_id=movement.lot_id,
+    )
+
+def _to_domain_lot(lot: DbMedicineLot, medicine_name: Optional[str] = None) -> DomainMedicineLot:
+    return DomainMedicineLot(
+        id=lot.id,
+        medicine_id=lot.medicine_id,
+        batch_number=lot.batch_number,
+        expiry_date=lot.expiry_date,
+        remaining=lot.remaining,
+        received_date=lot.received_date,
+        medicine_name=medicine_name,
+    )
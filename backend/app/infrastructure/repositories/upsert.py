@@ -0,0 +1,39 @@
+from typing import Iterable
+from sqlalchemy import Column, Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(session: Session, model):
+    """INSERT construct for the session's backend, exposing ON CONFLICT clauses."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT is not supported for {dialect}")
+
+
+def insert_or_revive(session: Session, table: Table, key: Column, deleted, revived_columns: Iterable[str], **revived_values):
+    """
+    INSERT into a soft-deletable, versioned table in one statement. When a
+    row with the same `key` already exists and `deleted` holds for it, that
+    row is revived instead: `revived_columns` are copied from the inserted
+    values, `revived_values` are set and its version is bumped. A row that
+    exists and is not deleted is left alone and not returned.
+
+    RETURNING yields every row written, so no lookup beforehand is needed
+    and concurrent creates of the same key cannot both succeed. A returned
+    row with version 1 was inserted; a revived row's version is higher.
+    Execute it with one parameter dict, or a list of them for many rows.
+    """
+    stmt = dialect_insert(session, table)
+    return stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_=dict(
+            {column: stmt.excluded[column] for column in revived_columns},
+            version=table.c.version + 1,
+            **revived_values,
+        ),
+        where=deleted,
+    ).returning(*table.c)
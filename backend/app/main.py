@@ -1,13 +1,27 @@
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.infrastructure.db.base import Base
-from app.infrastructure.db.session import engine
-from app.presentation.api import bills, medicines, patient
+from app.infrastructure.db.migrations import get_runner
+from app.infrastructure.db.session import engine, settings
+from app.presentation.api import bills, medicines, metrics, patient, reports, stock
+from app.presentation.api.read_your_writes import pin_writers_to_primary
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Bring the schema up to date
+if settings.MIGRATE_ON_STARTUP:
+    get_runner(engine, settings.MIGRATION_LOCK_TIMEOUT_SECONDS).migrate()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync routes share this many threads; the connection pools are sized
+    # to match (see Settings)
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.middleware("http")(pin_writers_to_primary)
 
 # ✅ Allow requests from your React frontend
 origins = [
@@ -23,12 +37,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow GET, POST, PUT, DELETE, etc.
     allow_headers=["*"],  # Allow all headers (like Authorization, Content-Type)
+    expose_headers=["X-Next-Cursor", "X-Total-Count-Estimate", "Idempotent-Replayed", "ETag"],
 )
 
 # ✅ Include your routers
 app.include_router(medicines.router, prefix="/v1")
 app.include_router(bills.router, prefix="/v1")
 app.include_router(patient.router, prefix="/v1")
+app.include_router(reports.router, prefix="/v1")
+app.include_router(stock.router, prefix="/v1")
+app.include_router(metrics.router, prefix="/v1")
 
 
 @app.get("/")
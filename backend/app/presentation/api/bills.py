@@ -1,30 +1,183 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, List, Optional
+from uuid import UUID
+import csv
+import io
 
 from app.application.use_cases.bill.create_bill import CreateBill
+from app.application.use_cases.bill.create_bills_batch import CreateBillsBatch
 from app.application.use_cases.bill.get_all_bills import GetAllBills
-from app.application.dto.bill_dto import BillDTO
-from app.presentation.schemas.bill_schema import BillCreate
+from app.application.use_cases.bill.export_bills import ExportBills
+from app.application.use_cases.bill.get_bill_receipt import GetBillReceipt
+from app.application.use_cases.bill.get_patient_bills import GetPatientBills
+from app.application.dto.bill_dto import BillDTO, BillBatchResultDTO, PatientBillsDTO, ReceiptDTO
+from app.presentation.schemas.bill_schema import BillCreate, BillBatchCreate
 from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
 from app.infrastructure.repositories.medicine_repository import MedicineRepositoryImpl
-from app.presentation.api.deps import get_db
+from app.infrastructure.repositories.report_repository import ReportRepositoryImpl
+from app.infrastructure.repositories.patient_repository import PatientRepositoryImpl
+from app.infrastructure.db.session import SessionLocal
+from app.presentation.api.deps import get_db, get_read_db
+from app.presentation.api.idempotency import run_idempotent
 
 router = APIRouter()
 
 @router.post("/bills", response_model=BillDTO)
-def create_bill(bill: BillCreate, db: Session = Depends(get_db)):
+def create_bill(
+    bill: BillCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+):
     bill_repository = BillRepositoryImpl(db)
     medicine_repository = MedicineRepositoryImpl(db)
-    create_bill_uc = CreateBill(bill_repository, medicine_repository)
-    try:
-        return create_bill_uc.execute(bill.patient_name, bill.patient_age, [item.dict() for item in bill.items])
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    report_repository = ReportRepositoryImpl(db)
+    patient_repository = PatientRepositoryImpl(db)
+    create_bill_uc = CreateBill(bill_repository, medicine_repository, report_repository, patient_repository)
+
+    def create():
+        try:
+            return create_bill_uc.execute(bill.patient_name, bill.patient_age, [item.dict() for item in bill.items], bill.patient_id)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return run_idempotent(db, "bills", idempotency_key, bill, create)
+
+@router.post("/bills/batch", response_model=List[BillBatchResultDTO])
+def create_bills_batch(
+    batch: BillBatchCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+):
+    """
+    Create many bills in one request, e.g. sales uploaded by an offline
+    counter. Each bill reports its own success or failure, in request order.
+    """
+    bill_repository = BillRepositoryImpl(db)
+    medicine_repository = MedicineRepositoryImpl(db)
+    report_repository = ReportRepositoryImpl(db)
+    patient_repository = PatientRepositoryImpl(db)
+    create_bills_batch_uc = CreateBillsBatch(bill_repository, medicine_repository, report_repository, patient_repository)
+    return run_idempotent(
+        db, "bills/batch", idempotency_key, batch,
+        lambda: create_bills_batch_uc.execute([bill.model_dump() for bill in batch.bills]),
+    )
 
 @router.get("/bills", response_model=List[BillDTO])
-def get_all_bills(db: Session = Depends(get_db)):
+def get_all_bills(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    patient_name: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Newest bills first, one page at a time. When more bills follow, the
+    X-Next-Cursor response header holds the value to pass as `cursor`.
+    `date_from` and `date_to` are inclusive calendar days (UTC).
+    """
     bill_repository = BillRepositoryImpl(db)
     get_all_bills_uc = GetAllBills(bill_repository)
-    return get_all_bills_uc.execute()
+    page = get_all_bills_uc.execute(
+        limit=limit,
+        cursor=cursor,
+        patient_name=patient_name,
+        created_from=_start_of_day(date_from) if date_from else None,
+        created_to=_start_of_day(date_to + timedelta(days=1)) if date_to else None,
+    )
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(page.next_cursor)
+    return page.items
+
+@router.get("/patient/{patient_id}/bills", response_model=PatientBillsDTO)
+def get_patient_bills(
+    patient_id: UUID,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    A patient's bills, newest first, with lifetime totals. Paged like
+    GET /bills: pass the X-Next-Cursor header back as `cursor`.
+    """
+    get_patient_bills_uc = GetPatientBills(BillRepositoryImpl(db), PatientRepositoryImpl(db))
+    page = get_patient_bills_uc.execute(patient_id, limit=limit, cursor=cursor)
+    if not page:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(page.next_cursor)
+    return page
+
+@router.get("/bills/export")
+def export_bills(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """
+    Stream every bill (optionally limited to a UTC date range) as NDJSON, one
+    bill per line, or as CSV, one bill item per line.
+    """
+    created_from = _start_of_day(date_from) if date_from else None
+    created_to = _start_of_day(date_to + timedelta(days=1)) if date_to else None
+    if export_format == "csv":
+        return StreamingResponse(
+            _stream_csv(created_from, created_to),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="bills.csv"'},
+        )
+    return StreamingResponse(_stream_ndjson(created_from, created_to), media_type="application/x-ndjson")
+
+@router.get("/bills/{bill_id}", response_model=ReceiptDTO)
+def get_bill(bill_id: int, db: Session = Depends(get_db)):
+    """The bill's receipt exactly as billed, read from its snapshot."""
+    bill_repository = BillRepositoryImpl(db)
+    get_bill_receipt_uc = GetBillReceipt(bill_repository)
+    receipt = get_bill_receipt_uc.execute(bill_id)
+    if not receipt:
+        raise HTTPException(status_code=404, detail="Bill not found")
+    return receipt
+
+CSV_COLUMNS = [
+    "bill_id", "created_date", "patient_name", "patient_age", "total_amount",
+    "item_id", "medicine_id", "medicine_name", "quantity", "price_per_unit",
+]
+
+def _iter_export(created_from: Optional[datetime], created_to: Optional[datetime]) -> Iterator[BillDTO]:
+    # The stream outlives the request handler, so it owns its session
+    db = SessionLocal()
+    try:
+        yield from ExportBills(BillRepositoryImpl(db)).execute(created_from, created_to)
+    finally:
+        db.close()
+
+def _stream_ndjson(created_from: Optional[datetime], created_to: Optional[datetime]) -> Iterator[str]:
+    for bill in _iter_export(created_from, created_to):
+        yield bill.model_dump_json() + "\n"
+
+def _stream_csv(created_from: Optional[datetime], created_to: Optional[datetime]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for bill in _iter_export(created_from, created_to):
+        created = bill.created_date.isoformat() if bill.created_date else ""
+        bill_columns = [bill.id, created, bill.patient_name, bill.patient_age, bill.total_amount]
+        if not bill.bill_items:
+            # Keep bills without items in the export, with the item columns empty
+            writer.writerow(bill_columns + [""] * (len(CSV_COLUMNS) - len(bill_columns)))
+        for item in bill.bill_items:
+            writer.writerow(bill_columns + [
+                item.id, item.medicine_id, item.medicine.name, item.quantity, item.price_per_unit,
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+def _start_of_day(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
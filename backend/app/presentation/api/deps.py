@@ -1,5 +1,7 @@
+from fastapi import Request
 
-from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.db.session import ReplicaSessionLocal, SessionLocal
+from app.presentation.api.read_your_writes import pinned_to_primary
 
 def get_db():
     db = SessionLocal()
@@ -7,3 +9,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request):
+    """
+    Session for read-only routes: the replica when DATABASE_REPLICA_URL is
+    set, except for clients that wrote in the last READ_YOUR_WRITES_SECONDS.
+    The database read from is in db.info["source"], "primary" or "replica".
+    """
+    source = "primary" if ReplicaSessionLocal is None or pinned_to_primary(request) else "replica"
+    db = (ReplicaSessionLocal if source == "replica" else SessionLocal)()
+    db.info["source"] = source
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,25 @@
+
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+
+def format_etag(version: int) -> str:
+    return '"{}"'.format(version)
+
+def etag_values(header: str) -> List[str]:
+    """The entity tags listed in an If-Match / If-None-Match header, weak prefixes dropped."""
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+def expected_version(if_match: Optional[str]) -> Optional[int]:
+    """
+    The resource version an If-Match header asks for; None when the header is
+    absent or `*`, in which case the update is not conditional.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    tags = etag_values(if_match)
+    # Only a single version can match the current one
+    if len(tags) != 1 or not tags[0].strip('"').isdigit():
+        raise HTTPException(status_code=412, detail="If-Match does not match the current version")
+    return int(tags[0].strip('"'))
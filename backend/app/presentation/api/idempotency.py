@@ -0,0 +1,68 @@
+
+import hashlib
+import json
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.infrastructure.repositories.idempotency_store import IdempotencyStore, StoredResponse
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+def run_idempotent(db: Session, scope: str, key: Optional[str], payload: BaseModel, handler: Callable[[], Any]):
+    """
+    Run `handler` at most once per Idempotency-Key. A retry with the same key
+    and body gets the stored response back instead of repeating the write.
+    Failed requests are not stored, so they can be retried with the same key.
+
+    The reservation outlives a crashed request only for its lease, unless
+    the handler had already committed: then the key is held for the full
+    TTL with the handler's first commit. If the process dies between that
+    commit and storing the response, retries get 409 until the key expires;
+    running the request again would repeat its writes.
+    """
+    if not key:
+        return handler()
+
+    store = IdempotencyStore(db)
+    request_hash = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+    stored = store.get(scope, key)
+    if stored is not None:
+        return _replay(stored, request_hash)
+    if not store.reserve(scope, key, request_hash):
+        # Another request claimed the key between the lookup and the reservation
+        return _replay(store.get(scope, key) or StoredResponse(request_hash=request_hash), request_hash)
+
+    try:
+        with store.hold_on_commit(scope, key) as committed:
+            result = handler()
+    except Exception:
+        # A handler that committed before failing keeps the key held
+        if not committed:
+            store.release(scope, key)
+        raise
+
+    body = jsonable_encoder(result)
+    try:
+        store.complete(scope, key, request_hash, 200, json.dumps(body))
+    except Exception:
+        # The writes are committed, so the response is still the client's;
+        # retries get 409 instead of a replay until the key expires
+        db.rollback()
+    return JSONResponse(content=body)
+
+def _replay(stored: StoredResponse, request_hash: str) -> JSONResponse:
+    if stored.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    if stored.in_progress:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    return JSONResponse(
+        content=json.loads(stored.response_body),
+        status_code=stored.status_code,
+        headers={REPLAYED_HEADER: "true"},
+    )
@@ -1,38 +1,100 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import csv
+import io
+import tempfile
 
 from app.application.use_cases.medicine.add_medicine import AddMedicine
 from app.application.use_cases.medicine.get_all_medicines import GetAllMedicines
 from app.application.use_cases.medicine.update_medicine import UpdateMedicine
 from app.application.use_cases.medicine.delete_medicine import DeleteMedicine
-from app.application.dto.medicine_dto import MedicineDTO,MedicineUpdateDTO
+from app.application.use_cases.medicine.search_medicines import SearchMedicines
+from app.application.use_cases.medicine.import_medicines import ImportMedicines, REQUIRED_FIELDS
+from app.application.dto.medicine_dto import MedicineDTO,MedicineUpdateDTO,MedicineImportResultDTO
 from app.presentation.schemas.medicine_schema import MedicineCreate
 from app.infrastructure.repositories.medicine_repository import MedicineRepositoryImpl
-from app.presentation.api.deps import get_db
+from app.presentation.api.deps import get_db, get_read_db
+from app.presentation.api.etags import etag_values, expected_version, format_etag
 
 router = APIRouter()
 
+# Uploads larger than this are buffered on disk instead of in memory
+IMPORT_SPOOL_BYTES = 1024 * 1024
+
 @router.post("/medicines", response_model=MedicineDTO)
 def add_medicine(medicine: MedicineCreate, db: Session = Depends(get_db)):
     medicine_repository = MedicineRepositoryImpl(db)
     add_medicine_uc = AddMedicine(medicine_repository)
     return add_medicine_uc.execute(medicine.name, medicine.price_per_unit, medicine.stock)
 
+@router.post("/medicines/import", response_model=MedicineImportResultDTO)
+async def import_medicines(request: Request, db: Session = Depends(get_db)):
+    """
+    Bulk load medicines from a CSV request body (Content-Type: text/csv) with
+    a header line naming the columns name, price_per_unit and stock.
+    Soft-deleted medicines are revived, existing ones are skipped; the result
+    lists skipped rows, numbered from 1 after the header.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+
+        reader = csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""))
+        missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            raise HTTPException(status_code=400, detail="CSV header is missing: " + ", ".join(missing))
+
+        medicine_repository = MedicineRepositoryImpl(db)
+        import_medicines_uc = ImportMedicines(medicine_repository)
+        # The import runs blocking database calls, so keep it off the event loop
+        return await run_in_threadpool(import_medicines_uc.execute, reader)
+
 @router.get("/medicines", response_model=List[MedicineDTO])
-def get_all_medicines(db: Session = Depends(get_db)):
+def get_all_medicines(
+    response: Response,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: Session = Depends(get_read_db),
+):
+    medicine_repository = MedicineRepositoryImpl(db)
+    get_all_medicines_uc = GetAllMedicines(medicine_repository, db.info["source"])
+    catalog = get_all_medicines_uc.execute()
+
+    etag = '"{}"'.format(catalog.etag)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in etag_values(if_none_match):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return catalog.medicines
+
+@router.get("/medicines/search", response_model=List[MedicineDTO])
+def search_medicines(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    """Ranked, typo-tolerant matches on medicine name, for counter autocomplete."""
     medicine_repository = MedicineRepositoryImpl(db)
-    get_all_medicines_uc = GetAllMedicines(medicine_repository)
-    return get_all_medicines_uc.execute()
+    search_medicines_uc = SearchMedicines(medicine_repository)
+    return search_medicines_uc.execute(q, limit)
 
 @router.patch("/medicines/{id}", response_model=MedicineDTO)
-def update_medicine(id: int, update_dto: MedicineUpdateDTO,db: Session = Depends(get_db)):
+def update_medicine(
+    id: int,
+    update_dto: MedicineUpdateDTO,
+    response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
+    db: Session = Depends(get_db),
+):
+    """
+    Partial update. Send the medicine's version as If-Match (e.g. "3") to
+    have the update rejected with 412 if someone else changed it first.
+    """
     repo = MedicineRepositoryImpl(db)
     use_case = UpdateMedicine(repo)
-    updated = use_case.execute(id, update_dto)
+    updated = use_case.execute(id, update_dto, expected_version(if_match))
     if not updated:
         return {"error": "Medicine not found"}
+    response.headers["ETag"] = format_etag(updated.version)
     return updated
 
 @router.delete("/medicines/{medicine_id}")
@@ -0,0 +1,28 @@
+from anyio import to_thread
+from fastapi import APIRouter
+
+from app.infrastructure.db.pool import pool_stats
+from app.presentation.schemas.metrics_schema import DatabaseMetrics, PoolMetrics, ThreadpoolMetrics
+
+router = APIRouter()
+
+@router.get("/metrics/db", response_model=DatabaseMetrics)
+async def get_database_metrics():
+    """
+    Live threadpool and connection pool usage of this worker process, for
+    tuning THREADPOOL_SIZE and the DB_POOL_* settings. Checkout counts and
+    waits are totals since the process started; a checkout's wait includes
+    the pre-ping. Sustained saturation near 1, waiting checkouts or
+    timeouts mean requests are queueing for connections.
+    """
+    limiter = to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return DatabaseMetrics(
+        threadpool=ThreadpoolMetrics(
+            size=int(limiter.total_tokens),
+            busy=statistics.borrowed_tokens,
+            waiting=statistics.tasks_waiting,
+            saturation=round(statistics.borrowed_tokens / limiter.total_tokens, 3),
+        ),
+        pools=[PoolMetrics.model_validate(stats) for stats in pool_stats()],
+    )
@@ -1,77 +1,235 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 
-from app.presentation.api.deps import get_db
-from app.application.dto.patient_dto import PatientDTO
+from app.presentation.api.deps import get_db, get_read_db
+from app.presentation.api.idempotency import run_idempotent
+from app.presentation.api.etags import expected_version, format_etag
+from app.application.dto.patient_dto import PatientBatchResultDTO, PatientDTO, PatientDuplicateDTO
 from app.application.use_cases.patient.add_patient import AddPatient
+from app.application.use_cases.patient.register_patients_batch import RegisterPatientsBatch
+from app.application.use_cases.patient.patient_duplicates import (
+    ListPatientDuplicates,
+    MergePatientDuplicate,
+    DismissPatientDuplicate,
+)
 from app.application.use_cases.patient.patient_use_cases import (
     GetPatient,
     ListPatients,
+    SearchPatients,
     UpdatePatient,
     DeletePatient,
 )
 from app.infrastructure.repositories.patient_repository import PatientRepositoryImpl
-from app.presentation.schemas.patient_schema import PatientCreate, PatientUpdate
+from app.infrastructure.repositories.patient_duplicate_repository import PatientDuplicateRepositoryImpl
+from app.presentation.schemas.patient_schema import PatientBatchCreate, PatientCreate, PatientUpdate
 
 router = APIRouter()
 
 
 @router.post("/patient", response_model=PatientDTO)
-def add_patient(patient: PatientCreate, db: Session = Depends(get_db)):
+def add_patient(
+    patient: PatientCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+):
     patient_repository = PatientRepositoryImpl(db)
     add_patient_uc = AddPatient(patient_repository)
-    return add_patient_uc.execute(
-        patient.first_name,
-        patient.last_name,
-        patient.date_of_birth,
-        patient.age,
-        patient.gender,
-        patient.phone_number,
-        patient.email,
-        patient.address,
-        patient.patient_type,
-        patient.guardian_name,
-        patient.guardian_phone,
+    return run_idempotent(
+        db, "patient", idempotency_key, patient,
+        lambda: add_patient_uc.execute(
+            patient.first_name,
+            patient.last_name,
+            patient.date_of_birth,
+            patient.age,
+            patient.gender,
+            patient.phone_number,
+            patient.email,
+            patient.address,
+            patient.patient_type,
+            patient.guardian_name,
+            patient.guardian_phone,
+        ),
+    )
+
+
+@router.post("/patients/batch", response_model=List[PatientBatchResultDTO])
+def register_patients_batch(
+    batch: PatientBatchCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+):
+    """
+    Register up to 1000 patients in one request. Deactivated patients with
+    the same phone number are revived; rows whose phone number is already
+    registered are reported as duplicates and left unchanged.
+    """
+    patient_repository = PatientRepositoryImpl(db)
+    register_patients_batch_uc = RegisterPatientsBatch(patient_repository)
+    return run_idempotent(
+        db, "patients/batch", idempotency_key, batch,
+        lambda: register_patients_batch_uc.execute([patient.model_dump(mode="json") for patient in batch.patients]),
     )
 
 
+FIELDS_DESCRIPTION = (
+    "Comma-separated patient fields to return, e.g. first_name,phone_number,age. "
+    "Only those columns are read; patient_id and version are always included."
+)
+
+
 @router.get("/patient/{patient_id}", response_model=PatientDTO)
-def get_patient(patient_id: str, db: Session = Depends(get_db)):
+def get_patient(
+    patient_id: UUID,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+):
     patient_repository = PatientRepositoryImpl(db)
     get_patient_uc = GetPatient(patient_repository)
-    patient = get_patient_uc.execute(patient_id)
+    try:
+        patient = get_patient_uc.execute(patient_id, _split_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
+    if fields is not None:
+        response.headers["ETag"] = format_etag(patient["version"])
+        return _fields_response(patient, response)
+    response.headers["ETag"] = format_etag(patient.version)
     return patient
 
 
 @router.get("/patients", response_model=List[PatientDTO])
-def list_patients(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+def list_patients(
+    response: Response,
+    limit: int = Query(10, ge=1, le=200),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Patients in the order they were registered, one page at a time. When
+    more patients follow, the X-Next-Cursor response header holds the value
+    to pass as `cursor`. X-Total-Count-Estimate is an approximate number of
+    patients, from table statistics rather than a count. `skip` still works
+    but costs more the deeper it goes; prefer `cursor`.
+    """
     patient_repository = PatientRepositoryImpl(db)
     list_patients_uc = ListPatients(patient_repository)
-    return list_patients_uc.execute(skip, limit)
+    try:
+        page = list_patients_uc.execute(limit=limit, cursor=cursor, skip=skip, fields=_split_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total_estimate is not None:
+        response.headers["X-Total-Count-Estimate"] = str(page.total_estimate)
+    if fields is not None:
+        return _fields_response(page.items, response)
+    return page.items
+
+
+@router.get("/patients/search", response_model=List[PatientDTO])
+def search_patients(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """Find patients by the start of their phone number or name."""
+    patient_repository = PatientRepositoryImpl(db)
+    search_patients_uc = SearchPatients(patient_repository)
+    return search_patients_uc.execute(q, limit)
+
+
+@router.get("/patients/duplicates", response_model=List[PatientDuplicateDTO])
+def list_patient_duplicates(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Pairs of patients that are likely the same person, as found by
+    find_duplicate_patients.py, for review. When more pairs follow, the
+    X-Next-Cursor response header holds the value to pass as `cursor`.
+    """
+    patient_duplicate_repository = PatientDuplicateRepositoryImpl(db)
+    list_patient_duplicates_uc = ListPatientDuplicates(patient_duplicate_repository)
+    page = list_patient_duplicates_uc.execute(limit=limit, cursor=cursor)
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(page.next_cursor)
+    return page.items
+
+
+@router.post("/patients/duplicates/{duplicate_id}/merge", response_model=PatientDTO)
+def merge_patient_duplicate(duplicate_id: int, db: Session = Depends(get_db)):
+    """
+    Merge the pair into the patient registered first; the other patient is
+    deactivated. Returns the patient that was kept.
+    """
+    patient_duplicate_repository = PatientDuplicateRepositoryImpl(db)
+    merge_patient_duplicate_uc = MergePatientDuplicate(patient_duplicate_repository)
+    patient = merge_patient_duplicate_uc.execute(duplicate_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Duplicate not found or already resolved")
+    return patient
+
+
+@router.post("/patients/duplicates/{duplicate_id}/dismiss")
+def dismiss_patient_duplicate(duplicate_id: int, db: Session = Depends(get_db)):
+    """Mark the pair as different people; it will not be proposed again."""
+    patient_duplicate_repository = PatientDuplicateRepositoryImpl(db)
+    dismiss_patient_duplicate_uc = DismissPatientDuplicate(patient_duplicate_repository)
+    if not dismiss_patient_duplicate_uc.execute(duplicate_id):
+        raise HTTPException(status_code=404, detail="Duplicate not found or already resolved")
+    return {"message": "Duplicate dismissed"}
 
 
 @router.put("/patient/{patient_id}", response_model=PatientDTO)
 def update_patient(
-    patient_id: str, patient_data: PatientUpdate, db: Session = Depends(get_db)
+    patient_id: UUID,
+    patient_data: PatientUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
+    db: Session = Depends(get_db),
 ):
+    """
+    Send the ETag from GET /patient/{patient_id} as If-Match to have the
+    update rejected with 412 if the patient changed in the meantime.
+    """
     patient_repository = PatientRepositoryImpl(db)
     update_patient_uc = UpdatePatient(patient_repository)
     updated_patient = update_patient_uc.execute(
-        patient_id, patient_data.model_dump(exclude_unset=True)
+        patient_id, patient_data.model_dump(exclude_unset=True), expected_version(if_match)
     )
     if not updated_patient:
         raise HTTPException(status_code=404, detail="Patient not found")
+    response.headers["ETag"] = format_etag(updated_patient.version)
     return updated_patient
 
 
 @router.delete("/patient/{patient_id}")
-def delete_patient(patient_id: str, db: Session = Depends(get_db)):
+def delete_patient(patient_id: UUID, db: Session = Depends(get_db)):
     patient_repository = PatientRepositoryImpl(db)
     delete_patient_uc = DeletePatient(patient_repository)
     success = delete_patient_uc.execute(patient_id)
     if not success:
         raise HTTPException(status_code=404, detail="Patient not found")
     return {"message": "Patient deleted successfully"}
+
+
+def _split_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def _fields_response(content, response: Response) -> JSONResponse:
+    # Partial patients do not fit response_model, so they bypass its
+    # validation; the headers set on `response` are carried over
+    return JSONResponse(content=jsonable_encoder(content), headers=dict(response.headers))
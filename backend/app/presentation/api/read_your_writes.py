@@ -0,0 +1,27 @@
+import math
+import time
+
+from fastapi import Request
+
+from app.infrastructure.db.session import settings
+
+# Set on responses to writes; while it holds a future time, the client's
+# reads go to the primary instead of the replica
+PIN_COOKIE = "primary_until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+async def pin_writers_to_primary(request: Request, call_next):
+    response = await call_next(request)
+    if settings.DATABASE_REPLICA_URL and request.method in WRITE_METHODS and response.status_code < 400:
+        window = settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            PIN_COOKIE, f"{time.time() + window:.3f}",
+            max_age=math.ceil(window), httponly=True, samesite="lax",
+        )
+    return response
+
+def pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
@@ -0,0 +1,40 @@
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from app.application.use_cases.report.revenue_report import GetRevenueReport, GetMedicineSalesReport
+from app.application.dto.report_dto import RevenueReportDTO, MedicineSalesDTO
+from app.infrastructure.repositories.report_repository import ReportRepositoryImpl
+from app.presentation.api.deps import get_db
+
+router = APIRouter()
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366 * 5
+
+@router.get("/reports/revenue", response_model=RevenueReportDTO)
+def get_revenue_report(date_from: Optional[date] = None, date_to: Optional[date] = None, db: Session = Depends(get_db)):
+    """Revenue, units sold and bill count per UTC day, read from the daily rollups."""
+    date_from, date_to = _date_range(date_from, date_to)
+    report_repository = ReportRepositoryImpl(db)
+    get_revenue_report_uc = GetRevenueReport(report_repository)
+    return get_revenue_report_uc.execute(date_from, date_to)
+
+@router.get("/reports/revenue/medicines", response_model=List[MedicineSalesDTO])
+def get_medicine_sales_report(date_from: Optional[date] = None, date_to: Optional[date] = None, db: Session = Depends(get_db)):
+    """Revenue, units sold and bill count per medicine over the range, best sellers first."""
+    date_from, date_to = _date_range(date_from, date_to)
+    report_repository = ReportRepositoryImpl(db)
+    get_medicine_sales_report_uc = GetMedicineSalesReport(report_repository)
+    return get_medicine_sales_report_uc.execute(date_from, date_to)
+
+def _date_range(date_from: Optional[date], date_to: Optional[date]):
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail="Date range is too large")
+    return date_from, date_to
@@ -0,0 +1,92 @@
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from app.application.use_cases.stock.stock_ledger import (
+    RecordStockMovement,
+    GetStockMovements,
+    GetStockLevel,
+    ReceiveLot,
+    GetMedicineLots,
+    GetExpiringLots,
+)
+from app.application.dto.stock_dto import MedicineLotDTO, StockMovementDTO, StockLevelDTO
+from app.presentation.schemas.stock_schema import LotReceiptCreate, StockMovementCreate
+from app.infrastructure.repositories.stock_repository import StockRepositoryImpl
+from app.presentation.api.deps import get_db
+
+router = APIRouter()
+
+@router.post("/medicines/{medicine_id}/stock-movements", response_model=StockMovementDTO)
+def record_stock_movement(medicine_id: int, movement: StockMovementCreate, db: Session = Depends(get_db)):
+    """Record a receipt (stock added) or an adjustment (signed correction)."""
+    stock_repository = StockRepositoryImpl(db)
+    record_stock_movement_uc = RecordStockMovement(stock_repository)
+    try:
+        return record_stock_movement_uc.execute(medicine_id, movement.kind, movement.quantity, movement.note, movement.lot_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/medicines/{medicine_id}/stock-movements", response_model=List[StockMovementDTO])
+def get_stock_movements(
+    medicine_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    The medicine's stock ledger, newest first. When more movements follow,
+    the X-Next-Cursor response header holds the value to pass as `cursor`.
+    """
+    stock_repository = StockRepositoryImpl(db)
+    get_stock_movements_uc = GetStockMovements(stock_repository)
+    page = get_stock_movements_uc.execute(medicine_id, limit=limit, cursor=cursor)
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(page.next_cursor)
+    return page.items
+
+@router.get("/medicines/{medicine_id}/stock", response_model=StockLevelDTO)
+def get_stock_level(medicine_id: int, at: Optional[datetime] = None, db: Session = Depends(get_db)):
+    """Stock as of `at` (default now), reconstructed from the ledger."""
+    at = at or datetime.now(timezone.utc)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    stock_repository = StockRepositoryImpl(db)
+    get_stock_level_uc = GetStockLevel(stock_repository)
+    return get_stock_level_uc.execute(medicine_id, at)
+
+@router.post("/medicines/{medicine_id}/lots", response_model=MedicineLotDTO)
+def receive_lot(medicine_id: int, receipt: LotReceiptCreate, db: Session = Depends(get_db)):
+    """Receive units of one batch. Sales take stock from the batch expiring first."""
+    stock_repository = StockRepositoryImpl(db)
+    receive_lot_uc = ReceiveLot(stock_repository)
+    try:
+        return receive_lot_uc.execute(medicine_id, receipt.batch_number, receipt.expiry_date, receipt.quantity, receipt.note)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/medicines/{medicine_id}/lots", response_model=List[MedicineLotDTO])
+def get_medicine_lots(medicine_id: int, db: Session = Depends(get_db)):
+    """Lots with units left, earliest expiry first."""
+    stock_repository = StockRepositoryImpl(db)
+    get_medicine_lots_uc = GetMedicineLots(stock_repository)
+    return get_medicine_lots_uc.execute(medicine_id)
+
+@router.get("/lots/expiring", response_model=List[MedicineLotDTO])
+def get_expiring_lots(
+    days: int = Query(30, ge=0, le=3650),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Lots with units left expiring within `days` (expired ones included), soonest first."""
+    expiring_by = datetime.now(timezone.utc).date() + timedelta(days=days)
+    stock_repository = StockRepositoryImpl(db)
+    get_expiring_lots_uc = GetExpiringLots(stock_repository)
+    return get_expiring_lots_uc.execute(expiring_by, limit)
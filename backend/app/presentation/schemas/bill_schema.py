@@ -1,17 +1,30 @@
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
+from uuid import UUID
 
 class BillItemCreate(BaseModel):
     medicine_id: int
-    quantity: int
-    price_per_unit: Optional[float] = None
+    quantity: int = Field(gt=0)
+    price_per_unit: Optional[float] = Field(default=None, ge=0)
 
 class BillCreate(BaseModel):
-    patient_name: str
-    patient_age: int
+    # A registered patient's name and age are taken from their record
+    # unless given here
+    patient_id: Optional[UUID] = None
+    patient_name: Optional[str] = None
+    patient_age: Optional[int] = None
     items: List[BillItemCreate]
 
+    @model_validator(mode="after")
+    def check_patient(self):
+        if self.patient_id is None and (not self.patient_name or self.patient_age is None):
+            raise ValueError("patient_name and patient_age are required without patient_id")
+        return self
+
+class BillBatchCreate(BaseModel):
+    bills: List[BillCreate] = Field(..., min_length=1, max_length=500)
+
 class Bill(BaseModel):
     id: int
     patient_name: str
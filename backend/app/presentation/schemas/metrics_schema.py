@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import List
+
+class ThreadpoolMetrics(BaseModel):
+    size: int
+    busy: int
+    # Calls waiting for a free thread
+    waiting: int
+    saturation: float
+
+class PoolMetrics(BaseModel):
+    name: str
+    size: int
+    capacity: int
+    checked_out: int
+    idle: int
+    overflow: int
+    waiting: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+    saturation: float
+
+    class Config:
+        from_attributes = True
+
+class DatabaseMetrics(BaseModel):
+    threadpool: ThreadpoolMetrics
+    pools: List[PoolMetrics]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, validator
-from typing import Optional
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
 from enum import Enum
 
 
@@ -32,6 +32,10 @@ class PatientCreate(BaseModel):
         return v
 
 
+class PatientBatchCreate(BaseModel):
+    patients: List[PatientCreate] = Field(..., min_length=1, max_length=1000)
+
+
 class PatientUpdate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
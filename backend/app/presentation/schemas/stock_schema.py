@@ -0,0 +1,17 @@
+
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import Literal, Optional
+
+class StockMovementCreate(BaseModel):
+    kind: Literal["RECEIPT", "ADJUSTMENT"]
+    quantity: int
+    note: Optional[str] = None
+    # Correct a specific lot, e.g. to write off expired units
+    lot_id: Optional[int] = None
+
+class LotReceiptCreate(BaseModel):
+    batch_number: str = Field(..., min_length=1)
+    expiry_date: date
+    quantity: int
+    note: Optional[str] = None
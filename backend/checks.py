@@ -0,0 +1,48 @@
+"""
+Shared scaffolding for the test_*.py check scripts.
+Each script runs on its own, as `python test_x.py` or `pytest test_x.py`,
+because the app binds its database when app.main is first imported: call
+temp_database() before that import, state every expectation with check(),
+and hand the test functions to run() from the script's __main__ block.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+
+def temp_dir():
+    """A directory removed when the process exits."""
+    path = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, path, True)
+    return path
+
+
+def temp_database(name):
+    """Point DATABASE_URL at a new SQLite file in a temp_dir()."""
+    path = os.path.join(temp_dir(), name)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def check(name, condition):
+    """Print the outcome and fail the running test if it does not hold."""
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}")
+    assert condition, name
+
+
+def run(title, *tests):
+    """Run the tests in order and exit non-zero if any of them failed."""
+    print("=" * 60)
+    print(f"  {title}")
+    print("=" * 60)
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError:
+            failed += 1
+    print("\n   " + ("FAILED" if failed else "SUCCESS"))
+    sys.exit(1 if failed else 0)
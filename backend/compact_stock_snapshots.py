@@ -0,0 +1,21 @@
+"""
+Fold recent stock movements into per-medicine and per-lot snapshots
+Run this periodically (e.g. hourly from cron) so reading stock stays cheap
+"""
+
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.stock_repository import StockRepositoryImpl
+from app.application.use_cases.stock.stock_ledger import CompactStockSnapshots
+
+
+def compact_stock_snapshots():
+    db = SessionLocal()
+    try:
+        compacted = CompactStockSnapshots(StockRepositoryImpl(db)).execute()
+        print(f"✅ Snapshots updated for {compacted} medicines")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    compact_stock_snapshots()
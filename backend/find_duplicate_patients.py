@@ -0,0 +1,30 @@
+"""
+Find likely duplicate patients and store them for review at /v1/patients/duplicates
+Run this periodically (e.g. nightly from cron); pairs already found are not added again
+Usage: python find_duplicate_patients.py [workers]
+"""
+
+import sys
+
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.patient_duplicate_repository import PatientDuplicateRepositoryImpl
+from app.application.use_cases.patient.patient_duplicates import FindDuplicatePatients
+
+
+def find_duplicate_patients(workers=None):
+    db = SessionLocal()
+    try:
+        result = FindDuplicatePatients(PatientDuplicateRepositoryImpl(db)).execute(workers)
+    finally:
+        db.close()
+
+    print(f"✅ Scanned {result.patients} patients: {result.candidates} likely duplicates, {result.added} new")
+    if result.skipped_blocks:
+        print(f"ℹ️  Skipped {result.skipped_blocks} oversized blocks (e.g. a placeholder phone number)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 or (sys.argv[1:] and not sys.argv[1].isdigit()):
+        print(__doc__.strip())
+        sys.exit(1)
+    find_duplicate_patients(int(sys.argv[1]) if sys.argv[1:] else None)
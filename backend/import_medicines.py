@@ -0,0 +1,37 @@
+"""
+Bulk import medicines from a CSV file with the columns name, price_per_unit and stock
+Usage: python import_medicines.py catalog.csv
+"""
+
+import csv
+import sys
+
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.medicine_repository import MedicineRepositoryImpl
+from app.application.use_cases.medicine.import_medicines import ImportMedicines, REQUIRED_FIELDS
+
+
+def import_medicines(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            print("❌ CSV header is missing: " + ", ".join(missing))
+            return
+
+        db = SessionLocal()
+        try:
+            result = ImportMedicines(MedicineRepositoryImpl(db)).execute(reader)
+        finally:
+            db.close()
+
+    print(f"✅ Created {result.created}, revived {result.revived}, skipped {result.skipped}")
+    for error in result.errors:
+        print(f"   Row {error.row}: {error.error}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__.strip())
+        sys.exit(1)
+    import_medicines(sys.argv[1])
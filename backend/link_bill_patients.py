@@ -0,0 +1,24 @@
+"""
+Link bills written before bills carried a patient_id to their patients
+Safe to rerun; only bills that are still unlinked are looked at
+"""
+
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
+from app.infrastructure.repositories.patient_repository import PatientRepositoryImpl
+from app.application.use_cases.bill.link_bills_to_patients import LinkBillsToPatients
+
+
+def link_bill_patients():
+    db = SessionLocal()
+    try:
+        result = LinkBillsToPatients(BillRepositoryImpl(db), PatientRepositoryImpl(db)).execute()
+        print(f"✅ Linked {result.linked} of {result.scanned} unlinked bills")
+        if result.linked < result.scanned:
+            print("ℹ️ The rest match no patient, or more than one")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    link_bill_patients()
@@ -0,0 +1,37 @@
+"""
+Apply pending schema migrations
+Usage: python migrate.py            apply pending migrations
+       python migrate.py --status   list applied and pending migrations
+"""
+
+import sys
+
+from app.infrastructure.db.session import engine, settings
+from app.infrastructure.db.migrations import get_runner
+
+
+def migrate():
+    runner = get_runner(engine, settings.MIGRATION_LOCK_TIMEOUT_SECONDS)
+    applied = runner.migrate(log=print)
+    if applied:
+        print(f"✅ Applied {len(applied)} migrations")
+    else:
+        print("ℹ️  Database is up to date")
+
+
+def status():
+    runner = get_runner(engine, settings.MIGRATION_LOCK_TIMEOUT_SECONDS)
+    applied = runner.applied()
+    for migration in runner.migrations:
+        state = f"applied {applied[migration.version]}" if migration.version in applied else "pending"
+        print(f"{migration.version:04d}_{migration.name}: {state}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--status"]:
+        status()
+    elif sys.argv[1:]:
+        print(__doc__.strip())
+        sys.exit(1)
+    else:
+        migrate()
@@ -0,0 +1,22 @@
+"""
+Rebuild the daily revenue and per-medicine sales rollups from the bills table
+Run this once after upgrading, or whenever the rollups need to be recomputed
+"""
+
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
+from app.infrastructure.repositories.report_repository import ReportRepositoryImpl
+from app.application.use_cases.report.revenue_report import RebuildRevenueRollups
+
+
+def rebuild_revenue_rollups():
+    db = SessionLocal()
+    try:
+        RebuildRevenueRollups(BillRepositoryImpl(db), ReportRepositoryImpl(db)).execute()
+        print("✅ Revenue rollups rebuilt successfully!")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_revenue_rollups()
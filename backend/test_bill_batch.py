@@ -0,0 +1,92 @@
+"""
+Batch bill creation check.
+Runs the app against a throwaway SQLite database and sends batches that mix
+valid bills with bills that cannot be filled. The failing bills must be
+reported one by one, and the valid ones must still be committed, also when
+a bill fails only as it is written.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("batch.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
+from app.infrastructure.repositories.medicine_repository import MedicineRepositoryImpl
+from app.infrastructure.repositories.report_repository import ReportRepositoryImpl
+from app.application.use_cases.bill.create_bills_batch import CreateBillsBatch
+
+UNKNOWN_MEDICINE_ID = 99
+
+
+def bill(medicine_id, quantity):
+    return {"patient_name": "Batch Test", "patient_age": 30, "items": [{"medicine_id": medicine_id, "quantity": quantity}]}
+
+
+def test_batch():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Batch Test", "price_per_unit": 2.0, "stock": 5}).json()
+
+    response = client.post("/v1/bills/batch", json={"bills": [
+        bill(medicine["id"], 2),
+        bill(UNKNOWN_MEDICINE_ID, 1),
+        bill(medicine["id"], 10),
+        bill(medicine["id"], 3),
+    ]})
+    outcome = response.json()
+    check("batch with failing bills returns 200", response.status_code == 200)
+    check("valid bills are committed", [r["success"] for r in outcome] == [True, False, False, True])
+    check("unknown medicine is reported", outcome[1]["error"] == "Medicine not found")
+    check("short stock is reported", outcome[2]["error"] == "Insufficient stock")
+    check("stock is taken for the committed bills only", client.get("/v1/medicines").json()[0]["stock"] == 0)
+    check("committed bills are listed", len(client.get("/v1/bills").json()) == 2)
+
+    # Zero quantities are refused by the API; the use case must still not fail on them
+    db = SessionLocal()
+    try:
+        outcome = CreateBillsBatch(BillRepositoryImpl(db), MedicineRepositoryImpl(db), ReportRepositoryImpl(db)).execute([
+            bill(UNKNOWN_MEDICINE_ID, 0),
+        ])
+        check("unknown medicine with quantity 0 is reported", outcome[0].error == "Medicine not found")
+    finally:
+        db.close()
+
+    response = client.post("/v1/bills/batch", json={"bills": [bill(medicine["id"], -1)]})
+    check("negative quantity is rejected", response.status_code == 422)
+
+
+def test_write_failures():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Batch Write Test", "price_per_unit": 1.0, "stock": 10}).json()
+    stock_url = f"/v1/medicines/{medicine['id']}/stock"
+
+    response = client.post("/v1/bills/batch", json={"bills": [
+        {"patient_name": "Batch Test", "patient_age": 30, "items": []},
+        bill(medicine["id"], 1),
+    ]})
+    check("a bill without items is created with the others",
+          response.status_code == 200 and [r["success"] for r in response.json()] == [True, True])
+
+    # Bills the API would refuse, sent straight to the use case
+    unwritable = dict(bill(medicine["id"], 4), patient_name={"not": "a name"})
+    db = SessionLocal()
+    try:
+        outcome = CreateBillsBatch(BillRepositoryImpl(db), MedicineRepositoryImpl(db), ReportRepositoryImpl(db)).execute([
+            bill(medicine["id"], 0),
+            bill(medicine["id"], 2),
+            unwritable,
+            bill(medicine["id"], 3),
+        ])
+    finally:
+        db.close()
+    check("a zero quantity is reported on its bill", outcome[0].error == "Bill lines must sell a positive quantity at a non-negative price")
+    check("a bill that fails to be written fails alone", [r.success for r in outcome] == [False, True, False, True]
+          and outcome[2].error == "Bill could not be saved")
+    check("its stock is not taken", client.get(stock_url).json()["stock"] == 10 - 1 - 2 - 3)
+
+
+if __name__ == "__main__":
+    run("BATCH BILL CREATION", test_batch, test_write_failures)
@@ -0,0 +1,90 @@
+"""
+Concurrency stress test for bill creation.
+Many threads sell the same medicine at once against the configured database;
+stock must end at exactly zero and never go negative, and every unit sold
+must belong to exactly one successful bill. A bill without items sells
+nothing and must still be created.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from checks import check, run
+
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
+from app.infrastructure.repositories.medicine_repository import MedicineRepositoryImpl
+from app.infrastructure.repositories.report_repository import ReportRepositoryImpl
+from app.application.use_cases.bill.create_bill import CreateBill
+from app.application.use_cases.medicine.add_medicine import AddMedicine
+
+INITIAL_STOCK = 50
+WORKERS = 16
+ATTEMPTS = 200  # four times more units than are in stock
+
+
+def create_medicine():
+    db = SessionLocal()
+    try:
+        medicine = AddMedicine(MedicineRepositoryImpl(db)).execute(
+            f"Stress Test {uuid.uuid4().hex[:8]}", 1.0, INITIAL_STOCK
+        )
+        return medicine.id
+    finally:
+        db.close()
+
+
+def sell_one(medicine_id):
+    db = SessionLocal()
+    try:
+        CreateBill(BillRepositoryImpl(db), MedicineRepositoryImpl(db), ReportRepositoryImpl(db)).execute(
+            "Stress Test", 30, [{"medicine_id": medicine_id, "quantity": 1}]
+        )
+        return True
+    except Exception:
+        return False
+    finally:
+        db.close()
+
+
+def current_stock(medicine_id):
+    db = SessionLocal()
+    try:
+        return MedicineRepositoryImpl(db).get_by_id(medicine_id).stock
+    finally:
+        db.close()
+
+
+def test_bill_without_items():
+    medicine_id = create_medicine()
+    db = SessionLocal()
+    try:
+        bill = CreateBill(BillRepositoryImpl(db), MedicineRepositoryImpl(db), ReportRepositoryImpl(db)).execute(
+            "Stress Test", 30, []
+        )
+    finally:
+        db.close()
+    check("a bill without items is created", bill.id is not None and bill.bill_items == [] and bill.total_amount == 0.0)
+    check("it takes no stock", current_stock(medicine_id) == INITIAL_STOCK)
+
+
+def test_concurrent_sales():
+    medicine_id = create_medicine()
+    print(f"\nSelling {ATTEMPTS} units of medicine {medicine_id} "
+          f"(stock {INITIAL_STOCK}) from {WORKERS} threads...")
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(sell_one, [medicine_id] * ATTEMPTS))
+
+    sold = sum(results)
+    stock = current_stock(medicine_id)
+    print(f"   Successful bills: {sold}")
+    print(f"   Remaining stock: {stock}")
+
+    check("stock never goes negative", stock >= 0)
+    check("units sold and remaining stock add up", sold + stock == INITIAL_STOCK)
+    check("no sale is rejected while stock remains", stock == 0)
+
+
+if __name__ == "__main__":
+    run("BILL CREATION CONCURRENCY STRESS TEST", test_bill_without_items, test_concurrent_sales)
@@ -0,0 +1,89 @@
+"""
+Bill export check.
+Runs the app against a throwaway SQLite database. GET /v1/bills/export must
+stream every bill in id order, as NDJSON one bill per line or as CSV one
+item per row, keep bills without items, quote names safely in CSV, and
+limit the export to date_from/date_to when given.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta, timezone
+
+from checks import check, run, temp_database
+
+temp_database("export.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.main import app
+from app.infrastructure.db.models.bill import Bill as DbBill
+from app.infrastructure.db.session import SessionLocal
+from app.presentation.api.bills import CSV_COLUMNS
+
+TODAY = datetime.now(timezone.utc).date()
+
+
+def create_bills(client):
+    aspirin = client.post("/v1/medicines", json={"name": "Aspirin", "price_per_unit": 1.5, "stock": 100}).json()
+    syrup = client.post("/v1/medicines", json={"name": "Cough Syrup, 100ml", "price_per_unit": 4.0, "stock": 100}).json()
+
+    def bill(name, items):
+        return client.post("/v1/bills", json={"patient_name": name, "patient_age": 40, "items": items}).json()
+
+    return [
+        bill('Ravi "RK" Kumar, Jr.', [{"medicine_id": aspirin["id"], "quantity": 2}, {"medicine_id": syrup["id"], "quantity": 1}]),
+        bill("No Items", []),
+        bill("Old Bill", [{"medicine_id": aspirin["id"], "quantity": 1}]),
+    ]
+
+
+def backdate(bill_id, days):
+    day = TODAY - timedelta(days=days)
+    db = SessionLocal()
+    try:
+        db.execute(update(DbBill).where(DbBill.id == bill_id).values(created_date=datetime.combine(day, time(12), tzinfo=timezone.utc)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def export(client, **params):
+    response = client.get("/v1/bills/export", params=params)
+    return response, response.text
+
+
+def test_export():
+    client = TestClient(app)
+    bills = create_bills(client)
+    backdate(bills[2]["id"], 3)
+
+    response, body = export(client)
+    lines = [json.loads(line) for line in body.splitlines()]
+    check("NDJSON is streamed", response.headers["content-type"] == "application/x-ndjson" and "content-length" not in response.headers)
+    check("every bill is one line, in id order", [b["id"] for b in lines] == [b["id"] for b in bills])
+    check("lines carry the bill items",
+          [(i["medicine"]["name"], i["quantity"], i["price_per_unit"]) for i in lines[0]["bill_items"]] == [("Aspirin", 2, 1.5), ("Cough Syrup, 100ml", 1, 4.0)]
+          and lines[0]["total_amount"] == 7.0)
+    check("items carry their medicine's current stock", [i["medicine"]["stock"] for i in lines[0]["bill_items"]] == [97, 99])
+    check("a bill without items is exported", lines[1]["patient_name"] == "No Items" and lines[1]["bill_items"] == [])
+
+    response, body = export(client, format="csv")
+    rows = list(csv.reader(io.StringIO(body)))
+    check("CSV is streamed as an attachment", response.headers["content-type"].startswith("text/csv")
+          and "attachment" in response.headers["content-disposition"] and "content-length" not in response.headers)
+    check("CSV has a header and one row per item", rows[0] == CSV_COLUMNS and len(rows) == 1 + 2 + 1 + 1)
+    check("names with commas and quotes survive", rows[1][2] == 'Ravi "RK" Kumar, Jr.' and rows[2][7] == "Cough Syrup, 100ml")
+    check("a bill without items has empty item columns", rows[3][0] == str(bills[1]["id"]) and rows[3][2] == "No Items" and rows[3][5:] == [""] * 5)
+
+    since = str(TODAY - timedelta(days=3))
+    check("date_to keeps older bills only", [json.loads(line)["id"] for line in export(client, date_to=since)[1].splitlines()] == [bills[2]["id"]])
+    check("date_from keeps newer bills only", [r[0] for r in list(csv.reader(io.StringIO(export(client, format="csv", date_from=str(TODAY))[1])))[1:]]
+          == [str(bills[0]["id"])] * 2 + [str(bills[1]["id"])])
+    check("an unknown format is rejected", client.get("/v1/bills/export", params={"format": "xml"}).status_code == 422)
+
+
+if __name__ == "__main__":
+    run("BILL EXPORT", test_export)
@@ -0,0 +1,94 @@
+"""
+Bill listing pagination and filter check.
+Runs the app against a throwaway SQLite database. GET /v1/bills must page
+newest first through X-Next-Cursor without skipping or repeating a bill,
+match patient_name as a case-insensitive prefix with `%` and `_` taken
+literally, and keep date_from/date_to to whole UTC days, both inclusive.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+
+from checks import check, run, temp_database
+
+temp_database("pages.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.main import app
+from app.infrastructure.db.models.bill import Bill as DbBill
+from app.infrastructure.db.session import SessionLocal
+
+NAMES = ["Anita Shah", "anita rao", "50% Off", "5000 Test", "a_b", "axb", "Rohan Das"]
+TODAY = datetime.now(timezone.utc).date()
+
+
+def create_bills(client, medicine_name):
+    medicine = client.post("/v1/medicines", json={"name": medicine_name, "price_per_unit": 1.0, "stock": 100}).json()
+    return [
+        client.post("/v1/bills", json={"patient_name": name, "patient_age": 30, "items": [{"medicine_id": medicine["id"], "quantity": 1}]}).json()["id"]
+        for name in NAMES
+    ]
+
+
+def backdate(bill_id, day):
+    db = SessionLocal()
+    try:
+        db.execute(update(DbBill).where(DbBill.id == bill_id).values(created_date=datetime.combine(day, time(12), tzinfo=timezone.utc)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def all_pages(client, **params):
+    ids, pages, cursor = [], 0, None
+    while True:
+        response = client.get("/v1/bills", params=dict(params, **({"cursor": cursor} if cursor else {})))
+        ids += [bill["id"] for bill in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, pages
+
+
+def names(client, **params):
+    return sorted(bill["patient_name"] for bill in client.get("/v1/bills", params=params).json())
+
+
+def listed(client, **params):
+    return [bill["id"] for bill in client.get("/v1/bills", params=params).json()]
+
+
+def test_pages():
+    client = TestClient(app)
+    bill_ids = create_bills(client, "Page Test")
+
+    ids, pages = all_pages(client, limit=3)
+    check("every bill is listed once, newest first", ids == bill_ids[::-1])
+    check("the last page has no cursor", pages == 3)
+    check("an exact last page has no cursor either", all_pages(client, limit=len(NAMES)) == (bill_ids[::-1], 1))
+    check("a cursor continues below it", [b["id"] for b in client.get("/v1/bills", params={"cursor": bill_ids[2]}).json()] == bill_ids[1::-1])
+
+
+def test_filters():
+    client = TestClient(app)
+    # Every name is billed twice: once by test_pages, once here
+    bill_ids = dict(zip(NAMES, create_bills(client, "Filter Test")))
+
+    check("patient_name is a case-insensitive prefix", names(client, patient_name="ANITA") == ["Anita Shah", "Anita Shah", "anita rao", "anita rao"])
+    check("% in patient_name is not a wildcard", names(client, patient_name="50%") == ["50% Off", "50% Off"])
+    check("_ in patient_name is not a wildcard", names(client, patient_name="a_") == ["a_b", "a_b"])
+
+    backdate(bill_ids["Rohan Das"], TODAY - timedelta(days=10))
+    backdate(bill_ids["axb"], TODAY - timedelta(days=5))
+    since = str(TODAY - timedelta(days=5))
+    check("date_from includes its day", bill_ids["axb"] in listed(client, date_from=since) and bill_ids["Rohan Das"] not in listed(client, date_from=since))
+    check("date_to includes its day", listed(client, date_to=since) == [bill_ids["Rohan Das"], bill_ids["axb"]])
+    check("a single day", listed(client, date_from=since, date_to=since) == [bill_ids["axb"]])
+    ids, _ = all_pages(client, limit=2, patient_name="anita", date_from=str(TODAY))
+    check("filters hold across pages", len(ids) == 4 and ids == sorted(ids, reverse=True))
+    check("a day with no bills is empty", client.get("/v1/bills", params={"date_to": str(date(2000, 1, 1))}).json() == [])
+
+
+if __name__ == "__main__":
+    run("BILL PAGINATION AND FILTERS", test_pages, test_filters)
@@ -0,0 +1,75 @@
+"""
+Query-count check for bill listing.
+Seeds growing numbers of bills into a throwaway SQLite database and asserts
+that listing them (what GET /v1/bills runs) issues the same, small number of queries.
+"""
+
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from checks import check, run, temp_dir
+
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.models.bill import Bill as DbBill, BillItem as DbBillItem
+from app.infrastructure.db.models.medicine import Medicine as DbMedicine
+from app.infrastructure.db.query_counter import count_queries
+from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
+from app.application.use_cases.bill.get_all_bills import GetAllBills
+
+MAX_QUERIES = 3  # bills, bill_items, medicines
+BILL_COUNTS = (1, 10, 500)
+
+
+def seed(session, bill_count, items_per_bill=4):
+    medicines = [
+        DbMedicine(name=f"Medicine {i}", price_per_unit=10.0 + i, stock=1000)
+        for i in range(items_per_bill * 2)
+    ]
+    session.add_all(medicines)
+    session.flush()
+    for b in range(bill_count):
+        bill = DbBill(patient_name=f"Patient {b}", patient_age=30, total_amount=0.0)
+        session.add(bill)
+        session.flush()
+        for i in range(items_per_bill):
+            medicine = medicines[(b + i) % len(medicines)]
+            session.add(
+                DbBillItem(
+                    bill_id=bill.id,
+                    medicine_id=medicine.id,
+                    quantity=1,
+                    price_per_unit=medicine.price_per_unit,
+                )
+            )
+    session.commit()
+
+
+def list_bills(bill_count):
+    """Seed a fresh database and list it; returns the bills and the query count."""
+    engine = create_engine(f"sqlite:///{os.path.join(temp_dir(), 'bills.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    session = Session()
+    try:
+        seed(session, bill_count)
+        session.expunge_all()
+
+        with count_queries(engine) as counter:
+            page = GetAllBills(BillRepositoryImpl(session)).execute(limit=bill_count)
+        return page.items, counter.count
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_list_bills_query_count():
+    for bill_count in BILL_COUNTS:
+        bills, queries = list_bills(bill_count)
+        check(f"{bill_count} bills listed with {queries} queries", len(bills) == bill_count and queries <= MAX_QUERIES)
+
+
+if __name__ == "__main__":
+    run("BILL LISTING QUERY COUNT", test_list_bills_query_count)
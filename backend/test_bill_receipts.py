@@ -0,0 +1,57 @@
+"""
+Bill receipt snapshot check.
+Runs the app against a throwaway SQLite database. GET /v1/bills/{id} must
+return the receipt as billed, unchanged after the medicine is renamed and
+repriced, and a bill without a snapshot must get one on first read.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("receipts.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.main import app
+from app.infrastructure.db.models.bill import BillReceipt as DbBillReceipt
+from app.infrastructure.db.session import SessionLocal
+
+
+def create_bill(client, medicine_id):
+    bill = {"patient_name": "Receipt Test", "patient_age": 52, "items": [{"medicine_id": medicine_id, "quantity": 3}]}
+    return client.post("/v1/bills", json=bill).json()
+
+
+def test_receipts():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Paracetamol", "price_per_unit": 2.5, "stock": 20}).json()
+    bill = create_bill(client, medicine["id"])
+
+    receipt = client.get(f"/v1/bills/{bill['id']}").json()
+    item = receipt["items"][0]
+    check("receipt holds the bill as billed", receipt["bill_id"] == bill["id"] and receipt["patient_name"] == "Receipt Test")
+    check(
+        "receipt lines carry name, price and total",
+        item["medicine_name"] == "Paracetamol" and item["price_per_unit"] == 2.5 and item["line_total"] == 7.5
+        and receipt["total_amount"] == 7.5,
+    )
+
+    client.patch(f"/v1/medicines/{medicine['id']}", json={"name": "Paracetamol 500", "price_per_unit": 4.0})
+    check("renaming and repricing the medicine leaves the receipt alone", client.get(f"/v1/bills/{bill['id']}").json() == receipt)
+
+    # A bill created before receipts were snapshotted
+    old_bill = create_bill(client, medicine["id"])
+    db = SessionLocal()
+    try:
+        db.execute(delete(DbBillReceipt).where(DbBillReceipt.bill_id == old_bill["id"]))
+        db.commit()
+        rebuilt = client.get(f"/v1/bills/{old_bill['id']}").json()
+        stored = db.get(DbBillReceipt, old_bill["id"]) is not None
+    finally:
+        db.close()
+    check("a bill without a snapshot is rebuilt and stored", rebuilt["items"][0]["medicine_name"] == "Paracetamol 500" and stored)
+    check("unknown bill is 404", client.get("/v1/bills/999").status_code == 404)
+
+
+if __name__ == "__main__":
+    run("BILL RECEIPTS", test_receipts)
@@ -0,0 +1,74 @@
+"""
+Create-or-revive upsert check.
+Runs the app against a throwaway SQLite database. Creating a medicine or
+patient whose name or phone number belongs to a deleted one must revive
+that row under its old id; an active one must be refused. Of many
+concurrent creates of the same name exactly one may succeed.
+"""
+
+import threading
+
+from checks import check, run, temp_database
+
+temp_database("revive.db")
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.domain.models.medicine import Medicine
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.medicine_repository import MedicineRepositoryImpl
+
+THREADS = 8
+
+
+def test_medicines():
+    client = TestClient(app)
+    first = client.post("/v1/medicines", json={"name": "Revive Test", "price_per_unit": 1.0, "stock": 8}).json()
+    check("an active name is refused", client.post("/v1/medicines", json={"name": "Revive Test", "price_per_unit": 2.0, "stock": 1}).status_code == 400)
+
+    client.delete(f"/v1/medicines/{first['id']}")
+    revived = client.post("/v1/medicines", json={"name": "Revive Test", "price_per_unit": 2.5, "stock": 3}).json()
+    check("a deleted medicine is revived under its id", revived["id"] == first["id"] and revived["version"] > first["version"])
+    stock = client.get(f"/v1/medicines/{first['id']}/stock").json()["stock"]
+    kinds = [m["kind"] for m in client.get(f"/v1/medicines/{first['id']}/stock-movements").json()]
+    check("the revived medicine has the new price and stock", client.get("/v1/medicines").json()[0]["price_per_unit"] == 2.5 and stock == 3)
+    check("its ledger records the write-off and the new stock", kinds == ["ADJUSTMENT", "ADJUSTMENT", "RECEIPT"])
+
+
+def test_patients():
+    client = TestClient(app)
+    patient = {"first_name": "Meera", "last_name": "Nair", "age": 29, "gender": "female", "phone_number": "9888800001"}
+    first = client.post("/v1/patient", json=patient).json()
+    check("an active phone number is refused", client.post("/v1/patient", json=patient).status_code == 400)
+    client.delete(f"/v1/patient/{first['patient_id']}")
+    revived = client.post("/v1/patient", json=dict(patient, first_name="Meera K")).json()
+    check("a deactivated patient is revived under its id", revived["patient_id"] == first["patient_id"] and revived["first_name"] == "Meera K")
+
+
+def test_concurrent_creates():
+    outcomes = []
+    start = threading.Barrier(THREADS)
+
+    def create():
+        db = SessionLocal()
+        try:
+            start.wait()
+            MedicineRepositoryImpl(db).create(Medicine(id=None, name="Race", price_per_unit=1.0, stock=5))
+            outcomes.append("created")
+        except HTTPException as e:
+            outcomes.append(e.status_code)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=create) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check("one of the concurrent creates wins, the rest are refused", sorted(outcomes, key=str) == [400] * (THREADS - 1) + ["created"])
+
+
+if __name__ == "__main__":
+    run("CREATE OR REVIVE", test_medicines, test_patients, test_concurrent_creates)
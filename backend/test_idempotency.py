@@ -0,0 +1,128 @@
+"""
+Idempotency-Key check.
+Runs the app against a throwaway SQLite database. A retried create must
+replay the first response without writing again, a reused key with a
+different body must be refused, and a response cached in memory must not
+be replayed once its stored key has expired. A key abandoned before its
+request committed must free up after its lease; once the request has
+committed, the key must stay held even if its response is never stored.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from checks import check, run, temp_database
+
+temp_database("idempotency.db")
+
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import text, update
+
+from app.main import app
+from app.infrastructure.db.models.idempotency import IdempotencyKey as DbIdempotencyKey
+from app.infrastructure.db.session import SessionLocal, settings
+from app.infrastructure.repositories.idempotency_store import IdempotencyStore
+from app.presentation.api.idempotency import REPLAYED_HEADER, run_idempotent
+
+
+class Payload(BaseModel):
+    n: int
+
+
+def test_replay():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Idempotency Test", "price_per_unit": 2.0, "stock": 10}).json()
+    bill = {"patient_name": "Retry Test", "patient_age": 30, "items": [{"medicine_id": medicine["id"], "quantity": 1}]}
+    headers = {"Idempotency-Key": "bill-1"}
+
+    first = client.post("/v1/bills", json=bill, headers=headers)
+    retry = client.post("/v1/bills", json=bill, headers=headers)
+    check("retry replays the first response", retry.status_code == 200 and retry.json() == first.json())
+    check("replay is marked", retry.headers.get(REPLAYED_HEADER) == "true" and REPLAYED_HEADER not in first.headers)
+    check("the bill is written once", len(client.get("/v1/bills").json()) == 1 and client.get("/v1/medicines").json()[0]["stock"] == 9)
+
+    other = dict(bill, patient_age=31)
+    check("same key with a different body is refused", client.post("/v1/bills", json=other, headers=headers).status_code == 422)
+    check("another key is a new request", client.post("/v1/bills", json=bill, headers={"Idempotency-Key": "bill-2"}).json()["id"] != first.json()["id"])
+
+
+def test_cache_expires_with_the_key():
+    db = SessionLocal()
+    try:
+        store = IdempotencyStore(db, ttl_seconds=1)
+        store.reserve("test", "short-lived", "first")
+        store.complete("test", "short-lived", "first", 200, '{"n": 1}')
+        cached = store.get("test", "short-lived").response_body == '{"n": 1}'
+        time.sleep(1.1)
+        # Another process reuses the expired key for a different request
+        db.execute(
+            update(DbIdempotencyKey)
+            .where(DbIdempotencyKey.scope == "test", DbIdempotencyKey.key == "short-lived")
+            .values(request_hash="second", response_body='{"n": 2}', expires_at=datetime.now(timezone.utc) + timedelta(hours=1))
+        )
+        db.commit()
+        stored = store.get("test", "short-lived")
+    finally:
+        db.close()
+    check("in-memory response expires with its stored key", cached and stored.request_hash == "second")
+
+
+def test_abandoned_reservation():
+    db = SessionLocal()
+    try:
+        store = IdempotencyStore(db, lease_seconds=1)
+        store.reserve("test", "abandoned", "first")
+        in_progress = store.get("test", "abandoned").in_progress
+        time.sleep(1.1)
+        check("an abandoned reservation frees up after its lease", in_progress and store.get("test", "abandoned") is None
+              and store.reserve("test", "abandoned", "first"))
+    finally:
+        db.close()
+
+
+def test_committed_request_keeps_its_key():
+    db = SessionLocal()
+    try:
+        def commit_then_fail():
+            db.execute(text("UPDATE medicines SET updated_date = updated_date"))
+            db.commit()
+            raise RuntimeError("failed after committing")
+
+        try:
+            run_idempotent(db, "test", "committed", Payload(n=1), commit_then_fail)
+        except RuntimeError:
+            pass
+        stored = IdempotencyStore(db).get("test", "committed")
+        lease_ends = datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+        check("a request that committed keeps its key for the full TTL",
+              stored is not None and stored.in_progress and stored.expires_at.replace(tzinfo=timezone.utc) > lease_ends)
+        check("it is not run again", not IdempotencyStore(db).reserve("test", "committed", "retry"))
+    finally:
+        db.close()
+
+
+def test_response_not_stored():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Lost Response Test", "price_per_unit": 1.0, "stock": 10}).json()
+    bill = {"patient_name": "Retry Test", "patient_age": 30, "items": [{"medicine_id": medicine["id"], "quantity": 1}]}
+    headers = {"Idempotency-Key": "lost-response"}
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    complete = IdempotencyStore.complete
+    IdempotencyStore.complete = fail
+    try:
+        first = client.post("/v1/bills", json=bill, headers=headers)
+    finally:
+        IdempotencyStore.complete = complete
+    check("the client still gets the committed bill", first.status_code == 200 and first.json()["id"])
+    retry = client.post("/v1/bills", json=bill, headers=headers)
+    check("a retry is refused, not run again", retry.status_code == 409
+          and client.get(f"/v1/medicines/{medicine['id']}/stock").json()["stock"] == 9)
+
+
+if __name__ == "__main__":
+    run("IDEMPOTENCY KEYS", test_replay, test_cache_expires_with_the_key, test_abandoned_reservation,
+        test_committed_request_keeps_its_key, test_response_not_stored)
@@ -0,0 +1,102 @@
+"""
+Lot snapshot check.
+Runs the app against a throwaway SQLite database, sells from a medicine's
+lots and from its stock outside lots, and compacts the ledger in between.
+Compaction must leave stock and every lot's remaining units unchanged, and
+no movement may take the stock outside lots below zero. Setting a lower
+stock must write the difference off lot by lot, earliest expiry first.
+"""
+
+from datetime import date, timedelta
+
+from checks import check, run, temp_database
+
+temp_database("lots.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.main import app
+from app.infrastructure.db.models.stock import LotSnapshot as DbLotSnapshot
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.stock_repository import StockRepositoryImpl
+from app.application.use_cases.stock.stock_ledger import CompactStockSnapshots
+
+
+def compact():
+    db = SessionLocal()
+    try:
+        CompactStockSnapshots(StockRepositoryImpl(db)).execute()
+        return db.execute(select(func.count()).select_from(DbLotSnapshot)).scalar()
+    finally:
+        db.close()
+
+
+def state(client, medicine_id):
+    stock = client.get(f"/v1/medicines/{medicine_id}/stock").json()["stock"]
+    lots = {lot["batch_number"]: lot["remaining"] for lot in client.get(f"/v1/medicines/{medicine_id}/lots").json()}
+    return stock, lots
+
+
+def sell(client, medicine_id, quantity):
+    bill = {"patient_name": "Lot Test", "patient_age": 30, "items": [{"medicine_id": medicine_id, "quantity": quantity}]}
+    return client.post("/v1/bills", json=bill).status_code
+
+
+def adjust(client, medicine_id, quantity):
+    movement = {"kind": "ADJUSTMENT", "quantity": quantity, "note": "Count"}
+    return client.post(f"/v1/medicines/{medicine_id}/stock-movements", json=movement).status_code
+
+
+def set_stock(client, medicine_id, stock):
+    return client.patch(f"/v1/medicines/{medicine_id}", json={"stock": stock}).status_code
+
+
+def receive(client, medicine_id, batch, days, quantity):
+    client.post(f"/v1/medicines/{medicine_id}/lots",
+                json={"batch_number": batch, "expiry_date": str(date.today() + timedelta(days=days)), "quantity": quantity})
+
+
+def test_lot_snapshots():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Lot Test", "price_per_unit": 1.0, "stock": 5}).json()
+    for batch, days in (("A", 30), ("B", 60)):
+        receive(client, medicine["id"], batch, days, 10)
+
+    sell(client, medicine["id"], 12)
+    before = state(client, medicine["id"])
+    check("sale drains the earliest lot first", before == (13, {"B": 8}))
+    snapshots = compact()
+    check("compaction writes lot snapshots", snapshots == 2)
+    check("compaction leaves stock and lots unchanged", state(client, medicine["id"]) == before)
+    # 13 in stock, but only 5 outside lots
+    check("stock outside lots cannot go negative", adjust(client, medicine["id"], -6) == 400)
+
+    sell(client, medicine["id"], 10)
+    check("sales after compaction count from the snapshots", state(client, medicine["id"]) == (3, {}))
+    compact()
+    check("compacting again leaves them unchanged", state(client, medicine["id"]) == (3, {}))
+
+    check("stock outside lots can be emptied", adjust(client, medicine["id"], -3) == 200)
+    check("nothing is left to oversell", sell(client, medicine["id"], 1) == 400 and state(client, medicine["id"]) == (0, {}))
+
+
+
+def test_lower_stock_in_lots():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Patch Test", "price_per_unit": 1.0, "stock": 0}).json()
+    receive(client, medicine["id"], "B1", 60, 10)
+    check("a lower stock held in one lot is accepted", set_stock(client, medicine["id"], 5) == 200)
+    check("it is written off that lot", state(client, medicine["id"]) == (5, {"B1": 5}))
+
+    receive(client, medicine["id"], "B0", 30, 4)
+    set_stock(client, medicine["id"], 12)
+    check("a higher stock is added outside lots", state(client, medicine["id"]) == (12, {"B0": 4, "B1": 5}))
+    check("a lower stock is taken from the earliest expiry first", set_stock(client, medicine["id"], 6) == 200
+          and state(client, medicine["id"]) == (6, {"B1": 3}))
+    check("then from stock outside lots", set_stock(client, medicine["id"], 2) == 200 and state(client, medicine["id"]) == (2, {}))
+    check("stock cannot be set below zero", set_stock(client, medicine["id"], -1) in (400, 422) and state(client, medicine["id"]) == (2, {}))
+
+
+if __name__ == "__main__":
+    run("LOT SNAPSHOTS", test_lot_snapshots, test_lower_stock_in_lots)
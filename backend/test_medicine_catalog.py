@@ -0,0 +1,51 @@
+"""
+Medicine catalog cache check.
+Runs the app against a throwaway SQLite database. GET /v1/medicines must
+answer a matching If-None-Match with 304, and every write that changes the
+catalog (add, update, delete, a sale) must change its ETag at once.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("catalog.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def catalog(client, etag=None):
+    return client.get("/v1/medicines", headers={"If-None-Match": etag} if etag else {})
+
+
+def test_catalog_cache():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Cetirizine", "price_per_unit": 1.2, "stock": 30}).json()
+
+    first = catalog(client)
+    etag = first.headers.get("ETag")
+    check("catalog is sent with an ETag", first.status_code == 200 and etag is not None)
+    check("catalog is revalidated on every use", first.headers.get("Cache-Control") == "no-cache")
+    unchanged = catalog(client, etag)
+    check("matching If-None-Match is 304", unchanged.status_code == 304 and unchanged.content == b"" and unchanged.headers.get("ETag") == etag)
+    check("weak and listed ETags match too", catalog(client, f'"other", W/{etag}').status_code == 304)
+    check("a stale ETag gets the catalog", catalog(client, '"stale"').status_code == 200)
+
+    writes = [
+        ("adding a medicine", lambda: client.post("/v1/medicines", json={"name": "Loratadine", "price_per_unit": 2.0, "stock": 10})),
+        ("updating a medicine", lambda: client.patch(f"/v1/medicines/{medicine['id']}", json={"price_per_unit": 1.5})),
+        ("selling a medicine", lambda: client.post("/v1/bills", json={
+            "patient_name": "Catalog Test", "patient_age": 28, "items": [{"medicine_id": medicine["id"], "quantity": 2}]})),
+        ("deleting a medicine", lambda: client.delete(f"/v1/medicines/{medicine['id']}")),
+    ]
+    for name, write in writes:
+        write()
+        response = catalog(client, etag)
+        check(f"{name} changes the ETag", response.status_code == 200 and response.headers["ETag"] != etag)
+        etag = response.headers["ETag"]
+
+    check("the catalog reflects the writes", [m["name"] for m in catalog(client).json()] == ["Loratadine"])
+
+
+if __name__ == "__main__":
+    run("MEDICINE CATALOG CACHE", test_catalog_cache)
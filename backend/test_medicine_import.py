@@ -0,0 +1,62 @@
+"""
+Medicine CSV import check.
+Runs the app against a throwaway SQLite database and imports a catalog
+spanning several batches. Valid rows must be created with their stock,
+soft-deleted medicines revived, and invalid, duplicate and existing rows
+skipped and reported by row number.
+"""
+
+import time
+
+from checks import check, run, temp_database
+
+temp_database("import.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.application.use_cases.medicine.import_medicines import BATCH_SIZE
+
+ROWS = BATCH_SIZE * 2 + 500
+
+
+def upload(client, lines):
+    return client.post("/v1/medicines/import", content="\n".join(lines) + "\n", headers={"Content-Type": "text/csv"})
+
+
+def test_import():
+    client = TestClient(app)
+    client.post("/v1/medicines", json={"name": "Active", "price_per_unit": 1.0, "stock": 3})
+    deleted = client.post("/v1/medicines", json={"name": "Deleted", "price_per_unit": 1.0, "stock": 3}).json()
+    client.delete(f"/v1/medicines/{deleted['id']}")
+
+    lines = ["name,price_per_unit,stock"] + [f"Imported {n},{n % 50 + 0.5},{n % 7}" for n in range(ROWS)]
+    lines += [
+        "Active,2.0,10",         # row ROWS + 1: exists
+        "Deleted,9.5,12",        # row ROWS + 2: revived
+        "Imported 0,1.0,1",      # row ROWS + 3: duplicate in the file
+        "Bad price,abc,1",       # row ROWS + 4
+        "Negative,1.0,-4",       # row ROWS + 5
+        ",1.0,1",                # row ROWS + 6: no name
+    ]
+    started = time.perf_counter()
+    response = upload(client, lines)
+    print(f"   {ROWS + 6} rows imported in {time.perf_counter() - started:.2f}s")
+    result = response.json()
+    errors = {e["row"]: e["error"] for e in result["errors"]}
+    check("every valid row is created", response.status_code == 200 and result["created"] == ROWS)
+    check("the soft-deleted medicine is revived", result["revived"] == 1)
+    check("bad rows are skipped", result["skipped"] == 5 and sorted(errors) == [ROWS + n for n in (1, 3, 4, 5, 6)])
+    check("existing names are reported", errors[ROWS + 1] == "Medicine with this name already exists")
+    check("duplicates in the file are reported", errors[ROWS + 3] == "Duplicate name in import")
+
+    catalog = {m["name"]: m for m in client.get("/v1/medicines").json()}
+    check("imported stock is recorded", len(catalog) == ROWS + 2 and catalog[f"Imported {ROWS - 1}"]["stock"] == (ROWS - 1) % 7)
+    check("the revived medicine takes the new price and stock", catalog["Deleted"]["price_per_unit"] == 9.5 and catalog["Deleted"]["stock"] == 12)
+    check("the existing medicine is left alone", catalog["Active"]["stock"] == 3)
+
+    check("a CSV without the required columns is rejected", upload(client, ["name,price", "X,1"]).status_code == 400)
+
+
+if __name__ == "__main__":
+    run("MEDICINE CSV IMPORT", test_import)
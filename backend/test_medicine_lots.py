@@ -0,0 +1,77 @@
+"""
+Medicine lot check.
+Runs the app against a throwaway SQLite database. Sales must take units
+from the unexpired lot that expires first, never from an expired lot, and
+the expiring-lots report must list what is left soonest first. Stock at a
+past moment must be rebuilt from the ledger.
+"""
+
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from checks import check, run, temp_database
+
+temp_database("lots.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def moment():
+    # Movements are timestamped; keep the ones before and after apart
+    time.sleep(0.01)
+    at = datetime.now(timezone.utc)
+    time.sleep(0.01)
+    return at
+
+
+def receive(client, medicine_id, batch_number, days, quantity):
+    expiry = str(date.today() + timedelta(days=days))
+    return client.post(f"/v1/medicines/{medicine_id}/lots", json={"batch_number": batch_number, "expiry_date": expiry, "quantity": quantity})
+
+
+def sell(client, medicine_id, quantity):
+    bill = {"patient_name": "Lot Test", "patient_age": 61, "items": [{"medicine_id": medicine_id, "quantity": quantity}]}
+    return client.post("/v1/bills", json=bill).status_code
+
+
+def lots(client, medicine_id):
+    return [(lot["batch_number"], lot["remaining"]) for lot in client.get(f"/v1/medicines/{medicine_id}/lots").json()]
+
+
+def stock_at(client, medicine_id, at):
+    return client.get(f"/v1/medicines/{medicine_id}/stock", params={"at": at.isoformat()}).json()["stock"]
+
+
+def test_lots():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Amoxicillin", "price_per_unit": 3.0, "stock": 0}).json()
+    medicine_id = medicine["id"]
+    before_delivery = moment()
+    receive(client, medicine_id, "EXPIRED", -1, 5)
+    receive(client, medicine_id, "LATE", 90, 10)
+    receive(client, medicine_id, "EARLY", 10, 4)
+    after_delivery = moment()
+
+    check("lots with units left are listed by expiry date", lots(client, medicine_id) == [("EXPIRED", 5), ("EARLY", 4), ("LATE", 10)])
+    check("a batch cannot change its expiry date", receive(client, medicine_id, "LATE", 120, 1).status_code == 400)
+
+    check("a sale is billed", sell(client, medicine_id, 6) == 200)
+    check("the unexpired lot that expires first is drained first", lots(client, medicine_id) == [("EXPIRED", 5), ("LATE", 8)])
+    after_sale = moment()
+    check("expired units are never sold", sell(client, medicine_id, 9) == 400 and lots(client, medicine_id)[0] == ("EXPIRED", 5))
+
+    expiring = [lot["batch_number"] for lot in client.get("/v1/lots/expiring", params={"days": 30}).json()]
+    check("expiring lots include expired ones, and skip empty ones", expiring == ["EXPIRED"])
+    expiring = [lot["batch_number"] for lot in client.get("/v1/lots/expiring", params={"days": 120}).json()]
+    check("expiring lots come soonest first", expiring == ["EXPIRED", "LATE"])
+
+    check("stock before the delivery was 0", stock_at(client, medicine_id, before_delivery) == 0)
+    check("stock after the delivery was 19", stock_at(client, medicine_id, after_delivery) == 19)
+    check("stock after the sale was 13", stock_at(client, medicine_id, after_sale) == 13)
+    check("current stock counts expired units", client.get(f"/v1/medicines/{medicine_id}/stock").json()["stock"] == 13)
+
+
+if __name__ == "__main__":
+    run("MEDICINE LOTS", test_lots)
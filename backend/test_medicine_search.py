@@ -0,0 +1,68 @@
+"""
+Medicine search check.
+Runs the app against a throwaway SQLite database. /v1/medicines/search must
+find medicines from a prefix or a misspelled name, and follow adds, renames
+and deletes at once. A 50k-name index must answer in under a millisecond.
+"""
+
+import random
+import string
+import time
+
+from checks import check, run, temp_database
+
+temp_database("search.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.search_index import NgramIndex
+
+CATALOG_SIZE = 50_000
+QUERIES = ["amoxcilin", "amox", "paracetmol", "ibuprofn 400", "cet"]
+
+
+def search(client, q):
+    return [m["name"] for m in client.get("/v1/medicines/search", params={"q": q}).json()]
+
+
+def test_search_route():
+    client = TestClient(app)
+    for name in ("Amoxicillin 500mg", "Paracetamol 650", "Cetirizine", "Ibuprofen 400"):
+        client.post("/v1/medicines", json={"name": name, "price_per_unit": 1.0, "stock": 10})
+
+    check("prefix finds the medicine", search(client, "parac")[:1] == ["Paracetamol 650"])
+    check("misspelling finds the medicine", search(client, "amoxcilin")[:1] == ["Amoxicillin 500mg"])
+    check("unrelated text finds nothing", search(client, "zzzz") == [])
+
+    added = client.post("/v1/medicines", json={"name": "Azithromycin", "price_per_unit": 3.0, "stock": 5}).json()
+    check("an added medicine is found at once", search(client, "azithro")[:1] == ["Azithromycin"])
+    client.patch(f"/v1/medicines/{added['id']}", json={"name": "Levocetirizine"})
+    check("a renamed medicine is found by its new name only", search(client, "levocet")[:1] == ["Levocetirizine"]
+          and search(client, "azithromycin") == [])
+    client.delete(f"/v1/medicines/{added['id']}")
+    check("a deleted medicine is not found", "Levocetirizine" not in search(client, "levocetirizine"))
+    check("an empty query is rejected", client.get("/v1/medicines/search", params={"q": ""}).status_code == 422)
+
+
+def test_search_speed():
+    rng = random.Random(7)
+    index = NgramIndex()
+    index.add_many(
+        (n, "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 14))) + f" {rng.choice([100, 250, 500])}mg")
+        for n in range(CATALOG_SIZE)
+    )
+    index.add(CATALOG_SIZE, "Amoxicillin 500mg")
+    rounds = 50
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for q in QUERIES:
+            index.search(q, 10)
+    per_query_ms = (time.perf_counter() - started) / (rounds * len(QUERIES)) * 1000
+    print(f"   {per_query_ms:.3f} ms per search over {CATALOG_SIZE} names")
+    check("misspelling is found among 50k names", index.search("amoxcilin", 10)[:1][0][0] == CATALOG_SIZE)
+    check("search takes under a millisecond", per_query_ms < 1.0)
+
+
+if __name__ == "__main__":
+    run("MEDICINE SEARCH", test_search_route, test_search_speed)
@@ -0,0 +1,127 @@
+"""
+Migration runner check.
+Migrates a throwaway SQLite database laid out like a pre-migrations install
+(no email, created_date or stock ledger, stock in medicines.stock) and a
+fresh one. Both must end up with the schema the models describe, with the
+legacy data carried over. Destructive SQL must be refused.
+"""
+
+import os
+
+from sqlalchemy import create_engine, inspect, text
+
+from checks import check, run, temp_dir
+
+import app.infrastructure.db.models.bill  # noqa: F401  registers every model
+import app.infrastructure.db.models.idempotency  # noqa: F401
+import app.infrastructure.db.models.medicine  # noqa: F401
+import app.infrastructure.db.models.report  # noqa: F401
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.migrations import DestructiveMigrationError, get_runner
+from app.infrastructure.db.migrations.runner import ExecuteSQL
+from app.infrastructure.db.migrations.versions import MIGRATIONS
+
+LEGACY_PATIENTS = 2500  # more than one backfill chunk
+
+LEGACY_SCHEMA = [
+    """CREATE TABLE medicines (
+        id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, price_per_unit FLOAT, stock INTEGER,
+        created_date DATETIME, updated_date DATETIME, is_deleted BOOLEAN, deleted_at DATETIME)""",
+    """CREATE TABLE patients (
+        patient_id CHAR(32) PRIMARY KEY, first_name VARCHAR, last_name VARCHAR, date_of_birth DATETIME,
+        age INTEGER, gender VARCHAR, phone_number VARCHAR UNIQUE, address VARCHAR, created_date DATETIME,
+        updated_date DATETIME, is_active BOOLEAN, patient_type VARCHAR, guardian_name VARCHAR, guardian_phone VARCHAR)""",
+    "CREATE TABLE bills (id INTEGER PRIMARY KEY, patient_name VARCHAR, patient_age INTEGER, total_amount FLOAT)",
+    """CREATE TABLE bill_items (
+        id INTEGER PRIMARY KEY, bill_id INTEGER REFERENCES bills (id), medicine_id INTEGER REFERENCES medicines (id),
+        quantity INTEGER, price_per_unit FLOAT)""",
+    "CREATE INDEX ix_medicines_id ON medicines (id)",
+    "CREATE UNIQUE INDEX ix_medicines_name ON medicines (name)",
+    "CREATE INDEX ix_patients_patient_id ON patients (patient_id)",
+    "CREATE INDEX ix_patients_first_name ON patients (first_name)",
+    "CREATE INDEX ix_patients_last_name ON patients (last_name)",
+    "CREATE INDEX ix_bills_id ON bills (id)",
+    "CREATE INDEX ix_bill_items_id ON bill_items (id)",
+]
+
+
+def new_engine():
+    return create_engine(f"sqlite:///{os.path.join(temp_dir(), 'migrations.db')}")
+
+
+def schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: ({c["name"] for c in inspector.get_columns(table)}, {i["name"] for i in inspector.get_indexes(table)})
+        for table in inspector.get_table_names()
+        if table != "schema_migrations"
+    }
+
+
+def model_schema():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    tables = schema(engine)
+    # Kept on migrated databases for the rows it held before the stock ledger
+    tables["medicines"][0].add("stock")
+    # Rollup tables replaced by their slotted versions; no longer written
+    tables["daily_revenue"] = ({"day", "revenue", "units_sold", "bill_count"}, set())
+    tables["daily_medicine_sales"] = ({"day", "medicine_id", "revenue", "units_sold", "bill_count"}, set())
+    return tables
+
+
+def seed_legacy(engine):
+    with engine.begin() as conn:
+        for ddl in LEGACY_SCHEMA:
+            conn.execute(text(ddl))
+        conn.execute(text("INSERT INTO medicines (id, name, price_per_unit, stock, is_deleted) VALUES (1, 'Legacy', 2.5, 40, 0)"))
+        conn.execute(
+            text("INSERT INTO patients (patient_id, first_name, last_name, age, gender, phone_number) VALUES (:id, 'Old', 'Patient', 50, 'other', :phone)"),
+            [{"id": f"{n:032x}", "phone": f"+91-98{n:08d}"} for n in range(LEGACY_PATIENTS)],
+        )
+
+
+def test_legacy_database():
+    engine = new_engine()
+    seed_legacy(engine)
+    runner = get_runner(engine)
+    applied = runner.migrate()
+    check("every migration applies to a legacy database", len(applied) == len(MIGRATIONS))
+    check("legacy database ends with the models' schema", schema(engine) == model_schema())
+    with engine.connect() as conn:
+        opening = conn.execute(text("SELECT SUM(quantity) FROM stock_movements WHERE medicine_id = 1")).scalar()
+        missing = conn.execute(text("SELECT COUNT(*) FROM patients WHERE phone_normalized IS NULL")).scalar()
+        sample = conn.execute(text("SELECT phone_normalized FROM patients WHERE patient_id = :id"), {"id": f"{7:032x}"}).scalar()
+    check("legacy stock is carried into the ledger", opening == 40)
+    check("phone numbers are backfilled in every chunk", missing == 0 and sample == "9800000007")
+    check("migrating again applies nothing", runner.migrate() == [])
+
+
+def test_fresh_database():
+    engine = new_engine()
+    get_runner(engine).migrate()
+    check("fresh database ends with the models' schema", schema(engine) == model_schema())
+
+
+def test_destructive_sql():
+    for sql in ["DROP TABLE bills", "CREATE INDEX a ON b (c); DROP TABLE b", "DELETE FROM bills", "TRUNCATE bills",
+                "ALTER TABLE bills DROP COLUMN patient_age", "ALTER TABLE bills RENAME TO invoices",
+                "ALTER TABLE bills ALTER COLUMN patient_age TYPE TEXT", "ALTER TABLE bills ALTER COLUMN patient_age SET NOT NULL"]:
+        try:
+            ExecuteSQL(sql)
+            refused = False
+        except DestructiveMigrationError:
+            refused = True
+        check(f"refuses: {sql}", refused)
+    for sql in ["ALTER TABLE bills ADD CONSTRAINT fk_bills_patient FOREIGN KEY (patient_id) REFERENCES patients (patient_id) ON DELETE CASCADE",
+                "ALTER TABLE bills ADD COLUMN drop_reason VARCHAR"]:
+        try:
+            ExecuteSQL(sql)
+            allowed = True
+        except DestructiveMigrationError:
+            allowed = False
+        check(f"allows: {sql}", allowed)
+
+
+if __name__ == "__main__":
+    run("SCHEMA MIGRATIONS", test_legacy_database, test_fresh_database, test_destructive_sql)
@@ -0,0 +1,55 @@
+"""
+Optimistic concurrency check.
+Runs the app against a throwaway SQLite database. Medicine and patient
+updates sent with the ETag they read (If-Match) must succeed and return the
+next version; a stale or malformed If-Match must get 412 and change nothing.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("versions.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_medicine_versions():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "Versioned", "price_per_unit": 1.0, "stock": 10}).json()
+    url = f"/v1/medicines/{medicine['id']}"
+    check("a new medicine is version 1", medicine["version"] == 1)
+
+    first = client.patch(url, json={"price_per_unit": 2.0}, headers={"If-Match": '"1"'})
+    check("update with the current ETag succeeds", first.status_code == 200 and first.headers["ETag"] == '"2"')
+    stale = client.patch(url, json={"price_per_unit": 3.0}, headers={"If-Match": '"1"'})
+    check("update with a stale ETag is 412", stale.status_code == 412)
+    check("malformed If-Match is 412", client.patch(url, json={"price_per_unit": 3.0}, headers={"If-Match": "abc"}).status_code == 412)
+    current = client.get("/v1/medicines").json()[0]
+    check("a refused update changes nothing", current["price_per_unit"] == 2.0 and current["version"] == 2)
+
+    stock_only = client.patch(url, json={"stock": 4}, headers={"If-Match": '"2"'})
+    check("a stock-only update moves the version on", stock_only.headers["ETag"] == '"3"' and stock_only.json()["stock"] == 4)
+    check("If-Match: * always matches", client.patch(url, json={"price_per_unit": 5.0}, headers={"If-Match": "*"}).status_code == 200)
+    check("no If-Match is an unconditional update", client.patch(url, json={"price_per_unit": 6.0}).json()["version"] == 5)
+
+
+def test_patient_versions():
+    client = TestClient(app)
+    patient = client.post("/v1/patient", json={
+        "first_name": "Asha", "last_name": "Iyer", "age": 33, "gender": "female", "phone_number": "9811122233",
+    }).json()
+    url = f"/v1/patient/{patient['patient_id']}"
+    etag = client.get(url).headers.get("ETag")
+    check("patient is read with an ETag", etag == '"1"')
+
+    updated = client.put(url, json={"address": "12 MG Road"}, headers={"If-Match": etag})
+    check("update with the read ETag succeeds", updated.status_code == 200 and updated.headers["ETag"] == '"2"')
+    stale = client.put(url, json={"address": "Somewhere else"}, headers={"If-Match": etag})
+    check("a second update with the same ETag is 412", stale.status_code == 412)
+    check("the first update is kept", client.get(url).json()["address"] == "12 MG Road")
+    check("a malformed patient id is rejected", client.put("/v1/patient/not-a-uuid", json={"age": 34}).status_code == 422)
+
+
+if __name__ == "__main__":
+    run("OPTIMISTIC CONCURRENCY", test_medicine_versions, test_patient_versions)
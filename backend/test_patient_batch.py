@@ -0,0 +1,64 @@
+"""
+Batch patient registration check.
+Runs the app against a throwaway SQLite database and registers batches
+mixing new, deactivated, already registered and invalid patients. Every
+row must be reported in request order, deactivated patients revived under
+their old id, and only new and revived patients written.
+"""
+
+import time
+
+from checks import check, run, temp_database
+
+temp_database("patients.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+MAX_BATCH = 1000
+
+
+def patient(first_name, phone_number, **fields):
+    return dict({"first_name": first_name, "last_name": "Batch", "age": 50, "gender": "female", "phone_number": phone_number}, **fields)
+
+
+def register_batch(client, patients):
+    return client.post("/v1/patients/batch", json={"patients": patients})
+
+
+def test_batch():
+    client = TestClient(app)
+    active = client.post("/v1/patient", json=patient("Active", "9000000001")).json()
+    gone = client.post("/v1/patient", json=patient("Gone", "9000000002")).json()
+    client.delete(f"/v1/patient/{gone['patient_id']}")
+
+    response = register_batch(client, [
+        patient("New", "9000000003"),
+        patient("Active again", "9000000001"),
+        patient("Back", "9000000002", address="New address"),
+        patient("New twice", "9000000003"),
+        patient("Bad type", "9000000004", patient_type="ELDERLY"),
+        patient("Bad date", "9000000005", date_of_birth="31/12/1970"),
+    ])
+    outcome = response.json()
+    check("every row is reported in order", response.status_code == 200 and [r["index"] for r in outcome] == list(range(6)))
+    check("rows are created, revived, duplicate or invalid", [r["status"] for r in outcome] == ["created", "duplicate", "revived", "duplicate", "invalid", "invalid"])
+    check("duplicates say why", outcome[1]["error"] == "Patient with this phone number already exists"
+          and outcome[3]["error"] == "Duplicate phone number in batch")
+    revived = outcome[2]["patient"]
+    check("a revived patient keeps its id and takes the new details",
+          revived["patient_id"] == gone["patient_id"] and revived["first_name"] == "Back" and revived["address"] == "New address")
+    check("the registered patient is left alone", client.get(f"/v1/patient/{active['patient_id']}").json()["first_name"] == "Active")
+    check("only new and revived patients are active", len(client.get("/v1/patients", params={"limit": 50}).json()) == 3)
+
+    big = [patient(f"Bulk{n}", f"96{n:08d}") for n in range(MAX_BATCH)]
+    started = time.perf_counter()
+    response = register_batch(client, big)
+    print(f"   {MAX_BATCH} patients registered in {time.perf_counter() - started:.2f}s")
+    check("a full batch is created", all(r["status"] == "created" for r in response.json()))
+    check("a batch over the limit is rejected", register_batch(client, big + [patient("One more", "9500000000")]).status_code == 422)
+
+
+if __name__ == "__main__":
+    run("BATCH PATIENT REGISTRATION", test_batch)
@@ -0,0 +1,80 @@
+"""
+Patient billing history check.
+Runs the app against a throwaway SQLite database. Bills created for a
+patient must be listed newest first, page by page, with lifetime totals,
+and bills billed by name before bills carried a patient must be linked to
+the right patient by the backfill job.
+"""
+
+import uuid
+
+from checks import check, run, temp_database
+
+temp_database("history.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
+from app.infrastructure.repositories.patient_repository import PatientRepositoryImpl
+from app.application.use_cases.bill.link_bills_to_patients import LinkBillsToPatients
+
+BILLS = 5
+
+
+def register(client, first_name, last_name, age, phone_number):
+    return client.post("/v1/patient", json={
+        "first_name": first_name, "last_name": last_name, "age": age, "gender": "female", "phone_number": phone_number,
+    }).json()
+
+
+def history(client, patient_id, **params):
+    response = client.get(f"/v1/patient/{patient_id}/bills", params=params)
+    return response, response.json()
+
+
+def test_history():
+    client = TestClient(app)
+    medicine = client.post("/v1/medicines", json={"name": "History Test", "price_per_unit": 2.0, "stock": 100}).json()
+    neha = register(client, "Neha", "Gupta", 35, "9700000001")
+    bill_ids = []
+    for n in range(1, BILLS + 1):
+        bill = client.post("/v1/bills", json={"patient_id": neha["patient_id"], "items": [{"medicine_id": medicine["id"], "quantity": n}]}).json()
+        bill_ids.append(bill["id"])
+    check("a bill for a patient takes their name and age", bill["patient_name"] == "Neha Gupta" and bill["patient_age"] == 35)
+
+    seen, cursor = [], None
+    while True:
+        response, page = history(client, neha["patient_id"], limit=2, **({"cursor": cursor} if cursor else {}))
+        seen += [b["id"] for b in page["bills"]]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    check("bills are listed newest first across pages", seen == bill_ids[::-1])
+    check("totals cover every bill, not just the page",
+          page["bill_count"] == BILLS and page["total_amount"] == 2.0 * sum(range(1, BILLS + 1))
+          and page["first_bill_date"] <= page["last_bill_date"])
+
+    check("an unknown patient is 404", client.get(f"/v1/patient/{uuid.uuid4()}/bills").status_code == 404)
+    check("an unknown patient cannot be billed", client.post("/v1/bills", json={
+        "patient_id": str(uuid.uuid4()), "items": [{"medicine_id": medicine["id"], "quantity": 1}]}).status_code == 400)
+
+    # Bills from before bills carried a patient
+    young = register(client, "Arun", "Rao", 40, "9700000002")
+    old = register(client, "Arun", "Rao", 60, "9700000003")
+    for name, age in (("Neha Gupta", 35), ("Arun Rao", 60), ("Nobody Known", 20)):
+        client.post("/v1/bills", json={"patient_name": name, "patient_age": age, "items": [{"medicine_id": medicine["id"], "quantity": 1}]})
+    db = SessionLocal()
+    try:
+        linked = LinkBillsToPatients(BillRepositoryImpl(db), PatientRepositoryImpl(db)).execute()
+    finally:
+        db.close()
+    check("named bills are linked, an unknown name is not", linked.scanned == 3 and linked.linked == 2)
+    check("the billed age tells namesakes apart",
+          history(client, old["patient_id"])[1]["bill_count"] == 1 and history(client, young["patient_id"])[1]["bill_count"] == 0)
+    check("a linked bill joins the history", history(client, neha["patient_id"])[1]["bill_count"] == BILLS + 1)
+
+
+if __name__ == "__main__":
+    run("PATIENT BILLING HISTORY", test_history)
@@ -0,0 +1,86 @@
+"""
+Duplicate patient check.
+Runs the app against a throwaway SQLite database with patients registered
+twice under slightly different details. The duplicate scan must propose
+those pairs and nothing else; merging must keep the first patient, fill in
+its missing details and move the other's bills over, and a dismissed pair
+must not be proposed again.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("duplicates.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.patient_duplicate_repository import PatientDuplicateRepositoryImpl
+from app.application.use_cases.patient.patient_duplicates import FindDuplicatePatients
+from app.core.dedup import MAX_BLOCK_SIZE, MatchRecord, find_matches
+
+
+def register(client, first_name, last_name, phone_number, date_of_birth, **fields):
+    return client.post("/v1/patient", json=dict({
+        "first_name": first_name, "last_name": last_name, "age": 44, "gender": "male",
+        "phone_number": phone_number, "date_of_birth": date_of_birth,
+    }, **fields)).json()
+
+
+def scan():
+    db = SessionLocal()
+    try:
+        return FindDuplicatePatients(PatientDuplicateRepositoryImpl(db)).execute(workers=1)
+    finally:
+        db.close()
+
+
+def open_pairs(client):
+    return {
+        frozenset((pair["patient_a"]["first_name"] + " " + pair["patient_a"]["last_name"],
+                   pair["patient_b"]["first_name"] + " " + pair["patient_b"]["last_name"])): pair["id"]
+        for pair in client.get("/v1/patients/duplicates").json()
+    }
+
+
+def test_duplicates():
+    client = TestClient(app)
+    kept = register(client, "Rahul", "Verma", "9811100001", "1980-05-01")
+    other = register(client, "Rahul", "Varma", "+91-98111 00001", "1980-05-01", address="4 Park Street")
+    register(client, "Anil", "Mehta", "9822200002", "1975-01-01")
+    register(client, "Anil", "Mehtaa", "9833300003", "1975-01-01")
+    register(client, "Sunita", "Das", "9844400004", "1990-09-09")
+    medicine = client.post("/v1/medicines", json={"name": "Dedup Test", "price_per_unit": 5.0, "stock": 10}).json()
+    client.post("/v1/bills", json={"patient_id": other["patient_id"], "items": [{"medicine_id": medicine["id"], "quantity": 2}]})
+
+    result = scan()
+    pairs = open_pairs(client)
+    rahul = frozenset(("Rahul Verma", "Rahul Varma"))
+    anil = frozenset(("Anil Mehta", "Anil Mehtaa"))
+    check("both duplicate pairs are proposed, nothing else", set(pairs) == {rahul, anil} and result.added == 2)
+
+    merged = client.post(f"/v1/patients/duplicates/{pairs[rahul]}/merge").json()
+    check("the first registered patient is kept", merged["patient_id"] == kept["patient_id"])
+    check("its missing details are filled in", merged["address"] == "4 Park Street" and merged["last_name"] == "Verma")
+    check("the other patient is deactivated", client.get(f"/v1/patient/{other['patient_id']}").status_code == 404)
+    history = client.get(f"/v1/patient/{kept['patient_id']}/bills").json()
+    check("the bills move to the kept patient", history["bill_count"] == 1 and history["total_amount"] == 10.0)
+    check("a resolved pair cannot be merged again", client.post(f"/v1/patients/duplicates/{pairs[rahul]}/merge").status_code == 404)
+
+    check("a pair can be dismissed", client.post(f"/v1/patients/duplicates/{pairs[anil]}/dismiss").status_code == 200)
+    rescan = scan()
+    check("resolved pairs are not proposed again", rescan.added == 0 and open_pairs(client) == {})
+
+
+def test_oversized_blocks():
+    # Everyone registered under one placeholder number, plus a real pair;
+    # the generated names all sound alike, so their name block is oversized too
+    records = [MatchRecord(n, f"Person{n}", f"Family{n}", None, "9999999999") for n in range(MAX_BLOCK_SIZE + 1)]
+    records += [MatchRecord("a", "Kavya", "Reddy", "1988-02-02", "9855500005"), MatchRecord("b", "Kavya", "Reddi", "1988-02-02", "9866600006")]
+    matches, skipped = find_matches(records, workers=1)
+    check("oversized blocks are skipped and reported", skipped == 2)
+    check("other blocks are still compared", [(m.a, m.b) for m in matches] == [("a", "b")])
+
+
+if __name__ == "__main__":
+    run("DUPLICATE PATIENTS", test_duplicates, test_oversized_blocks)
@@ -0,0 +1,51 @@
+"""
+Patient field projection check.
+Runs the app against a throwaway SQLite database. With `fields=`, the
+patient list and detail must return only the requested fields plus
+patient_id and version, page like the full list, and reject unknown names.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("fields.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+PATIENTS = 5
+
+
+def test_fields():
+    client = TestClient(app)
+    client.post("/v1/patients/batch", json={"patients": [
+        {"first_name": f"Field{n}", "last_name": "Test", "age": 20 + n, "gender": "male", "phone_number": f"95{n:08d}"}
+        for n in range(PATIENTS)
+    ]})
+    full = client.get("/v1/patients", params={"limit": PATIENTS}).json()
+
+    response = client.get("/v1/patients", params={"limit": 2, "fields": "first_name,phone_number"})
+    page = response.json()
+    check("only the requested fields are returned",
+          all(set(p) == {"patient_id", "version", "first_name", "phone_number"} for p in page))
+    check("projected values match the full patients",
+          [(p["patient_id"], p["first_name"]) for p in page] == [(p["patient_id"], p["first_name"]) for p in full[:2]])
+
+    cursor = response.headers.get("X-Next-Cursor")
+    next_page = client.get("/v1/patients", params={"limit": 2, "fields": "age", "cursor": cursor}).json()
+    check("the cursor pages a projected list", cursor is not None
+          and [p["patient_id"] for p in next_page] == [p["patient_id"] for p in full[2:4]])
+    check("the cursor's sort key is not leaked", all("create_at" not in p for p in next_page))
+
+    patient_id = full[0]["patient_id"]
+    detail = client.get(f"/v1/patient/{patient_id}", params={"fields": "age"})
+    check("the detail is projected too and keeps its ETag",
+          detail.json() == {"patient_id": patient_id, "version": 1, "age": full[0]["age"]} and detail.headers.get("ETag") == '"1"')
+
+    unknown = client.get("/v1/patients", params={"fields": "first_name,password"})
+    check("unknown fields are rejected", unknown.status_code == 400 and "password" in unknown.json()["detail"])
+    check("unknown fields are rejected on the detail", client.get(f"/v1/patient/{patient_id}", params={"fields": "ssn"}).status_code == 400)
+
+
+if __name__ == "__main__":
+    run("PATIENT FIELD PROJECTION", test_fields)
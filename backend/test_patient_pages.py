@@ -0,0 +1,61 @@
+"""
+Patient keyset pagination check.
+Runs the app against a throwaway SQLite database and pages through
+patients registered in one batch, so many share a created date. Following
+X-Next-Cursor must visit every patient exactly once in registration order,
+also while patients are added, and must agree with `skip`.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("pages.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+PATIENTS = 45
+PAGE = 10
+
+
+def patient(n):
+    return {"first_name": f"Page{n}", "last_name": "Test", "age": 30, "gender": "other", "phone_number": f"97{n:08d}"}
+
+
+def walk(client, on_page=None):
+    ids, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": PAGE} if cursor is None else {"limit": PAGE, "cursor": cursor}
+        response = client.get("/v1/patients", params=params)
+        ids += [p["patient_id"] for p in response.json()]
+        pages += 1
+        if on_page:
+            on_page(pages)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, pages, response
+
+
+def test_pages():
+    client = TestClient(app)
+    client.post("/v1/patients/batch", json={"patients": [patient(n) for n in range(PATIENTS)]})
+
+    ids, pages, last = walk(client)
+    check("every patient is visited once", len(ids) == PATIENTS and len(set(ids)) == PATIENTS and pages == 5)
+    first_page = client.get("/v1/patients", params={"limit": PAGE})
+    check("the total estimate is sent", int(first_page.headers["X-Total-Count-Estimate"]) >= PATIENTS)
+    skipped = [p["patient_id"] for p in client.get("/v1/patients", params={"limit": PAGE, "skip": 2 * PAGE}).json()]
+    check("skip agrees with the cursor order", skipped == ids[2 * PAGE:3 * PAGE])
+    check("the last page has no cursor", "X-Next-Cursor" not in last.headers)
+
+    def register_midway(page):
+        if page == 2:
+            client.post("/v1/patient", json=patient(PATIENTS))
+    ids_during, _, _ = walk(client, register_midway)
+    check("a patient registered while paging is added at the end, nothing repeats",
+          ids_during[:PATIENTS] == ids and len(ids_during) == PATIENTS + 1 and len(set(ids_during)) == PATIENTS + 1)
+    check("a malformed cursor is rejected", client.get("/v1/patients", params={"cursor": "not-a-cursor"}).status_code == 400)
+
+
+if __name__ == "__main__":
+    run("PATIENT PAGINATION", test_pages)
@@ -0,0 +1,47 @@
+"""
+Patient search check.
+Runs the app against a throwaway SQLite database. /v1/patients/search must
+find patients by the start of their phone number however it is written,
+and by the start of their first and last names in either order, and never
+return deactivated patients.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("search.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def register(client, first_name, last_name, phone_number):
+    return client.post("/v1/patient", json={
+        "first_name": first_name, "last_name": last_name, "age": 45, "gender": "male", "phone_number": phone_number,
+    }).json()
+
+
+def search(client, q):
+    return [f"{p['first_name']} {p['last_name']}" for p in client.get("/v1/patients/search", params={"q": q}).json()]
+
+
+def test_search():
+    client = TestClient(app)
+    register(client, "Ravi", "Kumar", "+91 98450 12345")
+    register(client, "Kumar", "Ravindran", "098450-67890")
+    register(client, "Priya", "Sharma", "9123456789")
+    gone = register(client, "Ravindra", "Jadeja", "9845099999")
+    client.delete(f"/v1/patient/{gone['patient_id']}")
+
+    check("a full number matches however it is written", search(client, "+91-98450 12345") == ["Ravi Kumar"]
+          and search(client, "0091 9845012345") == ["Ravi Kumar"])
+    check("leading digits match every number they start", sorted(search(client, "98450")) == ["Kumar Ravindran", "Ravi Kumar"])
+    check("a first name prefix matches", search(client, "pri") == ["Priya Sharma"])
+    check("names match in either order", sorted(search(client, "ravi ku")) == ["Kumar Ravindran", "Ravi Kumar"])
+    check("first-name matches come first", search(client, "kumar")[:1] == ["Kumar Ravindran"])
+    check("a deactivated patient is not found", "Ravindra Jadeja" not in search(client, "ravindra") + search(client, "98450999"))
+    check("LIKE wildcards are matched literally", search(client, "%") == [] and search(client, "r_v") == [])
+
+
+if __name__ == "__main__":
+    run("PATIENT SEARCH", test_search)
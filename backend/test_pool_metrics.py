@@ -0,0 +1,66 @@
+"""
+Connection pool metrics check.
+Runs the app against a throwaway SQLite database with a small pool. The
+pool and threadpool settings must be applied, /v1/metrics/db must report
+them, and checkouts, saturation and timeouts must be counted as they happen.
+"""
+
+import os
+
+from checks import check, run, temp_database
+
+temp_database("pool.db")
+os.environ["THREADPOOL_SIZE"] = "8"
+os.environ["DB_POOL_SIZE"] = "3"
+os.environ["DB_MAX_OVERFLOW"] = "1"
+os.environ["DB_POOL_TIMEOUT_SECONDS"] = "0.2"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+
+from app.main import app
+from app.infrastructure.db.session import engine
+
+POOL_FIELDS = {
+    "name", "size", "capacity", "checked_out", "idle", "overflow", "waiting",
+    "checkouts", "timeouts", "wait_avg_ms", "wait_max_ms", "saturation",
+}
+
+
+def primary_pool(client):
+    return next(pool for pool in client.get("/v1/metrics/db").json()["pools"] if pool["name"] == "primary")
+
+
+def test_pool_metrics():
+    with TestClient(app) as client:
+        metrics = client.get("/v1/metrics/db").json()
+        pool = primary_pool(client)
+        check("threadpool is sized from THREADPOOL_SIZE", metrics["threadpool"]["size"] == 8)
+        check("every pool field is reported", set(pool) == POOL_FIELDS)
+        check("pool is sized from the DB_POOL_* settings", pool["size"] == 3 and pool["capacity"] == 4)
+
+        before = primary_pool(client)["checkouts"]
+        client.get("/v1/bills")
+        after_bills = primary_pool(client)["checkouts"]
+        check("a request takes one connection, the metrics route none", after_bills - before == 1)
+        check("connections are returned after the request", primary_pool(client)["checked_out"] == 0)
+
+        held = [engine.connect() for _ in range(4)]
+        try:
+            busy = primary_pool(client)
+            try:
+                engine.connect().close()
+                timed_out = False
+            except exc.TimeoutError:
+                timed_out = True
+        finally:
+            for connection in held:
+                connection.close()
+        pool = primary_pool(client)
+        check("a full pool is saturated", busy["checked_out"] == 4 and busy["overflow"] == 1 and busy["saturation"] == 1.0)
+        check("a checkout past capacity times out and is counted", timed_out and pool["timeouts"] == 1)
+        check("checkout waits are reported", pool["wait_max_ms"] >= pool["wait_avg_ms"] >= 0)
+
+
+if __name__ == "__main__":
+    run("CONNECTION POOL METRICS", test_pool_metrics)
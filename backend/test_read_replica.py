@@ -0,0 +1,63 @@
+"""
+Read-replica routing check.
+Runs the app against two throwaway SQLite databases, a primary and a
+"replica" that is only brought up to date when the test copies the primary
+over it. List reads must come from the replica, except for a client that
+wrote within READ_YOUR_WRITES_SECONDS, which must see its own writes.
+"""
+
+import os
+import shutil
+import time
+
+from checks import check, run, temp_dir
+
+db_dir = temp_dir()
+PRIMARY = os.path.join(db_dir, "primary.db")
+REPLICA = os.path.join(db_dir, "replica.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY}"
+os.environ["DATABASE_REPLICA_URL"] = f"sqlite:///{REPLICA}"
+os.environ["READ_YOUR_WRITES_SECONDS"] = "1"
+
+from fastapi.testclient import TestClient
+
+from app.infrastructure.db.session import replica_engine
+from app.main import app
+from app.presentation.api.read_your_writes import PIN_COOKIE
+
+
+def replicate():
+    """Bring the replica up to date, like replication catching up."""
+    replica_engine.dispose()
+    shutil.copyfile(PRIMARY, REPLICA)
+
+
+def medicine_names(client):
+    return [m["name"] for m in client.get("/v1/medicines").json()]
+
+
+def test_read_routing():
+    replicate()
+    writer = TestClient(app)
+    reader = TestClient(app)
+
+    response = writer.post("/v1/medicines", json={"name": "Replica Test", "price_per_unit": 1.0, "stock": 5})
+    check("write sets the pin cookie", PIN_COOKIE in response.cookies)
+    check("writer reads its own write from the primary", "Replica Test" in medicine_names(writer))
+    check("other clients read the lagging replica", "Replica Test" not in medicine_names(reader))
+
+    patient = {"first_name": "Rita", "last_name": "Rao", "age": 40, "gender": "female", "phone_number": "9000000001"}
+    writer.post("/v1/patient", json=patient)
+    writer.post("/v1/bills", json={"patient_name": "Rita Rao", "patient_age": 40, "items": [{"medicine_id": 1, "quantity": 1}]})
+    check("writer sees its patient and bill", len(writer.get("/v1/patients").json()) == 1 and len(writer.get("/v1/bills").json()) == 1)
+    check("reader sees neither yet", reader.get("/v1/patients").json() == [] and reader.get("/v1/bills").json() == [])
+
+    time.sleep(1.1)
+    check("pin expires after the window", "Replica Test" not in medicine_names(writer))
+
+    replicate()
+    check("replica serves everyone once caught up", len(reader.get("/v1/patients").json()) == 1 and len(reader.get("/v1/bills").json()) == 1)
+
+
+if __name__ == "__main__":
+    run("READ REPLICA ROUTING", test_read_routing)
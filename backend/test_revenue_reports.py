@@ -0,0 +1,81 @@
+"""
+Revenue rollup check.
+Runs the app against a throwaway SQLite database, bills a few sales and
+asserts the revenue reports add up to them. Rebuilding the rollups from the
+bills must give the same report, and invalid bill lines must not reach the
+rollups.
+"""
+
+from checks import check, run, temp_database
+
+temp_database("reports.db")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.domain.models.bill import Bill, BillItem
+from app.infrastructure.db.session import SessionLocal
+from app.infrastructure.repositories.bill_repository import BillRepositoryImpl
+from app.infrastructure.repositories.report_repository import ReportRepositoryImpl
+from app.application.use_cases.report.revenue_report import RebuildRevenueRollups
+
+BILLS = 20
+
+
+def reports(client):
+    return client.get("/v1/reports/revenue").json(), client.get("/v1/reports/revenue/medicines").json()
+
+
+def test_rollups():
+    client = TestClient(app)
+    aspirin = client.post("/v1/medicines", json={"name": "Aspirin", "price_per_unit": 1.5, "stock": 1000}).json()
+    syrup = client.post("/v1/medicines", json={"name": "Syrup", "price_per_unit": 4.0, "stock": 1000}).json()
+
+    for n in range(BILLS):
+        items = [{"medicine_id": aspirin["id"], "quantity": 2}]
+        if n % 2:
+            items.append({"medicine_id": syrup["id"], "quantity": 1, "price_per_unit": 3.0})
+        client.post("/v1/bills", json={"patient_name": "Report Test", "patient_age": 40, "items": items})
+
+    revenue, medicines = reports(client)
+    expected = BILLS * 2 * 1.5 + BILLS // 2 * 3.0
+    check("revenue adds up to the bills", abs(revenue["revenue"] - expected) < 1e-9)
+    check("units and bills add up", revenue["units_sold"] == BILLS * 2 + BILLS // 2 and revenue["bill_count"] == BILLS)
+    check("today is one day however many slots were written", len(revenue["days"]) == 1)
+    by_name = {m["medicine_name"]: m for m in medicines}
+    check(
+        "per-medicine sales add up",
+        by_name["Aspirin"]["units_sold"] == BILLS * 2 and by_name["Syrup"]["bill_count"] == BILLS // 2
+        and abs(by_name["Syrup"]["revenue"] - BILLS // 2 * 3.0) < 1e-9,
+    )
+
+    db = SessionLocal()
+    try:
+        RebuildRevenueRollups(BillRepositoryImpl(db), ReportRepositoryImpl(db)).execute()
+    finally:
+        db.close()
+    rebuilt_revenue, rebuilt_medicines = reports(client)
+    check("rebuild matches the running totals", rebuilt_revenue == revenue and rebuilt_medicines == medicines)
+
+    response = client.post("/v1/bills", json={"patient_name": "Report Test", "patient_age": 40,
+                                              "items": [{"medicine_id": aspirin["id"], "quantity": 1, "price_per_unit": -5}]})
+    check("negative price is rejected", response.status_code == 422)
+
+    db = SessionLocal()
+    try:
+        bill = Bill(id=None, patient_name="Report Test", patient_age=40, total_amount=-3.0, bill_items=[
+            BillItem(id=None, bill_id=None, medicine_id=aspirin["id"], quantity=-2, price_per_unit=1.5, medicine=None),
+        ])
+        ReportRepositoryImpl(db).record_bills([bill])
+        refused = False
+    except ValueError:
+        refused = True
+    finally:
+        db.rollback()
+        db.close()
+    check("rollups refuse a negative quantity", refused)
+    check("report is unchanged", reports(client)[0] == revenue)
+
+
+if __name__ == "__main__":
+    run("REVENUE ROLLUPS", test_rollups)